@@ -22,6 +22,26 @@ mainnet_transaction_gateway_url = os.environ.get("MAINNET_TRANSACTION_GATEWAY_UR
 
 ssl_certificate_arn = os.environ.get("SSL_CERTIFICATE_ARN")
 
+celery_broker = os.environ.get("CELERY_BROKER", "redis")
+separate_redis_broker = os.environ.get("SEPARATE_REDIS_BROKER", "false").lower() == "true"
+cache_backend = os.environ.get("CACHE_BACKEND", "replication-group")
+
+cpu_architecture = os.environ.get("CPU_ARCHITECTURE", "X86_64")
+
+indexer_profile = os.environ.get("INDEXER_PROFILE", "zenchain-mainnet")
+
+erigon_node = os.environ.get("ERIGON_NODE", "false").lower() == "true"
+erigon_chain = os.environ.get("ERIGON_CHAIN")
+
+rpc_gateway = os.environ.get("RPC_GATEWAY", "false").lower() == "true"
+rpc_gateway_cache_cluster_mode = os.environ.get("RPC_GATEWAY_CACHE_CLUSTER_MODE", "false").lower() == "true"
+rpc_gateway_cache_max_replicas = os.environ.get("RPC_GATEWAY_CACHE_MAX_REPLICAS")
+
+clustered_events_mq = os.environ.get("CLUSTERED_EVENTS_MQ", "false").lower() == "true"
+
+# A one-off deployment mode rather than a setting of the environment, `cdk deploy -c catch_up=true`
+catch_up = str(app.node.try_get_context("catch_up") or "false").lower() == "true"
+
 environment_name = "production"
 prod_stack = ZenSafeStack(
     app,
@@ -32,6 +52,18 @@ prod_stack = ZenSafeStack(
     client_gateway_url=client_gateway_url,
     mainnet_transaction_gateway_url=mainnet_transaction_gateway_url,
     ssl_certificate_arn=ssl_certificate_arn,
+    celery_broker=celery_broker,
+    separate_redis_broker=separate_redis_broker,
+    cache_backend=cache_backend,
+    cpu_architecture=cpu_architecture,
+    catch_up=catch_up,
+    indexer_profile=indexer_profile,
+    erigon_node=erigon_node,
+    erigon_chain=erigon_chain,
+    rpc_gateway=rpc_gateway,
+    rpc_gateway_cache_cluster_mode=rpc_gateway_cache_cluster_mode,
+    rpc_gateway_cache_max_replicas=int(rpc_gateway_cache_max_replicas) if rpc_gateway_cache_max_replicas else None,
+    clustered_events_mq=clustered_events_mq,
     env=environment,
 )
 
@@ -0,0 +1,472 @@
+"""JSON-RPC gateway in front of the Ethereum nodes used by the transaction service.
+
+Responses that can't change any more, i.e. for blocks at least FINALITY_DEPTH behind the head, are
+cached in Redis. Identical concurrent requests share one upstream call, the cache misses of a batch
+go upstream as one batch, and every upstream has its own rate limit. A request an upstream doesn't
+answer within HEDGE_DELAY_MS is also sent to the next upstream, the first answer wins, and failed
+upstreams fall over to the next one.
+
+Configuration comes from the environment: UPSTREAM_<n>_URL and UPSTREAM_<n>_RATE_LIMIT (requests per
+second) for n = 0, 1, ..., REDIS_URL (an in-memory cache is used without it), REDIS_CLUSTER, FINALITY_DEPTH,
+HEDGE_DELAY_MS, UPSTREAM_TIMEOUT, MAX_BATCH_SIZE, CACHE_TTL and PORT.
+"""
+
+import collections
+import concurrent.futures
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+import urllib.error
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger("rpc-gateway")
+
+# Results that never change
+STATIC_METHODS = ("eth_chainId", "net_version")
+# Methods with a block number parameter, by its position
+BLOCK_NUMBER_METHODS = {
+    "eth_getBlockByNumber": 0,
+    "eth_getBlockTransactionCountByNumber": 0,
+    "eth_getTransactionByBlockNumberAndIndex": 0,
+    "eth_getBalance": 1,
+    "eth_getCode": 1,
+    "eth_getTransactionCount": 1,
+    "eth_getStorageAt": 2,
+    "eth_call": 1,
+    "trace_block": 0,
+    "trace_replayBlockTransactions": 0,
+}
+# Methods over a block range, given by the toBlock of their filter parameter
+BLOCK_RANGE_METHODS = ("eth_getLogs", "trace_filter")
+# Methods looked up by hash, their result says which block it is in
+BY_HASH_METHODS = (
+    "eth_getBlockByHash",
+    "eth_getTransactionByHash",
+    "eth_getTransactionReceipt",
+    "trace_transaction",
+)
+# Errors that another upstream may not return: method not found and provider limits
+FAILOVER_ERROR_CODES = (-32601, -32005, 429)
+
+
+class UpstreamError(Exception):
+    pass
+
+
+def parse_block_number(value) -> Optional[int]:
+    """Block number of a block parameter, None for tags like latest."""
+    if isinstance(value, dict):
+        value = value.get("blockNumber")
+    if isinstance(value, int):
+        return value
+    if isinstance(value, str) and value.startswith("0x"):
+        return int(value, 16)
+    return None
+
+
+def result_block_number(result) -> Optional[int]:
+    if isinstance(result, list):
+        result = result[0] if result else None
+    if not isinstance(result, dict):
+        return None
+    return parse_block_number(result.get("blockNumber", result.get("number")))
+
+
+def request_block_number(method: str, params: Sequence) -> Optional[int]:
+    """Newest block a request reads, None if it isn't known before the request."""
+    if method in BLOCK_NUMBER_METHODS:
+        position = BLOCK_NUMBER_METHODS[method]
+        return parse_block_number(params[position]) if len(params) > position else None
+    if method in BLOCK_RANGE_METHODS and params and isinstance(params[0], dict):
+        return parse_block_number(params[0].get("toBlock"))
+    return None
+
+
+def cache_key(method: str, params) -> str:
+    return hashlib.sha256(json.dumps([method, params], sort_keys=True).encode()).hexdigest()
+
+
+class TokenBucket:
+    def __init__(self, rate: float, clock=time.monotonic):
+        if rate <= 0:
+            raise ValueError("The rate limit must be positive")
+        self._rate = rate
+        self._capacity = max(1.0, rate)
+        self._tokens = self._capacity
+        self._clock = clock
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def acquire(self, blocking: bool = True) -> bool:
+        while True:
+            with self._lock:
+                now = self._clock()
+                self._tokens = min(self._capacity, self._tokens + (now - self._updated) * self._rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return True
+                if not blocking:
+                    return False
+                wait = (1 - self._tokens) / self._rate
+            time.sleep(wait)
+
+
+class Upstream:
+    def __init__(self, name: str, url: str, rate_limit: float = 50):
+        self.name = name
+        self.url = url
+        self.rate_limit = TokenBucket(rate_limit)
+
+    def post(self, body: List[dict], timeout: float) -> List[dict]:
+        """Sends a batch, returns its responses in the order of the requests."""
+        request = urllib.request.Request(
+            self.url,
+            data=json.dumps(body).encode(),
+            headers={"Content-Type": "application/json"},
+        )
+        try:
+            with urllib.request.urlopen(request, timeout=timeout) as response:
+                responses = json.load(response)
+        except (urllib.error.URLError, OSError, ValueError) as error:
+            raise UpstreamError(str(error)) from error
+        if not isinstance(responses, list):
+            raise UpstreamError(f"Expected a batch response, got {str(responses)[:200]}")
+
+        by_id = {response.get("id"): response for response in responses if isinstance(response, dict)}
+        results = []
+        for request_body in body:
+            response = by_id.get(request_body["id"])
+            if response is None:
+                raise UpstreamError(f"No response for {request_body['method']}")
+            # Some nodes send "error": null next to a result
+            if (response.get("error") or {}).get("code") in FAILOVER_ERROR_CODES:
+                raise UpstreamError(response["error"].get("message", "Upstream error"))
+            results.append({key: value for key, value in response.items() if key in ("result", "error")})
+        return results
+
+
+class MemoryCache:
+    def __init__(self, max_entries: int = 100000):
+        self._entries = collections.OrderedDict()
+        self._max_entries = max_entries
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: str, ttl: int) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+
+
+class RedisCache:
+    def __init__(self, url: str, cluster: bool = False, prefix: str = "rpc:"):
+        import redis
+
+        if cluster:
+            # Spreads the cache reads over the replicas of each shard
+            self._redis = redis.RedisCluster.from_url(url, read_from_replicas=True)
+        else:
+            self._redis = redis.Redis.from_url(url)
+        self._errors = redis.RedisError
+        self._prefix = prefix
+
+    def get(self, key: str) -> Optional[str]:
+        # Without the cache requests still work, they just all go upstream
+        try:
+            value = self._redis.get(self._prefix + key)
+        except self._errors:
+            logger.exception("Reading from the cache failed")
+            return None
+        return value.decode() if value is not None else None
+
+    def set(self, key: str, value: str, ttl: int) -> None:
+        try:
+            self._redis.set(self._prefix + key, value, ex=ttl)
+        except self._errors:
+            logger.exception("Writing to the cache failed")
+
+
+class Gateway:
+    def __init__(
+        self,
+        upstreams: Sequence[Upstream],
+        cache,
+        finality_depth: int = 64,
+        hedge_delay: float = 0.5,
+        timeout: float = 30,
+        max_batch_size: int = 100,
+        cache_ttl: int = 7 * 24 * 3600,
+        head_ttl: float = 1,
+    ):
+        if not upstreams:
+            raise ValueError("At least one upstream is required")
+        self._upstreams = list(upstreams)
+        self._cache = cache
+        self._finality_depth = finality_depth
+        self._hedge_delay = hedge_delay
+        self._timeout = timeout
+        self._max_batch_size = max_batch_size
+        self._cache_ttl = cache_ttl
+        self._head_ttl = head_ttl
+        # Head of each upstream, by name, and of whichever upstream answered first under None
+        self._heads: Dict[Optional[str], tuple] = {}
+        self._in_flight: Dict[str, concurrent.futures.Future] = {}
+        self._lock = threading.Lock()
+        self._executor = concurrent.futures.ThreadPoolExecutor(max_workers=64)
+
+    def handle(self, payload):
+        if isinstance(payload, list):
+            if not payload:
+                return error_response(None, -32600, "Empty batch")
+            return self.handle_batch(payload)
+        return self.handle_batch([payload])[0]
+
+    def handle_batch(self, requests: List) -> List[dict]:
+        bodies = [None] * len(requests)
+        owned = {}
+        waiting = {}
+        for index, request in enumerate(requests):
+            if not isinstance(request, dict) or not isinstance(request.get("method"), str):
+                bodies[index] = {"error": {"code": -32600, "message": "Invalid request"}}
+                continue
+            key = cache_key(request["method"], request.get("params", []))
+            if self._may_cache(request["method"], request.get("params", [])):
+                cached = self._cache.get(key)
+                if cached is not None:
+                    bodies[index] = json.loads(cached)
+                    continue
+            with self._lock:
+                # Identical requests in flight share its answer
+                future = self._in_flight.get(key)
+                if future is None:
+                    future = concurrent.futures.Future()
+                    self._in_flight[key] = future
+                    owned.setdefault(key, (request, future, []))[2].append(index)
+                    continue
+            if key in owned:
+                owned[key][2].append(index)
+            else:
+                waiting[index] = future
+
+        owned_calls = list(owned.values())
+        try:
+            for start in range(0, len(owned_calls), self._max_batch_size):
+                chunk = owned_calls[start:start + self._max_batch_size]
+                upstream = None
+                try:
+                    chunk_bodies, upstream = self._call_upstreams(
+                        [
+                            {"jsonrpc": "2.0", "id": i, "method": request["method"], "params": request.get("params", [])}
+                            for i, (request, _, _) in enumerate(chunk)
+                        ]
+                    )
+                except UpstreamError as error:
+                    logger.warning("All upstreams failed: %s", error)
+                    chunk_bodies = [{"error": {"code": -32603, "message": f"Upstream error: {error}"}}] * len(chunk)
+                for (request, future, indexes), body in zip(chunk, chunk_bodies):
+                    try:
+                        self._store(request, body, upstream)
+                    except Exception:
+                        logger.exception("Caching %s failed", request["method"])
+                    self._resolve(request, future, body)
+                    for index in indexes:
+                        bodies[index] = body
+        finally:
+            # Whatever went wrong, identical requests waiting for these must not wait forever
+            for request, future, indexes in owned_calls:
+                if not future.done():
+                    self._resolve(request, future, {"error": {"code": -32603, "message": "Internal error"}})
+
+        for index, future in waiting.items():
+            try:
+                bodies[index] = future.result(timeout=self._timeout * len(self._upstreams) + self._hedge_delay)
+            except concurrent.futures.TimeoutError:
+                bodies[index] = {"error": {"code": -32603, "message": "Timed out waiting for an identical request"}}
+
+        return [
+            {"jsonrpc": "2.0", "id": request.get("id") if isinstance(request, dict) else None, **body}
+            for request, body in zip(requests, bodies)
+        ]
+
+    def _resolve(self, request: dict, future: concurrent.futures.Future, body: dict) -> None:
+        with self._lock:
+            self._in_flight.pop(cache_key(request["method"], request.get("params", [])), None)
+        future.set_result(body)
+
+    def finalized_block(self, upstream: Optional[Upstream] = None) -> Optional[int]:
+        """Newest final block of the given upstream, or of whichever upstream answers first without one."""
+        name = upstream.name if upstream is not None else None
+        head, fetched_at = self._heads.get(name, (None, 0.0))
+        if head is None or time.monotonic() - fetched_at > self._head_ttl:
+            body = [{"jsonrpc": "2.0", "id": 0, "method": "eth_blockNumber", "params": []}]
+            try:
+                if upstream is None:
+                    response = self._call_upstreams(body)[0][0]
+                else:
+                    upstream.rate_limit.acquire()
+                    response = upstream.post(body, self._timeout)[0]
+            except UpstreamError:
+                return None
+            head = parse_block_number(response.get("result"))
+            if head is None:
+                return None
+            self._heads[name] = (head, time.monotonic())
+        return head - self._finality_depth
+
+    def _may_cache(self, method: str, params) -> bool:
+        """Whether a request can be answered from the cache, by-hash results are checked once they arrive."""
+        if method in STATIC_METHODS or method in BY_HASH_METHODS:
+            return True
+        block_number = request_block_number(method, params)
+        if block_number is None:
+            return False
+        finalized = self.finalized_block()
+        return finalized is not None and block_number <= finalized
+
+    def _store(self, request: dict, body: dict, upstream: Optional[Upstream]) -> None:
+        method, params = request["method"], request.get("params", [])
+        if body.get("result") is None or upstream is None:
+            return
+        if method not in STATIC_METHODS:
+            if method in BY_HASH_METHODS:
+                block_number = result_block_number(body["result"])
+            else:
+                block_number = request_block_number(method, params)
+            # Only the upstream that answered knows whether it had the block, a lagging or syncing node
+            # answers ranges past its head with fewer or no results
+            finalized = self.finalized_block(upstream)
+            if block_number is None or finalized is None or block_number > finalized:
+                return
+        self._cache.set(cache_key(method, params), json.dumps(body), self._cache_ttl)
+
+    def _call_upstreams(self, body: List[dict]) -> Tuple[List[dict], Upstream]:
+        """Responses of the first upstream to answer, and that upstream."""
+        remaining = list(self._upstreams)
+        pending = {}
+        errors = []
+
+        def start(blocking: bool) -> None:
+            for upstream in list(remaining):
+                if upstream.rate_limit.acquire(blocking=False):
+                    remaining.remove(upstream)
+                    pending[self._executor.submit(upstream.post, body, self._timeout)] = upstream
+                    return
+            # Only wait for a rate limit when nothing else is running
+            if blocking and remaining:
+                upstream = remaining.pop(0)
+                upstream.rate_limit.acquire()
+                pending[self._executor.submit(upstream.post, body, self._timeout)] = upstream
+
+        start(blocking=True)
+        while pending:
+            done, _ = concurrent.futures.wait(
+                pending, timeout=self._hedge_delay, return_when=concurrent.futures.FIRST_COMPLETED
+            )
+            if not done:
+                # Hedge, the upstreams asked so far are slow
+                start(blocking=False)
+                continue
+            for future in done:
+                upstream = pending.pop(future)
+                try:
+                    return future.result(), upstream
+                except Exception as error:
+                    # Anything an upstream answers that can't be used fails over like an error would
+                    errors.append(f"{upstream.name}: {error}")
+            if not pending:
+                start(blocking=True)
+        raise UpstreamError("; ".join(errors))
+
+
+def error_response(request_id, code: int, message: str) -> dict:
+    return {"jsonrpc": "2.0", "id": request_id, "error": {"code": code, "message": message}}
+
+
+class GatewayRequestHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        # Load balancer and container health checks
+        self._respond(200 if self.path == "/health" else 404, {"status": "ok"})
+
+    def do_POST(self):
+        try:
+            payload = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+        except ValueError:
+            self._respond(200, error_response(None, -32700, "Parse error"))
+            return
+        self._respond(200, self.server.gateway.handle(payload))
+
+    def _respond(self, status: int, body) -> None:
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def upstreams_from_environment(environ) -> List[Upstream]:
+    upstreams = []
+    while f"UPSTREAM_{len(upstreams)}_URL" in environ:
+        index = len(upstreams)
+        upstreams.append(
+            Upstream(
+                name=f"upstream-{index}",
+                url=environ[f"UPSTREAM_{index}_URL"],
+                rate_limit=float(environ.get(f"UPSTREAM_{index}_RATE_LIMIT", "50")),
+            )
+        )
+    return upstreams
+
+
+def serve(gateway: Gateway, port: int) -> ThreadingHTTPServer:
+    server = ThreadingHTTPServer(("0.0.0.0", port), GatewayRequestHandler)
+    server.daemon_threads = True
+    server.gateway = gateway
+    return server
+
+
+def main():
+    logging.basicConfig(level=logging.INFO)
+    redis_url = os.environ.get("REDIS_URL")
+    gateway = Gateway(
+        upstreams_from_environment(os.environ),
+        cache=(
+            RedisCache(redis_url, cluster=os.environ.get("REDIS_CLUSTER") == "true")
+            if redis_url
+            else MemoryCache()
+        ),
+        finality_depth=int(os.environ.get("FINALITY_DEPTH", "64")),
+        hedge_delay=int(os.environ.get("HEDGE_DELAY_MS", "500")) / 1000,
+        timeout=float(os.environ.get("UPSTREAM_TIMEOUT", "30")),
+        max_batch_size=int(os.environ.get("MAX_BATCH_SIZE", "100")),
+        cache_ttl=int(os.environ.get("CACHE_TTL", str(7 * 24 * 3600))),
+    )
+    serve(gateway, int(os.environ.get("PORT", "8545"))).serve_forever()
+
+
+if __name__ == "__main__":
+    main()
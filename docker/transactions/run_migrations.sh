@@ -0,0 +1,13 @@
+#!/bin/bash
+
+set -euo pipefail
+
+echo "==> $(date +%H:%M:%S) ==> Migrating Django models... "
+python manage.py migrate --noinput
+
+# Only a failed migration fails the deployment, like the upstream entrypoint the rest is best effort
+echo "==> $(date +%H:%M:%S) ==> Setting up service... "
+python manage.py setup_service || echo "==> $(date +%H:%M:%S) ==> Setting up service failed, continuing"
+
+echo "==> $(date +%H:%M:%S) ==> Send via Slack info about service version and network"
+python manage.py send_slack_notification || echo "==> $(date +%H:%M:%S) ==> Slack notification failed, continuing"
@@ -0,0 +1,26 @@
+#!/bin/bash
+
+set -euo pipefail
+
+WORKER_POOL=${CELERY_WORKER_POOL:-gevent}
+WORKER_CONCURRENCY=${CELERY_WORKER_CONCURRENCY:-500}
+MAX_MEMORY_PER_CHILD="${WORKER_MAX_MEMORY_PER_CHILD:-2097152}"
+MAX_TASKS_PER_CHILD="${MAX_TASKS_PER_CHILD:-1000000}"
+
+echo "==> $(date +%H:%M:%S) ==> Check RPC connected matches previously used RPC... "
+python manage.py check_chainid_matches
+
+echo "==> $(date +%H:%M:%S) ==> Running Celery worker for queues ${WORKER_QUEUES} with ${WORKER_POOL} pool and concurrency ${WORKER_CONCURRENCY}... "
+# A prefetch multiplier of 1 keeps one prefork child from reserving long indexing tasks the others could run
+exec celery --no-color -A config.celery_app worker \
+    --pool="${WORKER_POOL}" \
+    --concurrency="${WORKER_CONCURRENCY}" \
+    --prefetch-multiplier=1 \
+    --max-memory-per-child="${MAX_MEMORY_PER_CHILD}" \
+    --max-tasks-per-child="${MAX_TASKS_PER_CHILD}" \
+    --loglevel="${CELERY_LOG_LEVEL:-info}" \
+    --without-heartbeat \
+    --without-gossip \
+    --without-mingle \
+    -E \
+    -Q "${WORKER_QUEUES}"
@@ -0,0 +1,11 @@
+"""
+Production settings with RabbitMQ as the Celery broker.
+"""
+
+from .production import *  # noqa
+
+# Queues stay classic. Quorum queues need CELERY_TASK_DEFAULT_QUEUE_TYPE and CELERY_WORKER_DETECT_QUORUM_QUEUES,
+# which only Celery 5.5 and later read. Older workers ask quorum queues for global QoS and fail to consume.
+
+# Publishing blocks until the broker confirms the message, so a task is never lost between web and broker
+CELERY_BROKER_TRANSPORT_OPTIONS = {"confirm_publish": True}
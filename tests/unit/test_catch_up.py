@@ -0,0 +1,67 @@
+import pytest
+
+from zen_safe.catch_up import CatchUpProfile
+from zen_safe.functions.indexer_lag import index
+from zen_safe.worker_queue_groups import default_worker_queue_groups
+
+
+class FakeClient:
+    def __init__(self):
+        self.calls = []
+
+    def __getattr__(self, name):
+        return lambda **kwargs: self.calls.append((name, kwargs))
+
+
+def test_apply_catch_up_profile():
+    """Test if catch-up scales the indexing workers up and stops the notification workers."""
+    steady = default_worker_queue_groups(number_of_workers=2)
+
+    groups = CatchUpProfile(indexing_workers=6).apply(steady)
+
+    assert (groups["indexing"].desired_count, groups["indexing"].capacity_bounds) == (6, (6, 6))
+    assert (groups["notifications"].desired_count, groups["notifications"].capacity_bounds) == (0, (0, 0))
+    assert groups["default"] == steady["default"]
+
+
+def test_catch_up_profile_validation():
+    """Test if a catch-up profile without indexing workers fails."""
+    with pytest.raises(ValueError, match="indexing worker"):
+        CatchUpProfile(indexing_workers=0)
+
+
+def test_indexer_lag_uses_slowest_indexer():
+    """Test if the lag is measured from the indexer furthest behind the chain head."""
+    status = {"current_block_number": 1000, "erc20_block_number": 900, "master_copies_block_number": 990}
+
+    assert index.indexer_lag(status) == 100
+    assert index.indexer_lag({**status, "erc20_block_number": 1001, "master_copies_block_number": 1002}) == 0
+
+
+def test_restore_steady_state():
+    """Test if reverting catch-up restores the scaling bounds before the desired count."""
+    ecs, autoscaling = FakeClient(), FakeClient()
+
+    index.restore_steady_state(
+        [
+            {"cluster": "safe", "service": "indexing", "desired_count": 2, "min_count": 1, "max_count": 4},
+            {"cluster": "safe", "service": "notifications", "desired_count": 1},
+        ],
+        ecs,
+        autoscaling,
+    )
+
+    assert autoscaling.calls == [(
+        "register_scalable_target",
+        {
+            "ServiceNamespace": "ecs",
+            "ResourceId": "service/safe/indexing",
+            "ScalableDimension": "ecs:service:DesiredCount",
+            "MinCapacity": 1,
+            "MaxCapacity": 4,
+        },
+    )]
+    assert ecs.calls == [
+        ("update_service", {"cluster": "safe", "service": "indexing", "desiredCount": 2}),
+        ("update_service", {"cluster": "safe", "service": "notifications", "desiredCount": 1}),
+    ]
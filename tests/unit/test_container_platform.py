@@ -0,0 +1,39 @@
+import pytest
+
+from zen_safe.container_platform import base_images, resolve_cpu_architecture
+
+
+def write_dockerfile(directory, content):
+    (directory / "Dockerfile").write_text(content)
+    return str(directory)
+
+
+def test_base_images(tmp_path):
+    """Test if upstream images are read from every FROM line without their tag or digest."""
+    docker_directory = write_dockerfile(
+        tmp_path,
+        "FROM safeglobal/safe-transaction-service:latest AS base\n"
+        "FROM localhost:5000/tools@sha256:abc\n"
+        "COPY run_web.sh /app/run_web.sh\n",
+    )
+
+    assert base_images(docker_directory) == ["safeglobal/safe-transaction-service", "localhost:5000/tools"]
+
+
+def test_resolve_cpu_architecture_falls_back_per_service(tmp_path):
+    """Test if only services built on x86-only images fall back to X86_64."""
+    docker_directory = write_dockerfile(tmp_path, "FROM safeglobal/safe-events-service:latest\n")
+
+    assert resolve_cpu_architecture("ARM64", docker_directory) == "ARM64"
+    assert resolve_cpu_architecture(
+        "ARM64", docker_directory, x86_only_images={"safeglobal/safe-events-service"}
+    ) == "X86_64"
+    assert resolve_cpu_architecture("X86_64", docker_directory) == "X86_64"
+
+
+def test_resolve_unknown_cpu_architecture(tmp_path):
+    """Test if an unknown architecture is rejected."""
+    docker_directory = write_dockerfile(tmp_path, "FROM nginx:latest\n")
+
+    with pytest.raises(ValueError, match="cpu_architecture"):
+        resolve_cpu_architecture("arm", docker_directory)
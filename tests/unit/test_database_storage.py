@@ -0,0 +1,40 @@
+from aws_cdk import aws_ec2 as ec2, aws_rds as rds
+import pytest
+
+from zen_safe.database_storage import DatabaseStorage
+
+
+def test_gp3_storage_options():
+    """Test if gp3 storage with provisioned IOPS and throughput maps to instance options."""
+    storage = DatabaseStorage(allocated_storage_gib=400, max_allocated_storage_gib=1000, iops=12000, throughput_mibps=500)
+
+    options = storage.instance_options(ec2.InstanceType("m7g.large"))
+
+    assert options["storage_type"] == rds.StorageType.GP3
+    assert options["allocated_storage"] == 400
+    assert options["iops"] == 12000
+    assert options["storage_throughput"] == 500
+
+
+@pytest.mark.parametrize("kwargs, match", [
+    ({"storage_type": "gp2"}, "storage_type"),
+    ({"allocated_storage_gib": 200, "iops": 12000}, "from 400 GiB"),
+    ({"allocated_storage_gib": 400, "max_allocated_storage_gib": 1000, "iops": 12000, "throughput_mibps": 4000}, "0.25"),
+    ({"allocated_storage_gib": 500, "max_allocated_storage_gib": 520}, "10%"),
+    ({"storage_type": "io2", "allocated_storage_gib": 100}, "provisioned IOPS"),
+    ({"storage_type": "io2", "allocated_storage_gib": 100, "iops": 200000, "max_allocated_storage_gib": 500}, "per GiB"),
+    ({"storage_type": "io2", "iops": 3000, "throughput_mibps": 500}, "throughput"),
+])
+def test_invalid_storage_combinations_fail(kwargs, match):
+    """Test if combinations RDS doesn't accept are rejected at synth time."""
+    with pytest.raises(ValueError, match=match):
+        DatabaseStorage(**kwargs)
+
+
+def test_io2_needs_non_burstable_instance():
+    """Test if io2 storage is rejected on burstable instance classes."""
+    storage = DatabaseStorage(storage_type="io2", iops=3000)
+
+    with pytest.raises(ValueError, match="burstable"):
+        storage.instance_options(ec2.InstanceType("t4g.small"))
+    assert storage.instance_options(ec2.InstanceType("r7g.large"))["storage_type"] == rds.StorageType.IO2
@@ -0,0 +1,28 @@
+import pytest
+
+from zen_safe.gunicorn_profile import GEVENT, GTHREAD, GunicornProfile
+
+
+def test_workers_follow_task_size():
+    """Test if the worker count grows with CPU and is capped by memory."""
+    assert GTHREAD.workers(cpu=512, memory_limit_mib=1024) == 2
+    assert GTHREAD.workers(cpu=2048, memory_limit_mib=4096) == 5
+    # 2 vCPU would allow 5 workers but 1 GiB only fits 3
+    assert GTHREAD.workers(cpu=2048, memory_limit_mib=1024) == 3
+    assert GTHREAD.workers(cpu=256, memory_limit_mib=256) == 1
+
+
+def test_command_args():
+    """Test if the profile renders gunicorn command line settings."""
+    assert GTHREAD.command_args(cpu=1024, memory_limit_mib=2048) == (
+        "--workers=3 --worker-class=gthread --keep-alive=75 --timeout=60 "
+        "--max-requests=1000 --max-requests-jitter=100 --threads=4 --preload"
+    )
+    assert "--worker-connections=200" in GEVENT.command_args(cpu=1024, memory_limit_mib=2048)
+    assert "--preload" not in GEVENT.command_args(cpu=1024, memory_limit_mib=2048)
+
+
+def test_unknown_worker_class():
+    """Test if an unknown worker class is rejected."""
+    with pytest.raises(ValueError, match="worker class"):
+        GunicornProfile(worker_class="eventlet")
@@ -0,0 +1,36 @@
+import pytest
+
+from zen_safe.indexer_profile import FAST_L2, ZENCHAIN_MAINNET, IndexerProfile
+
+
+def test_mainnet_profile_environment():
+    """Test if the mainnet profile renders the indexer settings the service used so far."""
+    environment = ZENCHAIN_MAINNET.environment()
+
+    assert environment["ETH_L2_NETWORK"] == "0"
+    assert environment["ETH_INTERNAL_TXS_BLOCK_PROCESS_LIMIT"] == "5000"
+    assert environment["DB_MAX_CONNS"] == "15"
+
+
+def test_l2_profile_environment():
+    """Test if the L2 profile indexes events with a deeper reorg window."""
+    environment = FAST_L2.environment()
+
+    assert environment["ETH_L2_NETWORK"] == "1"
+    assert environment["ETH_REORG_BLOCKS"] == "200"
+    assert environment["ETH_EVENTS_BLOCK_PROCESS_LIMIT_MAX"] == "5000"
+
+
+@pytest.mark.parametrize(
+    "settings, message",
+    [
+        ({"reorg_blocks": 0}, "reorg_blocks"),
+        ({"l2": True, "trace_txs_batch_size": 10}, "L2 mode"),
+        ({"internal_txs_block_process_limit": 5, "trace_blocks": 10}, "trace_blocks"),
+        ({"events_block_process_limit": 100, "events_block_process_limit_max": 50}, "events_block_process_limit_max"),
+    ],
+)
+def test_inconsistent_profiles_fail(settings, message):
+    """Test if inconsistent indexer settings are rejected."""
+    with pytest.raises(ValueError, match=message):
+        IndexerProfile(**settings)
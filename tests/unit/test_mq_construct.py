@@ -1,3 +1,4 @@
+import pytest
 from aws_cdk import (
     assertions,
     App,
@@ -5,6 +6,7 @@ from aws_cdk import (
 )
 import aws_cdk as cdk
 from zen_safe.rabbitmq_construct import RabbitMQConstruct
+from zen_safe.rabbitmq_profile import CELERY, RabbitMQProfile
 
 
 def test_rabbitmq_construct_creation():
@@ -59,3 +61,112 @@ def test_rabbitmq_vpc_configuration():
         "SubnetIds": assertions.Match.any_value(),
         "SecurityGroups": assertions.Match.any_value()
     })
+
+
+@pytest.mark.parametrize("connection_scheme", [None, "amqps"])
+def test_rabbitmq_connection_string_host(connection_scheme):
+    """Test if the connection string host is taken from the broker endpoint at deploy time."""
+    app = App()
+    env = cdk.Environment(account="123456789012", region="us-east-1")
+    test_stack = cdk.Stack(app, "TestStack", env=env)
+    vpc = ec2.Vpc(test_stack, "TestVPC")
+    kwargs = {"connection_scheme": connection_scheme} if connection_scheme else {}
+    RabbitMQConstruct(test_stack, "TestRabbitMQStack", vpc, **kwargs)
+    template = assertions.Template.from_stack(test_stack)
+
+    secret = template.find_resources("AWS::SecretsManager::Secret", {
+        "Properties": {"Name": "testrabbitmqstack-connection-string"},
+    })
+    secret_string = str(next(iter(secret.values()))["Properties"]["SecretString"])
+    # The events service keeps amqp+ssl, Celery brokers ask for amqps
+    assert f"{connection_scheme or 'amqp+ssl'}://" in secret_string
+    assert "Fn::Split" in secret_string
+    assert "None" not in secret_string
+
+
+def test_rabbitmq_single_instance_uses_one_subnet():
+    """Test if a single instance broker is placed into exactly one subnet with the tuned configuration."""
+    app = App()
+    env = cdk.Environment(account="123456789012", region="us-east-1")
+    test_stack = cdk.Stack(app, "TestStack", env=env)
+    vpc = ec2.Vpc(test_stack, "TestVPC")
+    RabbitMQConstruct(test_stack, "TestRabbitMQStack", vpc)
+    template = assertions.Template.from_stack(test_stack)
+
+    broker = next(iter(template.find_resources("AWS::AmazonMQ::Broker").values()))["Properties"]
+    assert broker["DeploymentMode"] == "SINGLE_INSTANCE"
+    assert len(broker["SubnetIds"]) == 1
+    assert "Configuration" in broker
+    template.has_resource_properties("AWS::AmazonMQ::Configuration", {
+        "EngineType": "RABBITMQ",
+        "Data": {"Fn::Base64": assertions.Match.string_like_regexp("consumer_timeout = 1800000")},
+    })
+
+
+def test_rabbitmq_cluster():
+    """Test if a clustered broker spreads over all private subnets and mirrors its bounded queues."""
+    app = App()
+    env = cdk.Environment(account="123456789012", region="us-east-1")
+    test_stack = cdk.Stack(app, "TestStack", env=env)
+    vpc = ec2.Vpc(test_stack, "TestVPC")
+    RabbitMQConstruct(
+        test_stack, "TestRabbitMQStack", vpc, "mq.m5.large", deployment_mode="CLUSTER_MULTI_AZ", profile="events"
+    )
+    template = assertions.Template.from_stack(test_stack)
+
+    broker = next(iter(template.find_resources("AWS::AmazonMQ::Broker").values()))["Properties"]
+    assert broker["DeploymentMode"] == "CLUSTER_MULTI_AZ"
+    assert len(broker["SubnetIds"]) == 3
+    template.has_resource_properties("AWS::CloudFormation::CustomResource", {
+        "DefaultQueueType": "classic",
+        "Policy": assertions.Match.string_like_regexp('"ha-mode": "all"'),
+    })
+
+
+def test_rabbitmq_cluster_needs_m5_instance():
+    """Test if a clustered broker on a burstable instance type is rejected."""
+    app = App()
+    test_stack = cdk.Stack(app, "TestStack")
+    vpc = ec2.Vpc(test_stack, "TestVPC")
+
+    with pytest.raises(ValueError, match="mq.m5"):
+        RabbitMQConstruct(test_stack, "TestRabbitMQStack", vpc, deployment_mode="CLUSTER_MULTI_AZ")
+
+
+def test_rabbitmq_profile_configuration():
+    """Test if the Celery profile allows long unacknowledged deliveries and rejects unknown queue types."""
+    assert "consumer_timeout = 86400000" in CELERY.configuration()
+    assert CELERY.policy_definition(mirrored=False) == {"max-length": 1_000_000, "overflow": "reject-publish"}
+    assert RabbitMQProfile().policy_definition(mirrored=True) is None
+
+    with pytest.raises(ValueError):
+        RabbitMQProfile(default_queue_type="lazy")
+
+
+def test_celery_profile_keeps_classic_queues():
+    """Test if Celery queues stay classic, quorum queues need Celery 5.5 in the transaction service image."""
+    assert CELERY.default_queue_type == "classic"
+    assert "quorum" not in CELERY.configuration()
+
+
+def test_rabbitmq_metrics():
+    """Test if metrics and secret names are those of each broker, brokers and secrets are unique per account."""
+    app = App()
+    test_stack = cdk.Stack(app, "TestStack")
+    vpc = ec2.Vpc(test_stack, "TestVPC")
+    mq_construct = RabbitMQConstruct(test_stack, "TestRabbitMQStack", vpc)
+    other_construct = RabbitMQConstruct(test_stack, "OtherRabbitMQStack", vpc, profile="celery")
+
+    message_count = mq_construct.metric_message_count()
+    queue_metric = mq_construct.metric_queue("MessageReadyCount", "safe-events-service")
+    broker_name = mq_construct.broker.broker_name
+
+    assert message_count.namespace == "AWS/AmazonMQ"
+    assert message_count.dimensions == {"Broker": broker_name}
+    assert queue_metric.dimensions == {
+        "Broker": broker_name, "VirtualHost": "/", "Queue": "safe-events-service",
+    }
+    assert other_construct.metric_message_count().dimensions != message_count.dimensions
+    template = assertions.Template.from_stack(test_stack)
+    template.has_resource_properties("AWS::SecretsManager::Secret", {"Name": "testrabbitmqstack-credentials"})
+    template.has_resource_properties("AWS::SecretsManager::Secret", {"Name": "otherrabbitmqstack-credentials"})
@@ -0,0 +1,221 @@
+from aws_cdk import (
+    assertions,
+    App,
+    aws_ec2 as ec2,
+)
+import aws_cdk as cdk
+import pytest
+
+from zen_safe.database_monitoring import DatabaseMonitoring
+from zen_safe.database_storage import DatabaseStorage
+from zen_safe.postgres_construct import PostgresDatabaseConstruct
+
+
+def test_postgres_construct_creation():
+    """Test if PostgresDatabaseConstruct creates a single instance and its URL secret by default."""
+    app = App()
+    env = cdk.Environment(account="123456789012", region="us-east-1")
+    test_stack = cdk.Stack(app, "TestStack", env=env)
+    vpc = ec2.Vpc(test_stack, "TestVPC")
+    database = PostgresDatabaseConstruct(test_stack, "TestDatabase", vpc)
+    template = assertions.Template.from_stack(test_stack)
+
+    template.resource_count_is("AWS::RDS::DBInstance", 1)
+    template.has_resource_properties("AWS::SecretsManager::Secret", {"Name": "testdatabase-database-url"})
+    assert database.read_connection_string_secret is None
+
+
+def test_postgres_construct_read_replicas():
+    """Test if read replicas share the primary's security group and get a read URL secret."""
+    app = App()
+    env = cdk.Environment(account="123456789012", region="us-east-1")
+    test_stack = cdk.Stack(app, "TestStack", env=env)
+    vpc = ec2.Vpc(test_stack, "TestVPC")
+    database = PostgresDatabaseConstruct(test_stack, "TestDatabase", vpc, read_replicas=2)
+    template = assertions.Template.from_stack(test_stack)
+
+    template.resource_count_is("AWS::RDS::DBInstance", 3)
+    template.has_resource_properties("AWS::RDS::DBInstance", {
+        "SourceDBInstanceIdentifier": assertions.Match.any_value(),
+        "VPCSecurityGroups": [
+            {"Fn::GetAtt": [assertions.Match.string_like_regexp("TestDatabaseDatabaseInstanceSecurityGroup"), "GroupId"]}
+        ],
+    })
+    template.has_resource_properties("AWS::SecretsManager::Secret", {
+        "Name": "testdatabase-database-read-replica-url",
+        "SecretString": assertions.Match.any_value(),
+    })
+    assert len(database.read_replicas) == 2
+    # Reads are spread over both replicas through one weighted name
+    template.resource_count_is("AWS::Route53::RecordSet", 2)
+    template.has_resource_properties("AWS::Route53::RecordSet", {
+        "Name": "read.testdatabase.db.internal",
+        "Type": "CNAME",
+        "Weight": 1,
+    })
+    secret = template.find_resources("AWS::SecretsManager::Secret", {
+        "Properties": {"Name": "testdatabase-database-read-replica-url"},
+    })
+    assert "@read.testdatabase.db.internal:" in str(next(iter(secret.values()))["Properties"]["SecretString"])
+
+
+def test_postgres_construct_negative_read_replicas_fail():
+    """Test if a negative number of read replicas is rejected."""
+    app = App()
+    test_stack = cdk.Stack(app, "TestStack")
+    vpc = ec2.Vpc(test_stack, "TestVPC")
+
+    with pytest.raises(ValueError, match="read_replicas"):
+        PostgresDatabaseConstruct(test_stack, "TestDatabase", vpc, read_replicas=-1)
+
+
+def test_postgres_construct_proxy():
+    """Test if the proxy shares the database security group and the URL secret points at it."""
+    app = App()
+    env = cdk.Environment(account="123456789012", region="us-east-1")
+    test_stack = cdk.Stack(app, "TestStack", env=env)
+    vpc = ec2.Vpc(test_stack, "TestVPC")
+    PostgresDatabaseConstruct(test_stack, "TestDatabase", vpc, proxy=True)
+    template = assertions.Template.from_stack(test_stack)
+
+    template.resource_count_is("AWS::RDS::DBProxy", 1)
+    template.has_resource_properties("AWS::RDS::DBProxy", {
+        "EngineFamily": "POSTGRESQL",
+        "RequireTLS": False,
+        "VpcSecurityGroupIds": [
+            {"Fn::GetAtt": [assertions.Match.string_like_regexp("TestDatabaseDatabaseInstanceSecurityGroup"), "GroupId"]}
+        ],
+    })
+    template.has_resource_properties("AWS::EC2::SecurityGroupIngress", {
+        "FromPort": 5432,
+        "Description": "RDS Proxy",
+    })
+    secret = template.find_resources("AWS::SecretsManager::Secret", {
+        "Properties": {"Name": "testdatabase-database-url"},
+    })
+    assert "DatabaseProxy" in str(next(iter(secret.values()))["Properties"]["SecretString"])
+
+
+def test_postgres_construct_parameter_profile():
+    """Test if a parameter profile attaches a parameter group sized for the instance class."""
+    app = App()
+    env = cdk.Environment(account="123456789012", region="us-east-1")
+    test_stack = cdk.Stack(app, "TestStack", env=env)
+    vpc = ec2.Vpc(test_stack, "TestVPC")
+    PostgresDatabaseConstruct(test_stack, "TestDatabase", vpc, parameter_profile="api-read")
+    template = assertions.Template.from_stack(test_stack)
+
+    template.has_resource_properties("AWS::RDS::DBParameterGroup", {
+        "Family": "postgres16",
+        "Parameters": assertions.Match.object_like({
+            "shared_buffers": "65536",
+            "shared_preload_libraries": "pg_stat_statements",
+        }),
+    })
+    template.has_resource_properties("AWS::RDS::DBInstance", {
+        "DBParameterGroupName": {"Ref": assertions.Match.string_like_regexp("TestDatabaseParameterGroup")},
+    })
+
+    with pytest.raises(ValueError, match="parameter profile"):
+        PostgresDatabaseConstruct(test_stack, "OtherDatabase", vpc, parameter_profile="analytics")
+
+
+def test_postgres_construct_aurora_serverless_v2():
+    """Test if the Aurora Serverless v2 engine keeps the same connection surface."""
+    app = App()
+    env = cdk.Environment(account="123456789012", region="us-east-1")
+    test_stack = cdk.Stack(app, "TestStack", env=env)
+    vpc = ec2.Vpc(test_stack, "TestVPC")
+    database = PostgresDatabaseConstruct(
+        test_stack,
+        "TestDatabase",
+        vpc,
+        engine="aurora-serverless-v2",
+        min_capacity=1,
+        max_capacity=16,
+        read_replicas=1,
+        parameter_profile="indexer-oltp",
+    )
+    template = assertions.Template.from_stack(test_stack)
+
+    template.has_resource_properties("AWS::RDS::DBCluster", {
+        "Engine": "aurora-postgresql",
+        "ServerlessV2ScalingConfiguration": {"MinCapacity": 1, "MaxCapacity": 16},
+    })
+    template.resource_count_is("AWS::RDS::DBInstance", 2)
+    template.has_resource_properties("AWS::RDS::DBInstance", {"DBInstanceClass": "db.serverless"})
+    parameters = template.find_resources("AWS::RDS::DBClusterParameterGroup")
+    parameters = next(iter(parameters.values()))["Properties"]["Parameters"]
+    assert parameters["shared_preload_libraries"] == "pg_stat_statements"
+    assert "shared_buffers" not in parameters and "max_wal_size" not in parameters
+    assert database.secret is not None
+    assert database.read_connection_string_secret is not None
+    assert database.connections.security_groups
+
+    with pytest.raises(ValueError, match="capacity"):
+        PostgresDatabaseConstruct(test_stack, "OtherDatabase", vpc, engine="aurora-serverless-v2", max_capacity=0.25)
+
+
+def test_postgres_construct_storage():
+    """Test if storage settings apply to the instance and its read replicas."""
+    app = App()
+    env = cdk.Environment(account="123456789012", region="us-east-1")
+    test_stack = cdk.Stack(app, "TestStack", env=env)
+    vpc = ec2.Vpc(test_stack, "TestVPC")
+    PostgresDatabaseConstruct(
+        test_stack,
+        "TestDatabase",
+        vpc,
+        instance_type=ec2.InstanceType("m7g.large"),
+        read_replicas=1,
+        storage=DatabaseStorage(allocated_storage_gib=400, max_allocated_storage_gib=1000, iops=16000, throughput_mibps=1000),
+    )
+    template = assertions.Template.from_stack(test_stack)
+
+    instances = template.find_resources("AWS::RDS::DBInstance", {
+        "Properties": {
+            "StorageType": "gp3",
+            "AllocatedStorage": "400",
+            "MaxAllocatedStorage": 1000,
+            "Iops": 16000,
+            "StorageThroughput": 1000,
+        },
+    })
+    assert len(instances) == 2
+
+
+def test_postgres_construct_monitoring():
+    """Test if monitoring enables Performance Insights, log exports, slow query logging and its metrics."""
+    app = App()
+    env = cdk.Environment(account="123456789012", region="us-east-1")
+    test_stack = cdk.Stack(app, "TestStack", env=env)
+    vpc = ec2.Vpc(test_stack, "TestVPC")
+    database = PostgresDatabaseConstruct(
+        test_stack,
+        "TestDatabase",
+        vpc,
+        parameter_profile="indexer-oltp",
+        monitoring=DatabaseMonitoring(slow_query_ms=250),
+    )
+    template = assertions.Template.from_stack(test_stack)
+
+    template.has_resource_properties("AWS::RDS::DBInstance", {
+        "EnablePerformanceInsights": True,
+        "MonitoringInterval": 60,
+        "EnableCloudwatchLogsExports": ["postgresql"],
+    })
+    template.has_resource_properties("AWS::RDS::DBParameterGroup", {
+        "Parameters": assertions.Match.object_like({
+            "shared_preload_libraries": "pg_stat_statements,auto_explain",
+            "log_min_duration_statement": "250",
+            "auto_explain.log_min_duration": "2000",
+            "autovacuum_vacuum_scale_factor": "0.02",
+        }),
+    })
+    template.has_resource_properties("AWS::Logs::MetricFilter", {
+        "MetricTransformations": [assertions.Match.object_like({
+            "MetricNamespace": "SafeDatabases",
+            "MetricName": "TestDatabaseSlowQueries",
+        })],
+    })
+    assert set(database.query_metrics) == {"SlowQueries", "LockWaits"}
@@ -0,0 +1,40 @@
+from aws_cdk import aws_ec2 as ec2
+import pytest
+
+from zen_safe.postgres_parameters import (
+    INDEXER_OLTP,
+    POSTGRES_PARAMETER_PROFILES,
+    PostgresParameterProfile,
+    instance_memory_mib,
+)
+
+
+def test_instance_memory_mib():
+    """Test if instance memory is derived from the instance class."""
+    assert instance_memory_mib(ec2.InstanceType("t4g.small")) == 2048
+    assert instance_memory_mib(ec2.InstanceType("m7g.large")) == 8192
+    assert instance_memory_mib(ec2.InstanceType("r6g.2xlarge")) == 65536
+    with pytest.raises(ValueError):
+        instance_memory_mib(ec2.InstanceType("m7g.metal"))
+
+
+def test_memory_parameters_scale_with_instance_class():
+    """Test if memory settings grow with the instance's memory."""
+    small = INDEXER_OLTP.parameters(ec2.InstanceType("t4g.small"))
+    large = INDEXER_OLTP.parameters(ec2.InstanceType("r6g.xlarge"))
+
+    # 512MiB and 8GiB in 8kB pages
+    assert small["shared_buffers"] == "65536"
+    assert large["shared_buffers"] == "1048576"
+    assert int(large["work_mem"]) > int(small["work_mem"])
+    assert small["autovacuum_vacuum_scale_factor"] == "0.02"
+
+
+def test_every_profile_loads_pg_stat_statements():
+    """Test if every named profile enables pg_stat_statements."""
+    for profile in POSTGRES_PARAMETER_PROFILES.values():
+        parameters = profile.parameters(ec2.InstanceType("t4g.medium"))
+        assert "pg_stat_statements" in parameters["shared_preload_libraries"].split(",")
+
+    with pytest.raises(ValueError, match="pg_stat_statements"):
+        PostgresParameterProfile(shared_preload_libraries=("auto_explain",))
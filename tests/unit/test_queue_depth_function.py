@@ -0,0 +1,108 @@
+import socketserver
+import threading
+
+import pytest
+
+from zen_safe.functions.queue_depth import index
+
+
+class FakeRedisHandler(socketserver.StreamRequestHandler):
+    """Speaks just enough RESP to stand in for the Celery broker."""
+
+    def handle(self):
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            arguments = []
+            for _ in range(int(line[1:])):
+                length = int(self.rfile.readline()[1:])
+                arguments.append(self.rfile.read(length + 2)[:-2].decode())
+            self.wfile.write(self.server.reply(arguments))
+
+
+class FakeRedisServer(socketserver.ThreadingTCPServer):
+    allow_reuse_address = True
+    daemon_threads = True
+
+    def __init__(self, lists, password=None):
+        super().__init__(("127.0.0.1", 0), FakeRedisHandler)
+        self.lists = lists
+        self.password = password
+        self.commands = []
+
+    def reply(self, arguments):
+        self.commands.append(arguments)
+        command = arguments[0].upper()
+        if command == "AUTH":
+            if arguments[-1] != self.password:
+                return b"-WRONGPASS invalid password\r\n"
+            return b"+OK\r\n"
+        if command == "SELECT":
+            return b"+OK\r\n"
+        if command == "LLEN":
+            return b":%d\r\n" % self.lists.get(arguments[1], 0)
+        return b"-ERR unknown command\r\n"
+
+
+@pytest.fixture
+def fake_redis():
+    servers = []
+
+    def start(lists, password=None):
+        server = FakeRedisServer(lists, password)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+        return server
+
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+def test_redis_queue_lengths_include_priority_lists(fake_redis):
+    """Test if queue lengths add up the kombu priority lists of every queue."""
+    server = fake_redis({
+        "indexing": 10,
+        "indexing\x06\x163": 5,
+        "indexing\x06\x169": 1,
+        "webhooks": 7,
+    }, password="secret")
+    host, port = server.server_address
+
+    lengths = index.queue_lengths(f"redis://:secret@{host}:{port}/2", ["indexing", "webhooks", "tokens"])
+
+    assert lengths == {"indexing": 16, "webhooks": 7, "tokens": 0}
+    assert server.commands[0] == ["AUTH", "secret"]
+    assert server.commands[1] == ["SELECT", "2"]
+
+
+def test_redis_queue_lengths_wrong_password(fake_redis):
+    """Test if authentication errors from the broker are raised."""
+    server = fake_redis({}, password="secret")
+    host, port = server.server_address
+
+    with pytest.raises(RuntimeError, match="WRONGPASS"):
+        index.queue_lengths(f"redis://:wrong@{host}:{port}/", ["indexing"])
+
+
+def test_unsupported_broker_scheme():
+    """Test if an unknown broker URL scheme is rejected."""
+    with pytest.raises(ValueError, match="sqs"):
+        index.queue_lengths("sqs://localhost", ["indexing"])
+
+
+def test_metric_data():
+    """Test if every queue becomes a QueueLength datum with the stack dimensions."""
+    assert index.metric_data({"indexing": 3}, {"Chain": "mainnet"}) == [
+        {
+            "MetricName": "QueueLength",
+            "Dimensions": [
+                {"Name": "Chain", "Value": "mainnet"},
+                {"Name": "Queue", "Value": "indexing"},
+            ],
+            "Value": 3,
+            "Unit": "Count",
+        }
+    ]
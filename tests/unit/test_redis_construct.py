@@ -4,6 +4,8 @@ from aws_cdk import (
     aws_ec2 as ec2,
 )
 import aws_cdk as cdk
+import pytest
+
 from zen_safe.redis_construct import RedisConstruct
 
 
@@ -87,3 +89,133 @@ def test_redis_construct_subnet_group():
     template.has_resource_properties("AWS::ElastiCache::SubnetGroup", {
         "Description": "subnet group for redis",
     })
+
+
+def test_redis_construct_reader_endpoint():
+    """Test if RedisConstruct exposes the reader endpoint and a configurable replica count."""
+    app = App()
+    env = cdk.Environment(account="123456789012", region="us-east-1")
+    test_stack = cdk.Stack(app, "TestStack", env=env)
+    vpc = ec2.Vpc(test_stack, "TestVPC")
+    redis_construct = RedisConstruct(test_stack, "TestRedisConstruct", vpc, "cache.t3.small", replicas_per_shard=3)
+    template = assertions.Template.from_stack(test_stack)
+
+    template.has_resource_properties("AWS::ElastiCache::ReplicationGroup", {"ReplicasPerNodeGroup": 3})
+    assert "ReaderEndPoint.Address" in str(test_stack.resolve(redis_construct.reader_endpoint_address))
+
+
+def test_redis_construct_cluster_mode_autoscaling():
+    """Test if cluster mode shards the data and auto scales replicas on CPU and shards on memory."""
+    app = App()
+    env = cdk.Environment(account="123456789012", region="us-east-1")
+    test_stack = cdk.Stack(app, "TestStack", env=env)
+    vpc = ec2.Vpc(test_stack, "TestVPC")
+    redis_construct = RedisConstruct(
+        test_stack,
+        "TestRedisConstruct",
+        vpc,
+        "cache.r7g.large",
+        cluster_mode=True,
+        shards=2,
+        max_shards=4,
+        max_replicas_per_shard=3,
+    )
+    template = assertions.Template.from_stack(test_stack)
+
+    template.has_resource_properties("AWS::ElastiCache::ReplicationGroup", {"NumNodeGroups": 2})
+    template.has_resource_properties("AWS::ElastiCache::ParameterGroup", {
+        "Properties": {"cluster-enabled": "yes"},
+    })
+    template.has_resource_properties("AWS::ApplicationAutoScaling::ScalableTarget", {
+        "ScalableDimension": "elasticache:replication-group:Replicas",
+        "MinCapacity": 1,
+        "MaxCapacity": 3,
+    })
+    template.has_resource_properties("AWS::ApplicationAutoScaling::ScalingPolicy", {
+        "TargetTrackingScalingPolicyConfiguration": assertions.Match.object_like({
+            "PredefinedMetricSpecification": {
+                "PredefinedMetricType": "ElastiCacheDatabaseMemoryUsageCountedForEvictPercentage",
+            },
+        }),
+    })
+    assert "ConfigurationEndPoint.Address" in str(test_stack.resolve(redis_construct.endpoint_address))
+
+
+def test_redis_construct_autoscaling_needs_cluster_mode():
+    """Test if auto scaling without cluster mode or on burstable nodes is rejected."""
+    app = App()
+    test_stack = cdk.Stack(app, "TestStack")
+    vpc = ec2.Vpc(test_stack, "TestVPC")
+
+    with pytest.raises(ValueError, match="cluster_mode"):
+        RedisConstruct(test_stack, "Redis", vpc, "cache.r7g.large", max_replicas_per_shard=3)
+    with pytest.raises(ValueError, match="burstable"):
+        RedisConstruct(test_stack, "ClusterRedis", vpc, "cache.t3.small", cluster_mode=True, max_shards=2)
+
+
+def test_redis_construct_roles():
+    """Test if the role picks the eviction policy, snapshots and node type of the replication group."""
+    app = App()
+    env = cdk.Environment(account="123456789012", region="us-east-1")
+    test_stack = cdk.Stack(app, "TestStack", env=env)
+    vpc = ec2.Vpc(test_stack, "TestVPC")
+    RedisConstruct(test_stack, "Cache", vpc, role="cache")
+    RedisConstruct(test_stack, "Broker", vpc, role="broker")
+    template = assertions.Template.from_stack(test_stack)
+
+    template.has_resource_properties("AWS::ElastiCache::ParameterGroup", {
+        "Properties": {"maxmemory-policy": "allkeys-lru", "tcp-keepalive": "300"},
+    })
+    template.has_resource_properties("AWS::ElastiCache::ParameterGroup", {
+        "Properties": {"maxmemory-policy": "noeviction"},
+    })
+    template.has_resource_properties("AWS::ElastiCache::ReplicationGroup", {
+        "SnapshotRetentionLimit": 0,
+        "CacheNodeType": "cache.t3.small",
+    })
+    template.has_resource_properties("AWS::ElastiCache::ReplicationGroup", {
+        "SnapshotRetentionLimit": 1,
+        "CacheNodeType": "cache.m7g.large",
+    })
+    with pytest.raises(ValueError, match="at least one replica"):
+        RedisConstruct(test_stack, "BrokerWithoutReplica", vpc, role="broker", replicas_per_shard=0)
+
+
+def test_redis_construct_serverless_backend():
+    """Test if the serverless backend has ECPU and storage limits behind the same endpoint surface."""
+    app = App()
+    env = cdk.Environment(account="123456789012", region="us-east-1")
+    test_stack = cdk.Stack(app, "TestStack", env=env)
+    vpc = ec2.Vpc(test_stack, "TestVPC")
+    redis_construct = RedisConstruct(
+        test_stack, "TestRedisConstruct", vpc, backend="serverless", max_data_storage_gb=50, max_ecpu_per_second=20000
+    )
+    template = assertions.Template.from_stack(test_stack)
+
+    template.resource_count_is("AWS::ElastiCache::ReplicationGroup", 0)
+    template.has_resource_properties("AWS::ElastiCache::ServerlessCache", {
+        "Engine": "redis",
+        "CacheUsageLimits": {
+            "DataStorage": {"Maximum": 50, "Unit": "GB"},
+            "ECPUPerSecond": {"Maximum": 20000},
+        },
+    })
+    assert "Endpoint.Address" in str(test_stack.resolve(redis_construct.endpoint_address))
+    assert redis_construct.connection_string_secret is not None
+
+
+def test_redis_construct_data_tiering_backend():
+    """Test if the data tiering backend enables tiering on r6gd nodes only."""
+    app = App()
+    env = cdk.Environment(account="123456789012", region="us-east-1")
+    test_stack = cdk.Stack(app, "TestStack", env=env)
+    vpc = ec2.Vpc(test_stack, "TestVPC")
+    RedisConstruct(test_stack, "TestRedisConstruct", vpc, backend="data-tiering")
+    template = assertions.Template.from_stack(test_stack)
+
+    template.has_resource_properties("AWS::ElastiCache::ReplicationGroup", {
+        "CacheNodeType": "cache.r6gd.xlarge",
+        "DataTieringEnabled": True,
+    })
+    with pytest.raises(ValueError, match="r6gd"):
+        RedisConstruct(test_stack, "SmallRedis", vpc, "cache.r7g.large", backend="data-tiering")
@@ -0,0 +1,226 @@
+import importlib.util
+import json
+import os
+import threading
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+GATEWAY_PATH = os.path.join(os.path.dirname(__file__), "..", "..", "docker", "rpc-gateway", "gateway.py")
+spec = importlib.util.spec_from_file_location("gateway", GATEWAY_PATH)
+gateway = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(gateway)
+
+HEAD = 1000
+
+
+class FakeNode:
+    """A local JSON-RPC node that records the calls it gets."""
+
+    def __init__(self, delay: float = 0, status: int = 200, head: int = HEAD, logs: bool = False):
+        self.delay = delay
+        self.status = status
+        self.head = head
+        self.logs = logs
+        self.calls = []
+        self.requests = 0
+        node = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                node.requests += 1
+                node.calls.extend(call["method"] for call in body)
+                time.sleep(node.delay)
+                data = json.dumps([node.answer(call) for call in body]).encode()
+                self.send_response(node.status)
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_port}"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def answer(self, call):
+        if call["method"] == "eth_blockNumber":
+            return {"jsonrpc": "2.0", "id": call["id"], "result": hex(self.head)}
+        if call["method"] == "eth_chainId":
+            return {"jsonrpc": "2.0", "id": call["id"], "result": "0x1", "error": None}
+        if call["method"] == "eth_getLogs" and self.logs:
+            return {"jsonrpc": "2.0", "id": call["id"], "result": []}
+        if call["method"] == "eth_getBlockByNumber":
+            return {"jsonrpc": "2.0", "id": call["id"], "result": {"number": call["params"][0], "node": self.url}}
+        if call["method"] == "eth_getTransactionReceipt":
+            block_number = int(call["params"][0], 16)
+            return {"jsonrpc": "2.0", "id": call["id"], "result": {"blockNumber": hex(block_number)}}
+        return {"jsonrpc": "2.0", "id": call["id"], "error": {"code": -32601, "message": "Method not found"}}
+
+    def block_calls(self):
+        return [call for call in self.calls if call != "eth_blockNumber"]
+
+
+@pytest.fixture
+def nodes():
+    started = []
+
+    def start(**kwargs):
+        node = FakeNode(**kwargs)
+        started.append(node)
+        return node
+
+    yield start
+    for node in started:
+        node.server.shutdown()
+
+
+def make_gateway(*nodes, **kwargs):
+    upstreams = [gateway.Upstream(f"node-{i}", node.url, rate_limit=1000) for i, node in enumerate(nodes)]
+    return gateway.Gateway(upstreams, gateway.MemoryCache(), finality_depth=64, **kwargs)
+
+
+def get_block(number):
+    return {"jsonrpc": "2.0", "id": 7, "method": "eth_getBlockByNumber", "params": [hex(number), False]}
+
+
+def test_finalized_blocks_are_cached(nodes):
+    """Test if finalized block responses are served from the cache, recent ones always go upstream."""
+    node = nodes()
+    rpc_gateway = make_gateway(node)
+
+    for _ in range(2):
+        response = rpc_gateway.handle(get_block(HEAD - 100))
+        rpc_gateway.handle(get_block(HEAD - 1))
+
+    assert response == {"jsonrpc": "2.0", "id": 7, "result": {"number": hex(HEAD - 100), "node": node.url}}
+    assert node.block_calls() == ["eth_getBlockByNumber"] * 3
+
+
+def test_receipts_cached_once_final(nodes):
+    """Test if by-hash results are only cached when their block is final."""
+    node = nodes()
+    rpc_gateway = make_gateway(node)
+
+    for _ in range(2):
+        # The fake node puts the receipt into the block given as its hash
+        rpc_gateway.handle({"jsonrpc": "2.0", "id": 1, "method": "eth_getTransactionReceipt", "params": [hex(10)]})
+        rpc_gateway.handle({"jsonrpc": "2.0", "id": 2, "method": "eth_getTransactionReceipt", "params": [hex(HEAD)]})
+
+    assert node.block_calls() == ["eth_getTransactionReceipt"] * 3
+
+
+def test_concurrent_requests_are_coalesced(nodes):
+    """Test if identical concurrent requests share one upstream call."""
+    node = nodes(delay=0.3)
+    rpc_gateway = make_gateway(node, hedge_delay=5)
+    rpc_gateway.finalized_block()
+
+    with ThreadPoolExecutor(max_workers=5) as executor:
+        responses = list(executor.map(lambda _: rpc_gateway.handle(get_block(HEAD - 1)), range(5)))
+
+    assert all(response["result"]["number"] == hex(HEAD - 1) for response in responses)
+    assert node.block_calls() == ["eth_getBlockByNumber"]
+
+
+def test_null_error_does_not_hang_identical_requests(nodes):
+    """Test if a response with a null error is passed on and identical requests after it still get answered."""
+    rpc_gateway = make_gateway(nodes(delay=0.2), hedge_delay=5)
+    chain_id = {"jsonrpc": "2.0", "id": 1, "method": "eth_chainId", "params": []}
+
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        responses = list(executor.map(lambda _: rpc_gateway.handle(chain_id), range(3)))
+    responses.append(rpc_gateway.handle(chain_id))
+
+    assert [response.get("result") for response in responses] == ["0x1"] * 4
+
+
+def test_ranges_past_the_answering_upstreams_head_are_not_cached(nodes):
+    """Test if log ranges are only cached when they are final on the upstream that answered them."""
+    # The first upstream sets the head but can't answer logs, the lagging one answers them from behind
+    healthy, lagging = nodes(), nodes(head=HEAD - 500, logs=True)
+    rpc_gateway = make_gateway(healthy, lagging)
+    rpc_gateway.finalized_block()
+    get_logs = {"jsonrpc": "2.0", "id": 1, "method": "eth_getLogs", "params": [{"toBlock": hex(HEAD - 100)}]}
+
+    for _ in range(2):
+        response = rpc_gateway.handle(get_logs)
+
+    assert response["result"] == []
+    assert lagging.block_calls() == ["eth_getLogs"] * 2
+
+
+def test_batch_misses_go_upstream_as_one_batch(nodes):
+    """Test if the cache misses of a batch are sent upstream in one request, keeping the client's ids."""
+    node = nodes()
+    rpc_gateway = make_gateway(node)
+    rpc_gateway.handle(get_block(10))
+    requests_before = node.requests
+
+    responses = rpc_gateway.handle([{**get_block(number), "id": number} for number in (10, 11, 12)])
+
+    assert [response["id"] for response in responses] == [10, 11, 12]
+    assert node.requests == requests_before + 1
+    assert node.block_calls() == ["eth_getBlockByNumber"] * 3
+
+
+def test_failover_to_next_upstream(nodes):
+    """Test if a failing upstream falls over to the next one."""
+    broken, healthy = nodes(status=502), nodes()
+    rpc_gateway = make_gateway(broken, healthy)
+
+    response = rpc_gateway.handle(get_block(HEAD - 1))
+
+    assert response["result"]["node"] == healthy.url
+
+
+def test_slow_upstream_is_hedged(nodes):
+    """Test if a request a slow upstream doesn't answer in time is answered by the next upstream."""
+    slow, fast = nodes(delay=2), nodes()
+    rpc_gateway = make_gateway(slow, fast, hedge_delay=0.1)
+
+    started = time.monotonic()
+    response = rpc_gateway.handle({"jsonrpc": "2.0", "id": 1, "method": "eth_blockNumber", "params": []})
+
+    assert response["result"] == hex(HEAD)
+    assert time.monotonic() - started < 1
+
+
+def test_all_upstreams_failing_returns_error(nodes):
+    """Test if the client gets a JSON-RPC error when no upstream answers."""
+    rpc_gateway = make_gateway(nodes(status=502))
+
+    response = rpc_gateway.handle({"jsonrpc": "2.0", "id": 3, "method": "eth_blockNumber", "params": []})
+
+    assert response["id"] == 3
+    assert response["error"]["code"] == -32603
+
+
+def test_token_bucket_rate_limit():
+    """Test if the token bucket allows its rate and refills over time."""
+    now = [0.0]
+    bucket = gateway.TokenBucket(rate=2, clock=lambda: now[0])
+
+    assert [bucket.acquire(blocking=False) for _ in range(3)] == [True, True, False]
+    now[0] += 0.5
+    assert bucket.acquire(blocking=False)
+
+
+def test_http_server(nodes):
+    """Test if the gateway serves JSON-RPC and health checks over HTTP."""
+    server = gateway.serve(make_gateway(nodes()), port=0)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_port}"
+    try:
+        request = urllib.request.Request(url, data=json.dumps(get_block(5)).encode())
+        with urllib.request.urlopen(request, timeout=5) as response:
+            assert json.load(response)["result"]["number"] == hex(5)
+        with urllib.request.urlopen(f"{url}/health", timeout=5) as response:
+            assert response.status == 200
+    finally:
+        server.shutdown()
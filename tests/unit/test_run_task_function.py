@@ -0,0 +1,83 @@
+import pytest
+
+from zen_safe.functions.run_task import index
+
+EVENT = {
+    "RequestType": "Create",
+    "ResourceProperties": {
+        "Cluster": "arn:aws:ecs:us-east-1:123456789012:cluster/safe",
+        "TaskDefinition": "arn:aws:ecs:us-east-1:123456789012:task-definition/SafeServices:7",
+        "Subnets": ["subnet-1", "subnet-2"],
+        "SecurityGroups": ["sg-1"],
+    },
+}
+TASK_ARN = "arn:aws:ecs:us-east-1:123456789012:task/safe/abc"
+
+
+class FakeEcsClient:
+    def __init__(self, task=None):
+        self.task = task
+        self.calls = []
+
+    def run_task(self, **kwargs):
+        self.calls.append(kwargs)
+        return {"tasks": [{"taskArn": TASK_ARN}], "failures": []}
+
+    def describe_tasks(self, **kwargs):
+        self.calls.append(kwargs)
+        return {"tasks": [self.task], "failures": []}
+
+
+@pytest.fixture
+def fake_ecs(monkeypatch):
+    def install(task=None):
+        client = FakeEcsClient(task)
+        monkeypatch.setattr(index, "ecs_client", lambda: client)
+        return client
+
+    return install
+
+
+def test_on_event_starts_task(fake_ecs):
+    """Test if creating the resource starts the task in the given network."""
+    client = fake_ecs()
+
+    response = index.on_event(EVENT, None)
+
+    assert response == {"PhysicalResourceId": TASK_ARN, "Data": {"TaskArn": TASK_ARN}}
+    assert client.calls[0]["taskDefinition"].endswith("SafeServices:7")
+    assert client.calls[0]["networkConfiguration"]["awsvpcConfiguration"]["subnets"] == ["subnet-1", "subnet-2"]
+
+
+def test_on_event_delete_does_nothing(fake_ecs):
+    """Test if deleting the resource doesn't start a task."""
+    client = fake_ecs()
+
+    response = index.on_event({**EVENT, "RequestType": "Delete", "PhysicalResourceId": TASK_ARN}, None)
+
+    assert response == {"PhysicalResourceId": TASK_ARN}
+    assert client.calls == []
+
+
+def test_is_complete_waits_for_task_to_stop(fake_ecs):
+    """Test if the resource completes only once the task stopped successfully."""
+    client = fake_ecs({"taskArn": TASK_ARN, "lastStatus": "RUNNING", "containers": []})
+    event = {**EVENT, "PhysicalResourceId": TASK_ARN}
+
+    assert index.is_complete(event, None) == {"IsComplete": False}
+
+    client.task = {"taskArn": TASK_ARN, "lastStatus": "STOPPED", "containers": [{"name": "migrate", "exitCode": 0}]}
+    assert index.is_complete(event, None) == {"IsComplete": True}
+
+
+def test_is_complete_fails_on_non_zero_exit(fake_ecs):
+    """Test if a failing task fails the deployment."""
+    fake_ecs({
+        "taskArn": TASK_ARN,
+        "lastStatus": "STOPPED",
+        "stoppedReason": "Essential container in task exited",
+        "containers": [{"name": "migrate", "exitCode": 1}],
+    })
+
+    with pytest.raises(RuntimeError, match="exit code 1"):
+        index.is_complete({**EVENT, "PhysicalResourceId": TASK_ARN}, None)
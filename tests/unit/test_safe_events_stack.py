@@ -0,0 +1,74 @@
+from aws_cdk import (
+    assertions,
+    App,
+    Stack,
+    aws_ec2 as ec2,
+)
+import aws_cdk as cdk
+import pytest
+
+from zen_safe.safe_events_stack import SafeEventsStack
+from zen_safe.safe_shared_stack import SafeSharedStack
+
+
+def synth_events_stack(**kwargs):
+    # Static files are bundled with Docker, which unit tests don't need
+    app = App(context={"aws:cdk:bundling-stacks": []})
+    env = cdk.Environment(account="123456789012", region="us-east-1")
+    parent_stack = Stack(app, "TestStack", env=env)
+    vpc = ec2.Vpc(parent_stack, "TestVPC")
+    shared_stack = SafeSharedStack(parent_stack, "SafeShared", vpc=vpc)
+    events_stack = SafeEventsStack(parent_stack, "SafeEvents", vpc=vpc, shared_stack=shared_stack, **kwargs)
+    return (
+        assertions.Template.from_stack(events_stack),
+        assertions.Template.from_stack(shared_stack),
+    )
+
+
+def test_sse_load_balancing():
+    """Test if the events ALB keeps SSE streams open and drains them before a task stops."""
+    template, shared_template = synth_events_stack()
+
+    shared_template.has_resource_properties("AWS::ElasticLoadBalancingV2::LoadBalancer", {
+        "LoadBalancerAttributes": assertions.Match.array_with([
+            {"Key": "idle_timeout.timeout_seconds", "Value": "900"},
+        ]),
+    })
+    # The listeners and their target groups belong to the ALB's stack
+    shared_template.has_resource_properties("AWS::ElasticLoadBalancingV2::TargetGroup", {
+        "TargetGroupAttributes": assertions.Match.array_with([
+            {"Key": "deregistration_delay.timeout_seconds", "Value": "120"},
+        ]),
+    })
+    template.has_resource_properties("AWS::ECS::Service", {
+        "DeploymentConfiguration": assertions.Match.object_like({
+            "MinimumHealthyPercent": 100,
+            "MaximumPercent": 200,
+        }),
+    })
+
+
+def test_single_events_task():
+    """Test if the events service runs one task without auto scaling, its tasks would compete for events."""
+    template, _ = synth_events_stack()
+
+    template.has_resource_properties("AWS::ECS::Service", {"DesiredCount": 1})
+    template.resource_count_is("AWS::ApplicationAutoScaling::ScalableTarget", 0)
+    template.resource_count_is("AWS::CloudWatch::Alarm", 0)
+
+
+def test_events_broker_reached_over_amqps():
+    """Test if the events service reaches its broker on the AMQPS port, the only one Amazon MQ listens on."""
+    template, _ = synth_events_stack()
+
+    template.has_resource_properties("AWS::EC2::SecurityGroupIngress", {
+        "FromPort": 5671,
+        "ToPort": 5671,
+        "Description": assertions.Match.string_like_regexp("RabbitMQEvents"),
+    })
+
+
+def test_sse_idle_timeout_bounds():
+    """Test if an idle timeout the ALB doesn't support is rejected."""
+    with pytest.raises(ValueError, match="sse_idle_timeout"):
+        synth_events_stack(sse_idle_timeout=cdk.Duration.hours(2))
@@ -0,0 +1,609 @@
+import json
+
+from aws_cdk import (
+    assertions,
+    App,
+    Stack,
+    aws_ec2 as ec2,
+)
+import aws_cdk as cdk
+import pytest
+
+from zen_safe.capacity_provider_strategy import FargateCapacitySplit
+from zen_safe.catch_up import CatchUpProfile
+from zen_safe.erigon_stack import ErigonEthereumStack
+from zen_safe.indexer_profile import FAST_L2
+from zen_safe.rabbitmq_construct import RabbitMQConstruct
+from zen_safe.safe_shared_stack import SafeSharedStack
+from zen_safe.safe_transaction_stack import SafeTransactionStack
+from zen_safe.worker_queue_groups import WorkerQueueGroup
+
+
+def synth_transaction_stack(**kwargs):
+    # Static files are bundled with Docker, which unit tests don't need
+    app = App(context={"aws:cdk:bundling-stacks": []})
+    env = cdk.Environment(account="123456789012", region="us-east-1")
+    parent_stack = Stack(app, "TestStack", env=env)
+    vpc = ec2.Vpc(parent_stack, "TestVPC")
+    shared_stack = SafeSharedStack(parent_stack, "SafeShared", vpc=vpc)
+    events_mq = RabbitMQConstruct(parent_stack, "EventsRabbitMQ", vpc=vpc)
+    transaction_stack = SafeTransactionStack(
+        parent_stack,
+        "SafeTxMainnet",
+        vpc=vpc,
+        shared_stack=shared_stack,
+        events_mq=events_mq,
+        alb=shared_stack.transaction_mainnet_alb,
+        chain_name="mainnet",
+        **kwargs,
+    )
+    return transaction_stack, assertions.Template.from_stack(transaction_stack)
+
+
+def test_default_worker_queue_groups():
+    """Test if every default queue group gets its own worker service."""
+    transaction_stack, template = synth_transaction_stack(number_of_workers=4)
+
+    assert set(transaction_stack.worker_services) == {"indexing", "default", "notifications"}
+    # web, scheduler and one service per worker queue group
+    template.resource_count_is("AWS::ECS::Service", 5)
+    template.has_resource_properties("AWS::ECS::TaskDefinition", {
+        "Cpu": "512",
+        "Memory": "1024",
+        "ContainerDefinitions": [
+            assertions.Match.object_like({
+                "Command": ["/app/run_worker.sh"],
+                "Environment": assertions.Match.array_with([
+                    {"Name": "WORKER_QUEUES", "Value": "indexing,processing"},
+                    {"Name": "CELERY_WORKER_POOL", "Value": "prefork"},
+                    {"Name": "CELERY_WORKER_CONCURRENCY", "Value": "2"},
+                ]),
+            })
+        ],
+    })
+    template.has_resource_properties("AWS::ECS::Service", {"DesiredCount": 4})
+
+
+def test_custom_worker_queue_groups():
+    """Test if worker services follow a custom queue group map."""
+    transaction_stack, template = synth_transaction_stack(
+        worker_queue_groups={
+            "all": WorkerQueueGroup(
+                queues=("default", "indexing", "processing", "contracts", "tokens", "notifications", "webhooks"),
+                cpu=1024,
+                memory_limit_mib=2048,
+                concurrency=200,
+                pool="threads",
+            ),
+        },
+    )
+
+    assert list(transaction_stack.worker_services) == ["all"]
+    template.resource_count_is("AWS::ECS::Service", 3)
+    template.has_resource_properties("AWS::ECS::TaskDefinition", {
+        "Cpu": "1024",
+        "Memory": "2048",
+        "ContainerDefinitions": [
+            assertions.Match.object_like({
+                "Environment": assertions.Match.array_with([
+                    {"Name": "CELERY_WORKER_POOL", "Value": "threads"},
+                ]),
+            })
+        ],
+    })
+
+
+def test_overlapping_worker_queue_groups_fail():
+    """Test if a queue consumed by two worker queue groups is rejected."""
+    with pytest.raises(ValueError, match="indexing"):
+        synth_transaction_stack(
+            worker_queue_groups={
+                "indexing": WorkerQueueGroup(queues=("indexing",)),
+                "catch-all": WorkerQueueGroup(queues=("default", "indexing"), pool="gevent"),
+            },
+        )
+
+
+def test_worker_queue_depth_autoscaling():
+    """Test if autoscaled worker groups scale on the backlog of their queues."""
+    transaction_stack, template = synth_transaction_stack(
+        worker_queue_groups={
+            "indexing": WorkerQueueGroup(
+                queues=("indexing",), desired_count=2, min_count=1, max_count=6, backlog_per_task=50
+            ),
+            "webhooks": WorkerQueueGroup(queues=("webhooks",), pool="gevent"),
+        },
+        worker_scale_in_cooldown=cdk.Duration.minutes(30),
+    )
+
+    template.has_resource_properties("AWS::Lambda::Function", {
+        "Handler": "index.handler",
+        "Environment": {
+            "Variables": assertions.Match.object_like({"QUEUES": "indexing,webhooks", "CHAIN_NAME": "mainnet"}),
+        },
+    })
+    # The web service and the indexing group, the webhooks group has no room to scale
+    template.resource_count_is("AWS::ApplicationAutoScaling::ScalableTarget", 2)
+    template.has_resource_properties("AWS::ApplicationAutoScaling::ScalableTarget", {
+        "MinCapacity": 1,
+        "MaxCapacity": 6,
+    })
+    template.has_resource_properties("AWS::CloudWatch::Alarm", {
+        "ComparisonOperator": "GreaterThanOrEqualToThreshold",
+        "Threshold": 50,
+        "MetricName": "QueueLength",
+        "Namespace": "SafeTransactionService",
+        "Dimensions": assertions.Match.array_with([{"Name": "Queue", "Value": "indexing"}]),
+    })
+    template.has_resource_properties("AWS::ApplicationAutoScaling::ScalingPolicy", {
+        "StepScalingPolicyConfiguration": assertions.Match.object_like({
+            "Cooldown": 1800,
+            "StepAdjustments": [{"MetricIntervalUpperBound": 0, "ScalingAdjustment": -1}],
+        }),
+    })
+
+
+def test_worker_autoscaling_bounds_validation():
+    """Test if a desired count outside the autoscaling bounds is rejected."""
+    with pytest.raises(ValueError, match="min_count"):
+        synth_transaction_stack(
+            worker_queue_groups={
+                "indexing": WorkerQueueGroup(queues=("indexing",), desired_count=8, max_count=4),
+            },
+        )
+
+
+def test_worker_capacity_provider_strategy():
+    """Test if workers run mostly on Spot with a SIGTERM window while the scheduler stays on-demand."""
+    transaction_stack, template = synth_transaction_stack(
+        worker_queue_groups={
+            "indexing": WorkerQueueGroup(
+                queues=("indexing",),
+                capacity=FargateCapacitySplit(on_demand_base=1, on_demand_weight=0, spot_weight=1),
+            ),
+        },
+    )
+
+    template.has_resource_properties("AWS::ECS::Service", {
+        "CapacityProviderStrategy": [
+            {"CapacityProvider": "FARGATE", "Base": 1, "Weight": 0},
+            {"CapacityProvider": "FARGATE_SPOT", "Weight": 1},
+        ],
+    })
+    template.has_resource_properties("AWS::ECS::Service", {
+        "CapacityProviderStrategy": [{"CapacityProvider": "FARGATE", "Base": 0, "Weight": 1}],
+    })
+    template.has_resource_properties("AWS::ECS::TaskDefinition", {
+        "ContainerDefinitions": [
+            assertions.Match.object_like({"Command": ["/app/run_worker.sh"], "StopTimeout": 120}),
+        ],
+    })
+
+
+def test_fargate_capacity_split_validation():
+    """Test if a capacity split without any weight is rejected."""
+    with pytest.raises(ValueError, match="weight"):
+        FargateCapacitySplit(on_demand_weight=0, spot_weight=0)
+
+
+def test_arm64_runtime_platform():
+    """Test if every task definition runs on Graviton when ARM64 is requested."""
+    transaction_stack, template = synth_transaction_stack(cpu_architecture="ARM64")
+
+    task_definitions = template.find_resources("AWS::ECS::TaskDefinition")
+    assert task_definitions
+    for task_definition in task_definitions.values():
+        assert task_definition["Properties"]["RuntimePlatform"] == {
+            "CpuArchitecture": "ARM64",
+            "OperatingSystemFamily": "LINUX",
+        }
+
+
+def test_static_files_served_from_cloudfront():
+    """Test if static files go through CloudFront and S3 instead of an nginx sidecar."""
+    transaction_stack, template = synth_transaction_stack()
+
+    for task_definition in template.find_resources("AWS::ECS::TaskDefinition").values():
+        container_names = [container["Name"] for container in task_definition["Properties"]["ContainerDefinitions"]]
+        assert "static" not in container_names
+    # Static paths on the ALB's own hostname are redirected to the distribution
+    template.has_resource_properties("AWS::ElasticLoadBalancingV2::ListenerRule", {
+        "Conditions": [{"Field": "path-pattern", "PathPatternConfig": {"Values": ["/static/*"]}}],
+        "Actions": [assertions.Match.object_like({
+            "Type": "redirect",
+            "RedirectConfig": assertions.Match.object_like({
+                "Host": {"Fn::GetAtt": [assertions.Match.any_value(), "DomainName"]},
+                "Protocol": "HTTPS",
+            }),
+        })],
+    })
+    template.has_resource_properties("AWS::CloudFront::Distribution", {
+        "DistributionConfig": assertions.Match.object_like({
+            "CacheBehaviors": [assertions.Match.object_like({"PathPattern": "/static/*"})],
+        }),
+    })
+    template.has_resource_properties("Custom::CDKBucketDeployment", {
+        "DestinationBucketKeyPrefix": "static/",
+        "Prune": False,
+        "SystemMetadata": {"cache-control": "public, max-age=31536000, immutable"},
+    })
+
+
+def test_web_gunicorn_settings_follow_task_size():
+    """Test if the web container gets gunicorn settings sized from its task."""
+    transaction_stack, template = synth_transaction_stack(web_cpu=2048, web_memory_limit_mib=4096)
+
+    template.has_resource_properties("AWS::ECS::TaskDefinition", {
+        "Cpu": "2048",
+        "Memory": "4096",
+        "ContainerDefinitions": [
+            assertions.Match.object_like({
+                "Name": "web",
+                "Environment": assertions.Match.array_with([
+                    {
+                        "Name": "GUNICORN_CMD_ARGS",
+                        "Value": assertions.Match.string_like_regexp("--workers=5 --worker-class=gthread"),
+                    },
+                ]),
+            })
+        ],
+    })
+
+
+def test_migrations_run_before_services_update():
+    """Test if migrations run as a one-off task that every service waits for."""
+    transaction_stack, template = synth_transaction_stack()
+
+    template.has_resource_properties("AWS::ECS::TaskDefinition", {
+        "ContainerDefinitions": [
+            assertions.Match.object_like({"Name": "migrate", "Command": ["/app/run_migrations.sh"]})
+        ],
+    })
+    template.has_resource_properties("AWS::CloudFormation::CustomResource", {
+        "TaskDefinition": assertions.Match.any_value(),
+        "Cluster": assertions.Match.any_value(),
+    })
+    for service in template.find_resources("AWS::ECS::Service").values():
+        assert any(dependency.startswith("Migrations") for dependency in service["DependsOn"])
+    # The task may only start once it is allowed into the database
+    migrations = template.find_resources("AWS::CloudFormation::CustomResource", {
+        "Properties": {"TaskDefinition": assertions.Match.any_value()},
+    })
+    dependencies = next(iter(migrations.values()))["DependsOn"]
+    assert any(
+        dependency.startswith("TxDatabaseMainnet") and "MigrationsTaskSG" in dependency
+        for dependency in dependencies
+    )
+
+
+def test_rabbitmq_celery_broker():
+    """Test if the rabbitmq broker option points Celery at the transaction RabbitMQ broker."""
+    transaction_stack, template = synth_transaction_stack(celery_broker="rabbitmq")
+
+    template.has_resource_properties("AWS::ECS::TaskDefinition", {
+        "ContainerDefinitions": [
+            assertions.Match.object_like({
+                "Name": "web",
+                "Environment": assertions.Match.array_with([
+                    {"Name": "DJANGO_SETTINGS_MODULE", "Value": "config.settings.rabbitmq"},
+                ]),
+                "Secrets": assertions.Match.array_with([
+                    {
+                        "Name": "CELERY_BROKER_URL",
+                        "ValueFrom": {"Ref": assertions.Match.string_like_regexp("TxRabbitMQRabbitMQConnectionStringSecret")},
+                    },
+                ]),
+            })
+        ],
+    })
+    template.has_resource_properties("AWS::EC2::SecurityGroupIngress", {
+        "FromPort": 443,
+        "ToPort": 443,
+        "Description": assertions.Match.string_like_regexp("RabbitMQTx"),
+    })
+
+
+def test_unknown_celery_broker_fails():
+    """Test if an unknown broker is rejected."""
+    with pytest.raises(ValueError, match="celery_broker"):
+        synth_transaction_stack(celery_broker="sqs")
+
+
+def test_database_read_replica_url():
+    """Test if the services get the read replica URL only when replicas are enabled."""
+    transaction_stack, template = synth_transaction_stack()
+    assert "DATABASE_READ_REPLICA_URL" not in str(template.to_json())
+
+    transaction_stack, template = synth_transaction_stack(database_read_replicas=1)
+    template.has_resource_properties("AWS::ECS::TaskDefinition", {
+        "ContainerDefinitions": [
+            assertions.Match.object_like({
+                "Name": "web",
+                "Secrets": assertions.Match.array_with([
+                    {
+                        "Name": "DATABASE_READ_REPLICA_URL",
+                        "ValueFrom": {"Ref": assertions.Match.string_like_regexp("DatabaseReadReplicaUrlSecret")},
+                    },
+                ]),
+            })
+        ],
+    })
+
+
+def test_indexing_workers_on_ec2_capacity():
+    """Test if indexing workers bin-pack onto Graviton instances while the other workers stay on Fargate."""
+    transaction_stack, template = synth_transaction_stack(indexing_launch_type="EC2")
+
+    template.has_resource_properties("AWS::EC2::LaunchTemplate", {
+        "LaunchTemplateData": assertions.Match.object_like({"InstanceType": "c7gd.xlarge"}),
+    })
+    template.has_resource_properties("AWS::ECS::CapacityProvider", {
+        "AutoScalingGroupProvider": assertions.Match.object_like({
+            "ManagedScaling": assertions.Match.object_like({"Status": "ENABLED", "TargetCapacity": 100}),
+        }),
+    })
+    template.has_resource_properties("AWS::ECS::TaskDefinition", {
+        "NetworkMode": "bridge",
+        "RequiresCompatibilities": ["EC2"],
+        "Volumes": [{"Host": {"SourcePath": "/mnt/instance-store"}, "Name": "instance-store"}],
+    })
+    template.has_resource_properties("AWS::ECS::Service", {
+        "PlacementStrategies": [{"Field": "CPU", "Type": "binpack"}],
+        "CapacityProviderStrategy": [assertions.Match.object_like({
+            "CapacityProvider": {"Ref": assertions.Match.string_like_regexp("Ec2WorkerCapacity")},
+        })],
+    })
+    assert transaction_stack.ec2_worker_capacity is not None
+    assert template.find_resources("AWS::ECS::Service", {"Properties": {"LaunchType": "EC2"}}) == {}
+
+
+def test_ec2_workers_need_graviton_instance_type():
+    """Test if the EC2 worker capacity rejects instance types without Graviton or instance storage."""
+    with pytest.raises(ValueError, match="Graviton"):
+        synth_transaction_stack(indexing_launch_type="EC2", ec2_worker_instance_type="c6i.xlarge")
+    with pytest.raises(ValueError, match="Graviton"):
+        synth_transaction_stack(indexing_launch_type="EC2", ec2_worker_instance_type="c7g.xlarge")
+
+
+def test_ec2_workers_find_instance_store_disks():
+    """Test if the EC2 workers take Graviton i types and find their disks by model rather than device name."""
+    _, template = synth_transaction_stack(indexing_launch_type="EC2", ec2_worker_instance_type="i4g.large")
+
+    user_data = json.dumps(template.find_resources("AWS::EC2::LaunchTemplate"))
+    assert "Instance Storage" in user_data
+    assert "nvme1n1" not in user_data
+
+
+def test_catch_up_raises_aurora_capacity():
+    """Test if catch-up on Aurora Serverless v2 raises the maximum ACUs, which have no instance class."""
+    _, template = synth_transaction_stack(catch_up=CatchUpProfile(), database_engine="aurora-serverless-v2")
+
+    template.has_resource_properties("AWS::RDS::DBCluster", {
+        "ServerlessV2ScalingConfiguration": {"MinCapacity": 0.5, "MaxCapacity": 32},
+    })
+
+
+def test_catch_up_mode():
+    """Test if catch-up raises indexing throughput and reverts the workers once the indexer lag is small."""
+    transaction_stack, template = synth_transaction_stack(number_of_workers=4, catch_up=CatchUpProfile())
+
+    template.has_resource_properties("AWS::ECS::TaskDefinition", {
+        "ContainerDefinitions": [
+            assertions.Match.object_like({
+                "Environment": assertions.Match.array_with([
+                    {"Name": "ETH_INTERNAL_TXS_BLOCK_PROCESS_LIMIT", "Value": "20000"},
+                ]),
+            })
+        ],
+    })
+    template.has_resource_properties("AWS::RDS::DBInstance", {"DBInstanceClass": "db.m7g.xlarge"})
+    template.has_resource_properties("AWS::ECS::Service", {"DesiredCount": 8})
+    template.has_resource_properties("AWS::ECS::Service", {"DesiredCount": 0})
+    template.has_resource_properties("AWS::ApplicationAutoScaling::ScalableTarget", {
+        "MinCapacity": 8,
+        "MaxCapacity": 8,
+    })
+    template.has_resource_properties("AWS::CloudWatch::Alarm", {
+        "MetricName": "IndexerLag",
+        "ComparisonOperator": "LessThanThreshold",
+        "Threshold": 100,
+    })
+    template.has_resource_properties("AWS::Lambda::Function", {
+        "Handler": "index.revert_catch_up",
+    })
+    assert transaction_stack.indexer_lag.caught_up_alarm is not None
+
+
+def test_no_catch_up_by_default():
+    """Test if nothing watches the indexer lag outside catch-up."""
+    transaction_stack, template = synth_transaction_stack()
+
+    assert transaction_stack.indexer_lag is None
+    assert template.find_resources("AWS::Lambda::Function", {"Properties": {"Handler": "index.publish_lag"}}) == {}
+    assert template.find_resources("AWS::CloudWatch::Alarm", {"Properties": {"MetricName": "IndexerLag"}}) == {}
+
+
+def test_indexer_profile_environment():
+    """Test if the indexer profile sets the indexer environment of the services."""
+    _, template = synth_transaction_stack(indexer_profile=FAST_L2)
+
+    template.has_resource_properties("AWS::ECS::TaskDefinition", {
+        "ContainerDefinitions": [
+            assertions.Match.object_like({
+                "Environment": assertions.Match.array_with([
+                    {"Name": "ETH_L2_NETWORK", "Value": "1"},
+                    {"Name": "ETH_REORG_BLOCKS", "Value": "200"},
+                ]),
+            })
+        ],
+    })
+
+
+def test_erigon_node_replaces_remote_rpc():
+    """Test if the transaction service uses the Erigon node inside the VPC instead of the RPC secrets."""
+    app = App(context={"aws:cdk:bundling-stacks": []})
+    env = cdk.Environment(account="123456789012", region="us-east-1")
+    parent_stack = Stack(app, "TestStack", env=env)
+    vpc = ec2.Vpc(parent_stack, "TestVPC")
+    shared_stack = SafeSharedStack(parent_stack, "SafeShared", vpc=vpc)
+    events_mq = RabbitMQConstruct(parent_stack, "EventsRabbitMQ", vpc=vpc)
+    erigon_stack = ErigonEthereumStack(parent_stack, "ErigonMainnet", vpc=vpc, chain_name="mainnet")
+    transaction_stack = SafeTransactionStack(
+        parent_stack,
+        "SafeTxMainnet",
+        vpc=vpc,
+        shared_stack=shared_stack,
+        events_mq=events_mq,
+        alb=shared_stack.transaction_mainnet_alb,
+        chain_name="mainnet",
+        ethereum_node=erigon_stack,
+    )
+    template = assertions.Template.from_stack(transaction_stack)
+    erigon_template = assertions.Template.from_stack(erigon_stack)
+
+    template.has_resource_properties("AWS::ECS::TaskDefinition", {
+        "ContainerDefinitions": [
+            assertions.Match.object_like({
+                "Environment": assertions.Match.array_with([
+                    assertions.Match.object_like({"Name": "ETHEREUM_NODE_URL"}),
+                    assertions.Match.object_like({"Name": "ETHEREUM_TRACING_NODE_URL"}),
+                ]),
+                "Secrets": assertions.Match.not_(assertions.Match.array_with([
+                    assertions.Match.object_like({"Name": "ETHEREUM_TRACING_NODE_URL"}),
+                ])),
+            })
+        ],
+    })
+    template.has_resource_properties("AWS::EC2::SecurityGroupIngress", {
+        "FromPort": 8545,
+        "ToPort": 8545,
+        "Description": assertions.Match.string_like_regexp("Erigon"),
+    })
+    erigon_template.has_resource_properties("AWS::EC2::Instance", {"InstanceType": "i4g.4xlarge"})
+    assert "--trace.maxtraces=10000" in json.dumps(erigon_template.to_json())
+
+
+def test_erigon_node_needs_instance_storage():
+    """Test if the Erigon node rejects instance types without NVMe instance storage."""
+    app = App()
+    stack = Stack(app, "TestStack")
+    vpc = ec2.Vpc(stack, "TestVPC")
+
+    with pytest.raises(ValueError, match="instance storage"):
+        ErigonEthereumStack(stack, "Erigon", vpc=vpc, chain_name="mainnet", instance_type=ec2.InstanceType("m7g.xlarge"))
+
+
+def test_rpc_gateway_between_services_and_nodes():
+    """Test if the services call the RPC gateway, which gets the node secrets and the Redis cache."""
+    transaction_stack, template = synth_transaction_stack(rpc_gateway=True)
+
+    template.has_resource_properties("AWS::ECS::TaskDefinition", {
+        "ContainerDefinitions": [
+            assertions.Match.object_like({
+                "Command": ["/app/run_worker.sh"],
+                "Environment": assertions.Match.array_with([
+                    {"Name": "ETHEREUM_NODE_URL", "Value": "http://rpc-gateway.mainnet.safe.internal:8545"},
+                    {"Name": "ETHEREUM_TRACING_NODE_URL", "Value": "http://rpc-gateway.mainnet.safe.internal:8545"},
+                ]),
+            })
+        ],
+    })
+    template.has_resource_properties("AWS::ECS::TaskDefinition", {
+        "ContainerDefinitions": [
+            assertions.Match.object_like({
+                "Name": "rpc-gateway",
+                "Secrets": assertions.Match.array_with([
+                    assertions.Match.object_like({"Name": "UPSTREAM_0_URL"}),
+                    assertions.Match.object_like({"Name": "UPSTREAM_1_URL"}),
+                    assertions.Match.object_like({"Name": "REDIS_URL"}),
+                ]),
+            })
+        ],
+    })
+    template.has_resource_properties("AWS::ServiceDiscovery::PrivateDnsNamespace", {
+        "Name": "mainnet.safe.internal",
+    })
+    template.has_resource_properties("AWS::EC2::SecurityGroupIngress", {
+        "FromPort": 8545,
+        "Description": assertions.Match.string_like_regexp("RpcGateway"),
+    })
+    assert transaction_stack.rpc_gateway is not None
+
+
+def test_rpc_gateway_cluster_mode_cache():
+    """Test if the RPC gateway gets its own cluster mode Redis with auto scaled replicas."""
+    transaction_stack, template = synth_transaction_stack(
+        rpc_gateway=True, rpc_gateway_cache_cluster_mode=True, rpc_gateway_cache_max_replicas=3
+    )
+
+    template.resource_count_is("AWS::ElastiCache::ReplicationGroup", 2)
+    template.has_resource_properties("AWS::ElastiCache::ReplicationGroup", {
+        "CacheNodeType": "cache.m7g.large",
+        "CacheParameterGroupName": {"Ref": assertions.Match.string_like_regexp("RpcGatewayCache")},
+    })
+    template.has_resource_properties("AWS::ElastiCache::ParameterGroup", {
+        "Properties": assertions.Match.object_like({"cluster-enabled": "yes"}),
+    })
+    template.has_resource_properties("AWS::ApplicationAutoScaling::ScalableTarget", {
+        "ScalableDimension": "elasticache:replication-group:Replicas",
+        "MaxCapacity": 3,
+    })
+    template.has_resource_properties("AWS::ECS::TaskDefinition", {
+        "ContainerDefinitions": [
+            assertions.Match.object_like({
+                "Name": "rpc-gateway",
+                "Environment": assertions.Match.array_with([{"Name": "REDIS_CLUSTER", "Value": "true"}]),
+                "Secrets": assertions.Match.array_with([
+                    {
+                        "Name": "REDIS_URL",
+                        "ValueFrom": {"Ref": assertions.Match.string_like_regexp("RpcGatewayCache")},
+                    },
+                ]),
+            })
+        ],
+    })
+    assert transaction_stack.rpc_gateway_cache.cluster_mode
+
+
+def test_rpc_gateway_cache_options_need_the_gateway():
+    """Test if the RPC gateway cache options are rejected without the gateway or cluster mode."""
+    with pytest.raises(ValueError, match="needs rpc_gateway"):
+        synth_transaction_stack(rpc_gateway_cache_cluster_mode=True)
+    with pytest.raises(ValueError, match="needs rpc_gateway_cache_cluster_mode"):
+        synth_transaction_stack(rpc_gateway=True, rpc_gateway_cache_max_replicas=3)
+
+
+def test_serverless_cache_is_not_the_celery_broker():
+    """Test if a serverless cache needs its own broker, Celery's Redis transport fails on clustered Redis."""
+    with pytest.raises(ValueError, match="can't be the Celery broker"):
+        synth_transaction_stack(cache_backend="serverless")
+
+    _, template = synth_transaction_stack(cache_backend="serverless", separate_redis_broker=True)
+
+    template.resource_count_is("AWS::ElastiCache::ServerlessCache", 1)
+    template.resource_count_is("AWS::ElastiCache::ReplicationGroup", 1)
+
+
+def test_separate_redis_broker():
+    """Test if the workers get a Redis broker that never evicts, separate from the cache."""
+    _, template = synth_transaction_stack(separate_redis_broker=True)
+
+    template.resource_count_is("AWS::ElastiCache::ReplicationGroup", 2)
+    template.has_resource_properties("AWS::ElastiCache::ParameterGroup", {
+        "Properties": {"maxmemory-policy": "noeviction"},
+    })
+    template.has_resource_properties("AWS::ElastiCache::ParameterGroup", {
+        "Properties": {"maxmemory-policy": "allkeys-lru"},
+    })
+    template.has_resource_properties("AWS::ECS::TaskDefinition", {
+        "ContainerDefinitions": [
+            assertions.Match.object_like({
+                "Secrets": assertions.Match.array_with([
+                    {
+                        "Name": "CELERY_BROKER_URL",
+                        "ValueFrom": {"Ref": assertions.Match.string_like_regexp("RedisBrokerCluster")},
+                    },
+                ]),
+            })
+        ],
+    })
@@ -0,0 +1,70 @@
+from aws_cdk import (
+    assertions,
+    App,
+    aws_ec2 as ec2,
+    aws_ecs as ecs,
+    aws_elasticloadbalancingv2 as elbv2,
+)
+import aws_cdk as cdk
+import pytest
+
+from zen_safe.service_autoscaling import add_web_service_autoscaling
+
+
+def create_web_service(test_stack):
+    vpc = ec2.Vpc(test_stack, "TestVPC")
+    cluster = ecs.Cluster(test_stack, "TestCluster", vpc=vpc)
+    task_definition = ecs.FargateTaskDefinition(test_stack, "TestTaskDefinition")
+    task_definition.add_container(
+        "Web",
+        image=ecs.ContainerImage.from_registry("nginx:latest"),
+        port_mappings=[ecs.PortMapping(container_port=80)],
+    )
+    service = ecs.FargateService(test_stack, "TestService", cluster=cluster, task_definition=task_definition)
+    alb = elbv2.ApplicationLoadBalancer(test_stack, "TestALB", vpc=vpc)
+    target_group = alb.add_listener("Listener", port=80).add_targets("WebTarget", port=80, targets=[service])
+    return service, target_group
+
+
+def test_web_service_autoscaling_policies():
+    """Test if a web service tracks requests per target, CPU and memory with separate cooldowns."""
+    app = App()
+    env = cdk.Environment(account="123456789012", region="us-east-1")
+    test_stack = cdk.Stack(app, "TestStack", env=env)
+    service, target_group = create_web_service(test_stack)
+
+    add_web_service_autoscaling(
+        service,
+        target_groups=[target_group],
+        min_capacity=2,
+        max_capacity=8,
+        scale_out_cooldown=cdk.Duration.seconds(30),
+        scale_in_cooldown=cdk.Duration.minutes(10),
+    )
+    template = assertions.Template.from_stack(test_stack)
+
+    template.has_resource_properties("AWS::ApplicationAutoScaling::ScalableTarget", {
+        "MinCapacity": 2,
+        "MaxCapacity": 8,
+    })
+    template.resource_count_is("AWS::ApplicationAutoScaling::ScalingPolicy", 3)
+    for predefined_metric in ["ALBRequestCountPerTarget", "ECSServiceAverageCPUUtilization", "ECSServiceAverageMemoryUtilization"]:
+        template.has_resource_properties("AWS::ApplicationAutoScaling::ScalingPolicy", {
+            "TargetTrackingScalingPolicyConfiguration": assertions.Match.object_like({
+                "PredefinedMetricSpecification": assertions.Match.object_like({
+                    "PredefinedMetricType": predefined_metric,
+                }),
+                "ScaleOutCooldown": 30,
+                "ScaleInCooldown": 600,
+            }),
+        })
+
+
+def test_web_service_autoscaling_bounds():
+    """Test if inverted capacity bounds are rejected."""
+    app = App()
+    test_stack = cdk.Stack(app, "TestStack")
+    service, target_group = create_web_service(test_stack)
+
+    with pytest.raises(ValueError, match="min_capacity"):
+        add_web_service_autoscaling(service, target_groups=[target_group], min_capacity=3, max_capacity=2)
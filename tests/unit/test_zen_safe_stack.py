@@ -1,14 +1,34 @@
+import pytest
 from aws_cdk import (
     assertions,
-    App
+    App,
+    aws_s3_deployment as s3_deployment,
 )
 
 from zen_safe.safe_stack import ZenSafeStack
 
 
+@pytest.fixture
+def ui_build(tmp_path, monkeypatch):
+    # docker/ui/build.sh builds the UI before a deployment, tests deploy an empty build instead
+    asset = s3_deployment.Source.asset
+    monkeypatch.setattr(
+        s3_deployment.Source, "asset", staticmethod(lambda path, **kwargs: asset(str(tmp_path), **kwargs))
+    )
+
+
 # example test
-def test_zen_safe_stack():
-    app = App()
+def test_zen_safe_stack(ui_build):
+    # Static files are bundled with Docker, which unit tests don't need
+    app = App(context={"aws:cdk:bundling-stacks": []})
     stack = ZenSafeStack(app, "zen-safe", "production", "safe.zenchain.io")
     template = assertions.Template.from_stack(stack)
     pass
+
+
+def test_erigon_node_needs_chain():
+    """Test if an Erigon node without an explicit chain is rejected."""
+    app = App(context={"aws:cdk:bundling-stacks": []})
+
+    with pytest.raises(ValueError, match="erigon_chain"):
+        ZenSafeStack(app, "zen-safe", "production", "safe.zenchain.io", erigon_node=True)
@@ -0,0 +1,54 @@
+from dataclasses import dataclass
+from typing import List
+
+from aws_cdk import (
+    aws_ecs as ecs,
+    Duration,
+)
+
+# Fargate sends SIGTERM two minutes before reclaiming a Spot task and caps the stop timeout at two minutes,
+# Celery uses that window for a warm shutdown so unacknowledged tasks go back to the broker
+SPOT_STOP_TIMEOUT = Duration.seconds(120)
+
+
+@dataclass(frozen=True)
+class FargateCapacitySplit:
+    """How the tasks of a service are spread between FARGATE and FARGATE_SPOT."""
+
+    on_demand_base: int = 0
+    on_demand_weight: int = 1
+    spot_weight: int = 0
+
+    def __post_init__(self):
+        if self.on_demand_base < 0 or self.on_demand_weight < 0 or self.spot_weight < 0:
+            raise ValueError("Capacity provider base and weights can't be negative")
+        if self.on_demand_weight == 0 and self.spot_weight == 0:
+            raise ValueError("At least one of on_demand_weight and spot_weight must be positive")
+
+    @property
+    def uses_spot(self) -> bool:
+        return self.spot_weight > 0
+
+    def capacity_provider_strategies(self) -> List[ecs.CapacityProviderStrategy]:
+        strategies = []
+        if self.on_demand_base or self.on_demand_weight:
+            strategies.append(
+                ecs.CapacityProviderStrategy(
+                    capacity_provider="FARGATE",
+                    base=self.on_demand_base,
+                    weight=self.on_demand_weight,
+                )
+            )
+        if self.spot_weight:
+            strategies.append(
+                ecs.CapacityProviderStrategy(
+                    capacity_provider="FARGATE_SPOT",
+                    weight=self.spot_weight,
+                )
+            )
+        return strategies
+
+
+ON_DEMAND = FargateCapacitySplit()
+# One on-demand task keeps the queues moving while Spot capacity is reclaimed
+MOSTLY_SPOT = FargateCapacitySplit(on_demand_base=1, on_demand_weight=1, spot_weight=3)
@@ -0,0 +1,56 @@
+from dataclasses import dataclass, replace
+from typing import Dict, Mapping, Tuple
+
+from zen_safe.indexer_profile import IndexerProfile
+from zen_safe.worker_queue_groups import WorkerQueueGroup
+
+
+@dataclass(frozen=True)
+class CatchUpProfile:
+    """Temporary settings for the initial indexing of a new deployment.
+
+    Once the indexer lag stays below lag_threshold_blocks the workers are put back to their steady
+    state, a deployment without catch-up then restores the block limit and database class, or the Aurora
+    Serverless v2 capacity, too.
+    """
+
+    indexing_workers: int = 8
+    block_process_limit: int = 20000
+    database_instance_type: str = "m7g.xlarge"
+    # Aurora Serverless v2 has no instance class, it may scale up to this many ACUs instead
+    database_max_capacity: float = 32
+    # Groups that only consume these queues are stopped during catch-up
+    paused_queues: Tuple[str, ...] = ("notifications", "webhooks")
+    lag_threshold_blocks: int = 100
+
+    def __post_init__(self):
+        if self.indexing_workers < 1:
+            raise ValueError("Catch-up needs at least one indexing worker")
+        if self.block_process_limit < 1:
+            raise ValueError("block_process_limit must be positive")
+        if not 0.5 <= self.database_max_capacity <= 256:
+            raise ValueError("database_max_capacity must be between 0.5 and 256 ACUs")
+        if self.lag_threshold_blocks < 1:
+            raise ValueError("lag_threshold_blocks must be positive")
+
+    def is_paused(self, group: WorkerQueueGroup) -> bool:
+        return all(queue in self.paused_queues for queue in group.queues)
+
+    def apply_indexer_profile(self, profile: IndexerProfile) -> IndexerProfile:
+        return replace(profile, internal_txs_block_process_limit=self.block_process_limit)
+
+    def apply(self, worker_queue_groups: Mapping[str, WorkerQueueGroup]) -> Dict[str, WorkerQueueGroup]:
+        groups = {}
+        for name, group in worker_queue_groups.items():
+            if self.is_paused(group):
+                group = replace(group, desired_count=0, min_count=0, max_count=0)
+            elif "indexing" in group.queues:
+                _, max_count = group.capacity_bounds
+                group = replace(
+                    group,
+                    desired_count=self.indexing_workers,
+                    min_count=self.indexing_workers,
+                    max_count=max(max_count, self.indexing_workers),
+                )
+            groups[name] = group
+        return groups
@@ -0,0 +1,65 @@
+import os
+from typing import AbstractSet, List
+
+from aws_cdk import (
+    aws_ecr_assets as ecr_assets,
+    aws_ecs as ecs,
+)
+
+CPU_ARCHITECTURES = ("X86_64", "ARM64")
+
+_ASSET_PLATFORMS = {
+    "X86_64": ecr_assets.Platform.LINUX_AMD64,
+    "ARM64": ecr_assets.Platform.LINUX_ARM64,
+}
+
+_RUNTIME_ARCHITECTURES = {
+    "X86_64": ecs.CpuArchitecture.X86_64,
+    "ARM64": ecs.CpuArchitecture.ARM64,
+}
+
+
+def image_references(docker_directory: str) -> List[str]:
+    """Upstream images a Dockerfile builds on, as written in its FROM lines."""
+    references = []
+    with open(os.path.join(docker_directory, "Dockerfile")) as dockerfile:
+        for line in dockerfile:
+            parts = line.split()
+            if len(parts) >= 2 and parts[0].upper() == "FROM":
+                references.append(parts[1])
+    return references
+
+
+def base_images(docker_directory: str) -> List[str]:
+    """Upstream images a Dockerfile builds on, without their tag."""
+    images = []
+    for image in image_references(docker_directory):
+        if "@" in image:
+            image = image.split("@", 1)[0]
+        elif ":" in image.rsplit("/", 1)[-1]:
+            image = image.rsplit(":", 1)[0]
+        images.append(image)
+    return images
+
+
+def resolve_cpu_architecture(
+    cpu_architecture: str, docker_directory: str, x86_only_images: AbstractSet[str] = frozenset()
+) -> str:
+    """Fall back to X86_64 for a service whose upstream image has no arm64 variant."""
+    if cpu_architecture not in CPU_ARCHITECTURES:
+        raise ValueError(f"Unknown cpu_architecture '{cpu_architecture}', expected one of {CPU_ARCHITECTURES}")
+    if cpu_architecture == "ARM64" and any(image in x86_only_images for image in base_images(docker_directory)):
+        return "X86_64"
+    return cpu_architecture
+
+
+def container_image(docker_directory: str, cpu_architecture: str) -> ecs.ContainerImage:
+    # Building for the target platform fails fast when an upstream image lacks that architecture
+    return ecs.ContainerImage.from_asset(docker_directory, platform=_ASSET_PLATFORMS[cpu_architecture])
+
+
+def runtime_platform(cpu_architecture: str) -> ecs.RuntimePlatform:
+    return ecs.RuntimePlatform(
+        cpu_architecture=_RUNTIME_ARCHITECTURES[cpu_architecture],
+        operating_system_family=ecs.OperatingSystemFamily.LINUX,
+    )
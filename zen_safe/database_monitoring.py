@@ -0,0 +1,102 @@
+from dataclasses import dataclass
+from typing import Dict, Tuple
+
+from aws_cdk import (
+    aws_cloudwatch as cloudwatch,
+    aws_logs as logs,
+    aws_rds as rds,
+    Duration,
+)
+from constructs import Construct, IConstruct
+
+DATABASE_METRIC_NAMESPACE = "SafeDatabases"
+
+
+@dataclass(frozen=True)
+class DatabaseMonitoring:
+    """Query level evidence for a Postgres database: Performance Insights, Enhanced Monitoring and slow query logs."""
+
+    performance_insight_retention: rds.PerformanceInsightRetention = rds.PerformanceInsightRetention.DEFAULT
+    monitoring_interval: Duration = Duration.seconds(60)
+    log_retention: logs.RetentionDays = logs.RetentionDays.ONE_MONTH
+    # Statements slower than this are logged with their duration
+    slow_query_ms: int = 500
+    # Statements slower than this are also logged with their plan
+    auto_explain_ms: int = 2000
+
+    def __post_init__(self):
+        if not 0 <= self.slow_query_ms <= self.auto_explain_ms:
+            raise ValueError("slow_query_ms must be between 0 and auto_explain_ms")
+
+    @property
+    def preload_libraries(self) -> Tuple[str, ...]:
+        return ("auto_explain",)
+
+    def parameters(self) -> Dict[str, str]:
+        return {
+            "log_min_duration_statement": str(self.slow_query_ms),
+            "log_lock_waits": "1",
+            "log_autovacuum_min_duration": "10000",
+            "auto_explain.log_min_duration": str(self.auto_explain_ms),
+            # Plans only, timing every node of every statement is too expensive in production
+            "auto_explain.log_analyze": "0",
+            "auto_explain.log_format": "json",
+        }
+
+    def instance_options(self) -> dict:
+        """Monitoring keyword arguments for rds.DatabaseInstance and rds.DatabaseInstanceReadReplica."""
+        return {
+            "enable_performance_insights": True,
+            "performance_insight_retention": self.performance_insight_retention,
+            "monitoring_interval": self.monitoring_interval,
+            "cloudwatch_logs_exports": ["postgresql"],
+            "cloudwatch_logs_retention": self.log_retention,
+        }
+
+    def cluster_options(self) -> dict:
+        """Monitoring keyword arguments for rds.DatabaseCluster, Performance Insights is set per instance."""
+        return {
+            "monitoring_interval": self.monitoring_interval,
+            "cloudwatch_logs_exports": ["postgresql"],
+            "cloudwatch_logs_retention": self.log_retention,
+        }
+
+    def cluster_instance_options(self) -> dict:
+        return {
+            "enable_performance_insights": True,
+            "performance_insight_retention": self.performance_insight_retention,
+        }
+
+
+def add_slow_query_metric_filters(
+    scope: Construct,
+    log_group_name: str,
+    metric_prefix: str,
+    database: IConstruct,
+) -> Dict[str, cloudwatch.Metric]:
+    """Counts slow statements and lock waits in a database's exported Postgres log.
+
+    RDS always exports to its own /aws/rds/... log group, it can't write to a log group of our choosing.
+    """
+    log_group = logs.LogGroup.from_log_group_name(scope, "PostgresLogGroup", log_group_name)
+    patterns = {
+        # Simple queries log "statement:", prepared ones "execute <name>:"
+        "SlowQueries": logs.FilterPattern.any_term_group(["duration:", "statement:"], ["duration:", "execute"]),
+        "LockWaits": logs.FilterPattern.all_terms("still waiting for"),
+    }
+    metrics = {}
+    for name, pattern in patterns.items():
+        metric_filter = logs.MetricFilter(
+            scope,
+            f"{name}MetricFilter",
+            log_group=log_group,
+            filter_pattern=pattern,
+            metric_namespace=DATABASE_METRIC_NAMESPACE,
+            metric_name=f"{metric_prefix}{name}",
+            metric_value="1",
+            default_value=0,
+        )
+        # The log group is created with the database's log retention
+        metric_filter.node.add_dependency(database)
+        metrics[name] = metric_filter.metric(statistic=cloudwatch.Stats.SUM, period=Duration.minutes(5))
+    return metrics
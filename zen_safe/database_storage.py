@@ -0,0 +1,71 @@
+from dataclasses import dataclass
+from typing import Optional
+
+from aws_cdk import (
+    aws_ec2 as ec2,
+    aws_rds as rds,
+)
+
+STORAGE_TYPES = ("gp3", "io2")
+
+# Postgres gp3 volumes only take provisioned IOPS and throughput from this size on
+GP3_PROVISIONED_MIN_GIB = 400
+
+
+@dataclass(frozen=True)
+class DatabaseStorage:
+    """EBS storage of an RDS instance, with storage autoscaling up to max_allocated_storage_gib."""
+
+    storage_type: str = "gp3"
+    allocated_storage_gib: int = 100
+    max_allocated_storage_gib: int = 500
+    iops: Optional[int] = None
+    throughput_mibps: Optional[int] = None
+
+    def __post_init__(self):
+        if self.storage_type not in STORAGE_TYPES:
+            raise ValueError(f"Unknown storage_type '{self.storage_type}', expected one of {STORAGE_TYPES}")
+        # RDS only autoscales when the maximum is at least 10% above the allocated size
+        if self.max_allocated_storage_gib * 10 < self.allocated_storage_gib * 11:
+            raise ValueError("max_allocated_storage_gib must be at least 10% larger than allocated_storage_gib")
+
+        if self.storage_type == "gp3":
+            if not 20 <= self.allocated_storage_gib <= 65536:
+                raise ValueError("gp3 storage must be between 20 and 65536 GiB")
+            if (self.iops is not None or self.throughput_mibps is not None) and (
+                self.allocated_storage_gib < GP3_PROVISIONED_MIN_GIB
+            ):
+                raise ValueError(
+                    f"gp3 IOPS and throughput can only be provisioned from {GP3_PROVISIONED_MIN_GIB} GiB, "
+                    "smaller volumes get 3000 IOPS and 125 MiB/s"
+                )
+            if self.iops is not None and not 12000 <= self.iops <= 64000:
+                raise ValueError("gp3 IOPS must be between 12000 and 64000")
+            if self.throughput_mibps is not None and not 500 <= self.throughput_mibps <= 4000:
+                raise ValueError("gp3 throughput must be between 500 and 4000 MiB/s")
+            if self.iops is not None and self.throughput_mibps is not None and self.throughput_mibps * 4 > self.iops:
+                raise ValueError("gp3 throughput can't be more than 0.25 MiB/s per provisioned IOPS")
+        else:
+            if not 100 <= self.allocated_storage_gib <= 65536:
+                raise ValueError("io2 storage must be between 100 and 65536 GiB")
+            if self.iops is None or not 1000 <= self.iops <= 256000:
+                raise ValueError("io2 storage needs between 1000 and 256000 provisioned IOPS")
+            if self.iops > self.allocated_storage_gib * 1000:
+                raise ValueError("io2 storage can't have more than 1000 IOPS per GiB")
+            if self.throughput_mibps is not None:
+                raise ValueError("io2 throughput follows its IOPS and can't be provisioned")
+
+    def validate_instance_type(self, instance_type: ec2.InstanceType) -> None:
+        if self.storage_type == "io2" and instance_type.to_string().startswith("t"):
+            raise ValueError(f"io2 storage isn't available on burstable instance type '{instance_type.to_string()}'")
+
+    def instance_options(self, instance_type: ec2.InstanceType) -> dict:
+        """Storage keyword arguments for rds.DatabaseInstance and rds.DatabaseInstanceReadReplica."""
+        self.validate_instance_type(instance_type)
+        return {
+            "storage_type": rds.StorageType.GP3 if self.storage_type == "gp3" else rds.StorageType.IO2,
+            "allocated_storage": self.allocated_storage_gib,
+            "max_allocated_storage": self.max_allocated_storage_gib,
+            "iops": self.iops,
+            "storage_throughput": self.throughput_mibps,
+        }
@@ -0,0 +1,110 @@
+from aws_cdk import (
+    aws_autoscaling as autoscaling,
+    aws_ec2 as ec2,
+    aws_ecs as ecs,
+    aws_iam as iam,
+)
+from constructs import Construct
+
+from zen_safe.instance_store import has_instance_store, mount_instance_store_commands
+
+# Instance store NVMe disk, mounted into the tasks as scratch space
+INSTANCE_STORE_PATH = "/mnt/instance-store"
+
+
+class Ec2WorkerCapacityConstruct(Construct):
+    """Graviton instances with local NVMe disks that CPU heavy workers bin-pack onto.
+
+    Tasks use bridge networking so their number isn't bounded by the instance's ENIs, they share the
+    instances' security group, exposed as connections.
+    """
+
+    @property
+    def connections(self):
+        return self._connections
+
+    @property
+    def capacity_provider(self):
+        return self._capacity_provider
+
+    @property
+    def auto_scaling_group(self):
+        return self._auto_scaling_group
+
+    def __init__(
+        self,
+        scope: Construct,
+        construct_id: str,
+        vpc: ec2.IVpc,
+        cluster: ecs.Cluster,
+        instance_type: str = "c7gd.xlarge",
+        min_capacity: int = 0,
+        max_capacity: int = 4,
+        target_capacity_percent: int = 100,
+    ) -> None:
+        super().__init__(scope, construct_id)
+
+        if not 0 <= min_capacity <= max_capacity or max_capacity < 1:
+            raise ValueError("EC2 worker capacity needs 0 <= min_capacity <= max_capacity and max_capacity >= 1")
+        # The instances run the ARM ECS-optimized AMI
+        graviton = ec2.InstanceType(instance_type).architecture == ec2.InstanceArchitecture.ARM_64
+        if not graviton or not has_instance_store(instance_type):
+            raise ValueError(
+                f"Instance type '{instance_type}' must be a Graviton type with instance storage, e.g. c7gd.xlarge"
+            )
+
+        security_group = ec2.SecurityGroup(
+            self,
+            "InstanceSG",
+            vpc=vpc,
+            allow_all_outbound=True,
+            description="Security group for the EC2 worker instances",
+        )
+        self._connections = ec2.Connections(security_groups=[security_group])
+
+        user_data = ec2.UserData.for_linux()
+        user_data.add_commands(
+            *mount_instance_store_commands(INSTANCE_STORE_PATH),
+            f"chmod 1777 {INSTANCE_STORE_PATH}",
+        )
+
+        launch_template = ec2.LaunchTemplate(
+            self,
+            "LaunchTemplate",
+            instance_type=ec2.InstanceType(instance_type),
+            machine_image=ecs.EcsOptimizedImage.amazon_linux2023(ecs.AmiHardwareType.ARM),
+            user_data=user_data,
+            security_group=security_group,
+            role=iam.Role(self, "InstanceRole", assumed_by=iam.ServicePrincipal("ec2.amazonaws.com")),
+            require_imdsv2=True,
+        )
+
+        self._auto_scaling_group = autoscaling.AutoScalingGroup(
+            self,
+            "AutoScalingGroup",
+            vpc=vpc,
+            vpc_subnets=ec2.SubnetSelection(subnet_type=ec2.SubnetType.PRIVATE_WITH_EGRESS),
+            launch_template=launch_template,
+            min_capacity=min_capacity,
+            max_capacity=max_capacity,
+        )
+
+        # ECS adds and removes instances to keep the reserved CPU and memory at the target
+        self._capacity_provider = ecs.AsgCapacityProvider(
+            self,
+            "CapacityProvider",
+            auto_scaling_group=self._auto_scaling_group,
+            enable_managed_scaling=True,
+            enable_managed_termination_protection=False,
+            enable_managed_draining=True,
+            target_capacity_percent=target_capacity_percent,
+        )
+        cluster.add_asg_capacity_provider(self._capacity_provider)
+
+    def capacity_provider_strategies(self):
+        return [
+            ecs.CapacityProviderStrategy(
+                capacity_provider=self._capacity_provider.capacity_provider_name,
+                weight=1,
+            )
+        ]
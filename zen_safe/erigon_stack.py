@@ -0,0 +1,128 @@
+from aws_cdk import (
+    aws_ec2 as ec2,
+    aws_iam as iam,
+    aws_logs as logs,
+    NestedStack,
+    Stack,
+)
+from constructs import Construct
+
+from zen_safe.instance_store import has_instance_store, mount_instance_store_commands
+
+ERIGON_IMAGE = "erigontech/erigon:v2.60.10"
+RPC_PORT = 8545
+DATA_PATH = "/mnt/erigon"
+
+
+class ErigonEthereumStack(NestedStack):
+    """An Erigon archive node with the trace API, only reachable from inside the VPC.
+
+    The chain data lives on the instance's NVMe instance storage, which is lost when the instance is
+    stopped or replaced, the node then syncs again from scratch.
+    """
+
+    @property
+    def node_url(self) -> str:
+        return self._node_url
+
+    @property
+    def connections(self):
+        return self._connections
+
+    @property
+    def instance(self):
+        return self._instance
+
+    def __init__(
+        self,
+        scope: Construct,
+        construct_id: str,
+        vpc: ec2.IVpc,
+        chain_name: str,
+        instance_type: ec2.InstanceType = ec2.InstanceType("i4g.4xlarge"),
+        erigon_image: str = ERIGON_IMAGE,
+        max_traces: int = 10000,
+        rpc_batch_concurrency: int = 6,
+        **kwargs,
+    ) -> None:
+        super().__init__(scope, construct_id, **kwargs)
+
+        if not has_instance_store(instance_type.to_string()):
+            raise ValueError(
+                f"Instance type '{instance_type.to_string()}' has no instance storage, e.g. use i4g or c7gd types"
+            )
+        if max_traces < 1 or rpc_batch_concurrency < 1:
+            raise ValueError("max_traces and rpc_batch_concurrency must be positive")
+
+        security_group = ec2.SecurityGroup(
+            self,
+            "ErigonSG",
+            vpc=vpc,
+            allow_all_outbound=True,
+            description=f"Security group for the {chain_name} Erigon node",
+        )
+        # Peers are only dialed out through the NAT, the RPC port is opened to the services that use the node
+        self._connections = ec2.Connections(
+            security_groups=[security_group],
+            default_port=ec2.Port.tcp(RPC_PORT),
+        )
+
+        log_group = logs.LogGroup(
+            self,
+            "ErigonLogGroup",
+            retention=logs.RetentionDays.ONE_MONTH,
+        )
+
+        role = iam.Role(self, "InstanceRole", assumed_by=iam.ServicePrincipal("ec2.amazonaws.com"))
+        # Shell access through Session Manager, the instance has no SSH key
+        role.add_managed_policy(iam.ManagedPolicy.from_aws_managed_policy_name("AmazonSSMManagedInstanceCore"))
+        log_group.grant_write(role)
+
+        region = Stack.of(self).region
+        docker_run = (
+            "docker run -d --restart unless-stopped --network host "
+            f"-v {DATA_PATH}:/home/erigon/.local/share/erigon "
+            f"--log-driver awslogs --log-opt awslogs-region={region} "
+            f"--log-opt awslogs-group={log_group.log_group_name}"
+        )
+        user_data = ec2.UserData.for_linux()
+        user_data.add_commands(
+            "dnf install -y docker",
+            "systemctl enable --now docker",
+            *mount_instance_store_commands(DATA_PATH),
+            # The image runs as uid 1000
+            f"chown 1000:1000 {DATA_PATH}",
+            f"{docker_run} --log-opt awslogs-stream=erigon --name erigon {erigon_image} "
+            f"--chain={chain_name} --private.api.addr=127.0.0.1:9090 --http=false",
+            f"{docker_run} --log-opt awslogs-stream=rpcdaemon --name rpcdaemon --entrypoint rpcdaemon {erigon_image} "
+            "--datadir=/home/erigon/.local/share/erigon --private.api.addr=127.0.0.1:9090 "
+            f"--http.addr=0.0.0.0 --http.port={RPC_PORT} --http.vhosts='*' "
+            "--http.api=eth,debug,net,trace,web3,erigon "
+            f"--trace.maxtraces={max_traces} --rpc.batch.concurrency={rpc_batch_concurrency}",
+        )
+
+        cpu_type = (
+            ec2.AmazonLinuxCpuType.ARM_64
+            if instance_type.architecture == ec2.InstanceArchitecture.ARM_64
+            else ec2.AmazonLinuxCpuType.X86_64
+        )
+        self._instance = ec2.Instance(
+            self,
+            "ErigonInstance",
+            vpc=vpc,
+            vpc_subnets=ec2.SubnetSelection(subnet_type=ec2.SubnetType.PRIVATE_WITH_EGRESS),
+            instance_type=instance_type,
+            machine_image=ec2.MachineImage.latest_amazon_linux2023(cpu_type=cpu_type),
+            security_group=security_group,
+            role=role,
+            user_data=user_data,
+            require_imdsv2=True,
+            block_devices=[
+                ec2.BlockDevice(
+                    device_name="/dev/xvda",
+                    volume=ec2.BlockDeviceVolume.ebs(30, volume_type=ec2.EbsDeviceVolumeType.GP3, encrypted=True),
+                )
+            ],
+        )
+
+        self._node_url = f"http://{self._instance.instance_private_ip}:{RPC_PORT}"
@@ -0,0 +1,69 @@
+"""Publishes the transaction service's indexer lag and reverts catch-up once it has caught up."""
+
+import json
+import os
+import urllib.request
+from typing import Dict, List
+
+
+def indexing_status(url: str) -> dict:
+    with urllib.request.urlopen(url, timeout=10) as response:
+        return json.load(response)
+
+
+def indexer_lag(status: dict) -> int:
+    """Blocks between the chain head and the slowest indexer."""
+    indexed = min(status["erc20_block_number"], status["master_copies_block_number"])
+    return max(0, status["current_block_number"] - indexed)
+
+
+def metric_data(lag: int, chain_name: str) -> List[dict]:
+    return [
+        {
+            "MetricName": "IndexerLag",
+            "Dimensions": [{"Name": "Chain", "Value": chain_name}],
+            "Value": lag,
+            "Unit": "Count",
+        }
+    ]
+
+
+def publish_lag(event, context):
+    import boto3
+
+    lag = indexer_lag(indexing_status(os.environ["INDEXING_STATUS_URL"]))
+    boto3.client("cloudwatch").put_metric_data(
+        Namespace=os.environ["METRIC_NAMESPACE"],
+        MetricData=metric_data(lag, os.environ["CHAIN_NAME"]),
+    )
+    return lag
+
+
+def restore_steady_state(steady_state: List[Dict], ecs, autoscaling) -> None:
+    for service in steady_state:
+        if "min_count" in service:
+            autoscaling.register_scalable_target(
+                ServiceNamespace="ecs",
+                ResourceId=f"service/{service['cluster']}/{service['service']}",
+                ScalableDimension="ecs:service:DesiredCount",
+                MinCapacity=service["min_count"],
+                MaxCapacity=service["max_count"],
+            )
+        ecs.update_service(
+            cluster=service["cluster"],
+            service=service["service"],
+            desiredCount=service["desired_count"],
+        )
+
+
+def revert_catch_up(event, context):
+    import boto3
+
+    # Alarm actions fire on every state change, only the change into ALARM means it caught up
+    if event.get("alarmData", {}).get("state", {}).get("value") != "ALARM":
+        return
+    restore_steady_state(
+        json.loads(os.environ["STEADY_STATE"]),
+        boto3.client("ecs"),
+        boto3.client("application-autoscaling"),
+    )
@@ -0,0 +1,171 @@
+"""Publishes the number of pending Celery messages per queue as CloudWatch metrics."""
+import base64
+import json
+import os
+import socket
+import ssl
+import urllib.error
+import urllib.parse
+import urllib.request
+from typing import Dict, Iterable, List, Optional
+
+# kombu stores messages with a priority other than 0 in "<queue>\x06\x16<priority>" lists
+CELERY_PRIORITY_SEPARATOR = "\x06\x16"
+CELERY_PRIORITY_STEPS = (0, 3, 6, 9)
+
+
+class RedisClient:
+    """Minimal RESP client, enough to authenticate and read list lengths."""
+
+    def __init__(self, url: str, timeout: float = 5.0):
+        parsed = urllib.parse.urlparse(url)
+        self._host = parsed.hostname
+        self._port = parsed.port or 6379
+        self._username = urllib.parse.unquote(parsed.username) if parsed.username else None
+        self._password = urllib.parse.unquote(parsed.password) if parsed.password else None
+        self._db = int(parsed.path.strip("/") or 0)
+        self._use_ssl = parsed.scheme == "rediss"
+        self._timeout = timeout
+        self._socket = None
+        self._reader = None
+
+    def __enter__(self):
+        sock = socket.create_connection((self._host, self._port), timeout=self._timeout)
+        if self._use_ssl:
+            sock = ssl.create_default_context().wrap_socket(sock, server_hostname=self._host)
+        self._socket = sock
+        self._reader = sock.makefile("rb")
+        if self._password:
+            if self._username:
+                self.execute("AUTH", self._username, self._password)
+            else:
+                self.execute("AUTH", self._password)
+        if self._db:
+            self.execute("SELECT", str(self._db))
+        return self
+
+    def __exit__(self, *exc_info):
+        self._reader.close()
+        self._socket.close()
+
+    def execute(self, *args: str):
+        return self.pipeline([args])[0]
+
+    def pipeline(self, commands: Iterable[Iterable[str]]) -> List:
+        commands = list(commands)
+        payload = b"".join(self._encode(command) for command in commands)
+        self._socket.sendall(payload)
+        return [self._read_reply() for _ in commands]
+
+    @staticmethod
+    def _encode(command: Iterable[str]) -> bytes:
+        parts = [part.encode() for part in command]
+        encoded = [b"*%d\r\n" % len(parts)]
+        for part in parts:
+            encoded.append(b"$%d\r\n%s\r\n" % (len(part), part))
+        return b"".join(encoded)
+
+    def _read_reply(self):
+        line = self._reader.readline()
+        if not line:
+            raise ConnectionError("Connection closed by Redis")
+        prefix, body = line[:1], line[1:-2]
+        if prefix == b"+":
+            return body.decode()
+        if prefix == b"-":
+            raise RuntimeError(body.decode())
+        if prefix == b":":
+            return int(body)
+        if prefix == b"$":
+            length = int(body)
+            if length == -1:
+                return None
+            return self._reader.read(length + 2)[:-2]
+        if prefix == b"*":
+            return [self._read_reply() for _ in range(int(body))]
+        raise RuntimeError(f"Unexpected Redis reply {line!r}")
+
+
+def redis_queue_lengths(broker_url: str, queues: Iterable[str]) -> Dict[str, int]:
+    queues = list(queues)
+    commands = [
+        ("LLEN", queue if priority == 0 else f"{queue}{CELERY_PRIORITY_SEPARATOR}{priority}")
+        for queue in queues
+        for priority in CELERY_PRIORITY_STEPS
+    ]
+    with RedisClient(broker_url) as client:
+        lengths = client.pipeline(commands)
+
+    steps = len(CELERY_PRIORITY_STEPS)
+    return {
+        queue: sum(lengths[index * steps:(index + 1) * steps])
+        for index, queue in enumerate(queues)
+    }
+
+
+def rabbitmq_queue_lengths(
+    broker_url: str, queues: Iterable[str], management_url: Optional[str] = None
+) -> Dict[str, int]:
+    parsed = urllib.parse.urlparse(broker_url)
+    if management_url is None:
+        # Amazon MQ serves the management API on the same host as the AMQP endpoint
+        management_url = f"https://{parsed.hostname}"
+    vhost = urllib.parse.quote(urllib.parse.unquote(parsed.path[1:]) or "/", safe="")
+    credentials = base64.b64encode(
+        f"{urllib.parse.unquote(parsed.username)}:{urllib.parse.unquote(parsed.password)}".encode()
+    ).decode()
+
+    lengths = {}
+    for queue in queues:
+        request = urllib.request.Request(
+            f"{management_url}/api/queues/{vhost}/{urllib.parse.quote(queue, safe='')}",
+            headers={"Authorization": f"Basic {credentials}"},
+        )
+        try:
+            with urllib.request.urlopen(request, timeout=5) as response:
+                lengths[queue] = json.load(response).get("messages", 0)
+        except urllib.error.HTTPError as error:
+            # Celery declares queues lazily, a missing queue has no backlog
+            if error.code != 404:
+                raise
+            lengths[queue] = 0
+    return lengths
+
+
+def queue_lengths(broker_url: str, queues: Iterable[str]) -> Dict[str, int]:
+    scheme = urllib.parse.urlparse(broker_url).scheme
+    if scheme in ("redis", "rediss"):
+        return redis_queue_lengths(broker_url, queues)
+    if scheme.startswith("amqp"):
+        return rabbitmq_queue_lengths(broker_url, queues)
+    raise ValueError(f"Unsupported broker scheme '{scheme}'")
+
+
+def metric_data(lengths: Dict[str, int], dimensions: Dict[str, str]) -> List[dict]:
+    return [
+        {
+            "MetricName": "QueueLength",
+            "Dimensions": [
+                *({"Name": name, "Value": value} for name, value in dimensions.items()),
+                {"Name": "Queue", "Value": queue},
+            ],
+            "Value": length,
+            "Unit": "Count",
+        }
+        for queue, length in lengths.items()
+    ]
+
+
+def handler(event, context):
+    import boto3
+
+    secret = boto3.client("secretsmanager").get_secret_value(
+        SecretId=os.environ["BROKER_URL_SECRET_ARN"]
+    )
+    lengths = queue_lengths(secret["SecretString"], os.environ["QUEUES"].split(","))
+
+    boto3.client("cloudwatch").put_metric_data(
+        Namespace=os.environ["METRIC_NAMESPACE"],
+        MetricData=metric_data(lengths, {"Chain": os.environ["CHAIN_NAME"]}),
+    )
+    return lengths
@@ -0,0 +1,73 @@
+"""Custom resource handler that applies the queue defaults and policies of an Amazon MQ RabbitMQ broker."""
+import base64
+import json
+import urllib.error
+import urllib.parse
+import urllib.request
+from typing import Optional
+
+POLICY_NAME = "safe-max-length"
+# Above the mirroring policy Amazon MQ creates with priority 0
+POLICY_PRIORITY = 1
+
+
+class ManagementApi:
+    """Client for the RabbitMQ management API, Amazon MQ serves it over HTTPS on the AMQP host."""
+
+    def __init__(self, broker_url: str, management_url: Optional[str] = None):
+        parsed = urllib.parse.urlparse(broker_url)
+        self._url = management_url or f"https://{parsed.hostname}"
+        self.vhost = urllib.parse.quote(urllib.parse.unquote(parsed.path[1:]) or "/", safe="")
+        self._credentials = base64.b64encode(
+            f"{urllib.parse.unquote(parsed.username)}:{urllib.parse.unquote(parsed.password)}".encode()
+        ).decode()
+
+    def request(self, method: str, path: str, body: Optional[dict] = None):
+        request = urllib.request.Request(
+            f"{self._url}/api/{path}",
+            method=method,
+            data=json.dumps(body).encode() if body is not None else None,
+            headers={"Authorization": f"Basic {self._credentials}", "Content-Type": "application/json"},
+        )
+        with urllib.request.urlopen(request, timeout=10) as response:
+            return response.status
+
+    def set_default_queue_type(self, queue_type: str):
+        self.request("PUT", f"vhosts/{self.vhost}", {"default_queue_type": queue_type})
+
+    def set_policy(self, definition: dict):
+        self.request(
+            "PUT",
+            f"policies/{self.vhost}/{POLICY_NAME}",
+            {"pattern": ".*", "apply-to": "queues", "priority": POLICY_PRIORITY, "definition": definition},
+        )
+
+    def delete_policy(self):
+        try:
+            self.request("DELETE", f"policies/{self.vhost}/{POLICY_NAME}")
+        except urllib.error.HTTPError as error:
+            if error.code != 404:
+                raise
+
+
+def broker_url(secret_arn: str) -> str:
+    import boto3
+
+    return boto3.client("secretsmanager").get_secret_value(SecretId=secret_arn)["SecretString"]
+
+
+def on_event(event, context):
+    properties = event["ResourceProperties"]
+    api = ManagementApi(broker_url(properties["BrokerUrlSecretArn"]))
+    physical_resource_id = f"{properties['BrokerId']}/{POLICY_NAME}"
+
+    if event["RequestType"] == "Delete":
+        api.delete_policy()
+        return {"PhysicalResourceId": physical_resource_id}
+
+    api.set_default_queue_type(properties["DefaultQueueType"])
+    if properties.get("Policy"):
+        api.set_policy(json.loads(properties["Policy"]))
+    else:
+        api.delete_policy()
+    return {"PhysicalResourceId": physical_resource_id}
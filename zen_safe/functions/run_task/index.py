@@ -0,0 +1,58 @@
+"""Custom resource handlers that run an ECS task to completion during a deployment."""
+
+
+def ecs_client():
+    import boto3
+
+    return boto3.client("ecs")
+
+
+def on_event(event, context):
+    if event["RequestType"] == "Delete":
+        return {"PhysicalResourceId": event["PhysicalResourceId"]}
+
+    properties = event["ResourceProperties"]
+    response = ecs_client().run_task(
+        cluster=properties["Cluster"],
+        taskDefinition=properties["TaskDefinition"],
+        launchType="FARGATE",
+        count=1,
+        startedBy="cloudformation",
+        networkConfiguration={
+            "awsvpcConfiguration": {
+                "subnets": properties["Subnets"],
+                "securityGroups": properties["SecurityGroups"],
+                "assignPublicIp": "DISABLED",
+            }
+        },
+    )
+    if response["failures"]:
+        raise RuntimeError(f"Could not start task: {response['failures']}")
+
+    task_arn = response["tasks"][0]["taskArn"]
+    print(f"Started {task_arn}")
+    return {"PhysicalResourceId": task_arn, "Data": {"TaskArn": task_arn}}
+
+
+def is_complete(event, context):
+    if event["RequestType"] == "Delete":
+        return {"IsComplete": True}
+
+    properties = event["ResourceProperties"]
+    response = ecs_client().describe_tasks(
+        cluster=properties["Cluster"], tasks=[event["PhysicalResourceId"]]
+    )
+    if response["failures"]:
+        raise RuntimeError(f"Could not describe task: {response['failures']}")
+
+    task = response["tasks"][0]
+    if task["lastStatus"] != "STOPPED":
+        return {"IsComplete": False}
+
+    for container in task["containers"]:
+        if container.get("exitCode") != 0:
+            raise RuntimeError(
+                f"Container {container['name']} of {task['taskArn']} failed with exit code "
+                f"{container.get('exitCode')}: {container.get('reason') or task.get('stoppedReason')}"
+            )
+    return {"IsComplete": True}
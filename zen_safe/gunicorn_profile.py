@@ -0,0 +1,62 @@
+from dataclasses import dataclass
+from typing import Dict
+
+GUNICORN_WORKER_CLASSES = ("sync", "gthread", "gevent")
+
+
+@dataclass(frozen=True)
+class GunicornProfile:
+    """Gunicorn settings that are sized from the task's CPU and memory."""
+
+    worker_class: str = "gthread"
+    workers_per_vcpu: int = 2
+    # Threads per worker for gthread, concurrent connections per worker for gevent
+    threads: int = 4
+    memory_per_worker_mib: int = 256
+    # Left to the container runtime, the master process and the ECS agent
+    reserved_memory_mib: int = 128
+    preload: bool = True
+    # Longer than the 60s ALB idle timeout, so the ALB closes idle connections before gunicorn does
+    keepalive: int = 75
+    timeout: int = 60
+    max_requests: int = 1000
+    max_requests_jitter: int = 100
+
+    def __post_init__(self):
+        if self.worker_class not in GUNICORN_WORKER_CLASSES:
+            raise ValueError(
+                f"Unknown gunicorn worker class '{self.worker_class}', expected one of {GUNICORN_WORKER_CLASSES}"
+            )
+        if self.max_requests_jitter > self.max_requests:
+            raise ValueError("max_requests_jitter can't be larger than max_requests")
+
+    def workers(self, cpu: int, memory_limit_mib: int) -> int:
+        by_cpu = int(self.workers_per_vcpu * cpu / 1024) + 1
+        by_memory = (memory_limit_mib - self.reserved_memory_mib) // self.memory_per_worker_mib
+        return max(1, min(by_cpu, by_memory))
+
+    def command_args(self, cpu: int, memory_limit_mib: int) -> str:
+        args = [
+            f"--workers={self.workers(cpu, memory_limit_mib)}",
+            f"--worker-class={self.worker_class}",
+            f"--keep-alive={self.keepalive}",
+            f"--timeout={self.timeout}",
+            f"--max-requests={self.max_requests}",
+            f"--max-requests-jitter={self.max_requests_jitter}",
+        ]
+        if self.worker_class == "gthread":
+            args.append(f"--threads={self.threads}")
+        elif self.worker_class == "gevent":
+            args.append(f"--worker-connections={self.threads}")
+        if self.preload:
+            args.append("--preload")
+        return " ".join(args)
+
+    def environment(self, cpu: int, memory_limit_mib: int) -> Dict[str, str]:
+        # Gunicorn applies GUNICORN_CMD_ARGS on top of the image's config file
+        return {"GUNICORN_CMD_ARGS": self.command_args(cpu, memory_limit_mib)}
+
+
+GTHREAD = GunicornProfile()
+SYNC = GunicornProfile(worker_class="sync", threads=1)
+GEVENT = GunicornProfile(worker_class="gevent", workers_per_vcpu=1, threads=200, preload=False)
@@ -0,0 +1,124 @@
+import os
+from typing import Mapping, Sequence
+
+from aws_cdk import (
+    aws_cloudwatch as cloudwatch,
+    aws_cloudwatch_actions as cloudwatch_actions,
+    aws_ecs as ecs,
+    aws_events as events,
+    aws_events_targets as targets,
+    aws_iam as iam,
+    aws_lambda as lambda_,
+    Duration,
+    Stack,
+)
+from constructs import Construct
+
+from zen_safe.queue_depth_construct import METRIC_NAMESPACE
+
+
+class IndexerLagConstruct(Construct):
+    """Publishes the indexer lag as a metric, and optionally ends catch-up once the lag is small.
+
+    The lag comes from the service's public indexing status endpoint, so the function runs outside the VPC.
+    """
+
+    @property
+    def metric(self) -> cloudwatch.Metric:
+        return self._metric
+
+    @property
+    def caught_up_alarm(self):
+        return self._caught_up_alarm
+
+    def __init__(
+        self,
+        scope: Construct,
+        construct_id: str,
+        indexing_status_url: str,
+        chain_name: str,
+        schedule: Duration = Duration.minutes(5),
+    ) -> None:
+        super().__init__(scope, construct_id)
+
+        self._code = lambda_.Code.from_asset(
+            os.path.join(os.path.dirname(__file__), "functions", "indexer_lag")
+        )
+        publish_function = lambda_.Function(
+            self,
+            "PublishLagFunction",
+            runtime=lambda_.Runtime.PYTHON_3_12,
+            handler="index.publish_lag",
+            code=self._code,
+            timeout=Duration.seconds(30),
+            environment={
+                "INDEXING_STATUS_URL": indexing_status_url,
+                "METRIC_NAMESPACE": METRIC_NAMESPACE,
+                "CHAIN_NAME": chain_name,
+            },
+        )
+        publish_function.add_to_role_policy(
+            iam.PolicyStatement(
+                actions=["cloudwatch:PutMetricData"],
+                resources=["*"],
+                conditions={"StringEquals": {"cloudwatch:namespace": METRIC_NAMESPACE}},
+            )
+        )
+
+        events.Rule(
+            self,
+            "PublishLagSchedule",
+            schedule=events.Schedule.rate(schedule),
+            targets=[targets.LambdaFunction(publish_function)],
+        )
+
+        self._metric = cloudwatch.Metric(
+            namespace=METRIC_NAMESPACE,
+            metric_name="IndexerLag",
+            dimensions_map={"Chain": chain_name},
+            statistic=cloudwatch.Stats.MAXIMUM,
+            period=schedule,
+        )
+        self._caught_up_alarm = None
+
+    def revert_when_caught_up(
+        self,
+        lag_threshold_blocks: int,
+        steady_state: Sequence[Mapping],
+        services: Sequence[ecs.BaseService],
+    ) -> cloudwatch.Alarm:
+        """Restores the services' steady state desired counts and bounds once the lag stays below the threshold."""
+        revert_function = lambda_.Function(
+            self,
+            "RevertCatchUpFunction",
+            runtime=lambda_.Runtime.PYTHON_3_12,
+            handler="index.revert_catch_up",
+            code=self._code,
+            timeout=Duration.minutes(1),
+            environment={"STEADY_STATE": Stack.of(self).to_json_string(list(steady_state))},
+        )
+        revert_function.add_to_role_policy(
+            iam.PolicyStatement(
+                actions=["ecs:DescribeServices", "ecs:UpdateService"],
+                resources=[service.service_arn for service in services],
+            )
+        )
+        revert_function.add_to_role_policy(
+            iam.PolicyStatement(
+                actions=["application-autoscaling:RegisterScalableTarget"],
+                resources=["*"],
+            )
+        )
+
+        self._caught_up_alarm = cloudwatch.Alarm(
+            self,
+            "CaughtUpAlarm",
+            alarm_description="The indexer is within the catch-up lag threshold, workers go back to steady state",
+            metric=self._metric,
+            threshold=lag_threshold_blocks,
+            comparison_operator=cloudwatch.ComparisonOperator.LESS_THAN_THRESHOLD,
+            evaluation_periods=3,
+            treat_missing_data=cloudwatch.TreatMissingData.MISSING,
+        )
+        self._caught_up_alarm.add_alarm_action(cloudwatch_actions.LambdaAction(revert_function))
+        return self._caught_up_alarm
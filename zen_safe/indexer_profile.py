@@ -0,0 +1,77 @@
+from dataclasses import dataclass
+from typing import Dict
+
+
+@dataclass(frozen=True)
+class IndexerProfile:
+    """Transaction service indexer settings for a chain's block time, reorg depth and trace API limits."""
+
+    # L2 mode indexes Safe events instead of tracing every transaction
+    l2: bool = False
+    internal_txs_block_process_limit: int = 5000
+    # Blocks per trace_filter call
+    trace_blocks: int = 10
+    # Transactions per trace_transaction batch, 0 sends one request per transaction
+    trace_txs_batch_size: int = 0
+    events_block_process_limit: int = 50
+    # Upper bound for the events block range the indexer grows to, 0 leaves it unbounded
+    events_block_process_limit_max: int = 0
+    # Blocks that are checked again for reorgs
+    reorg_blocks: int = 10
+    # Database connections per process
+    db_max_conns: int = 15
+
+    def __post_init__(self):
+        for name in (
+            "internal_txs_block_process_limit",
+            "trace_blocks",
+            "events_block_process_limit",
+            "reorg_blocks",
+            "db_max_conns",
+        ):
+            if getattr(self, name) < 1:
+                raise ValueError(f"{name} must be positive")
+        if self.trace_txs_batch_size < 0 or self.events_block_process_limit_max < 0:
+            raise ValueError("trace_txs_batch_size and events_block_process_limit_max can't be negative")
+        if self.l2 and self.trace_txs_batch_size:
+            raise ValueError("L2 mode doesn't trace transactions, trace_txs_batch_size must be 0")
+        if not self.l2 and self.trace_blocks > self.internal_txs_block_process_limit:
+            raise ValueError("trace_blocks can't be larger than internal_txs_block_process_limit")
+        if 0 < self.events_block_process_limit_max < self.events_block_process_limit:
+            raise ValueError("events_block_process_limit_max can't be smaller than events_block_process_limit")
+
+    def environment(self) -> Dict[str, str]:
+        return {
+            "ETH_L2_NETWORK": "1" if self.l2 else "0",
+            "ETH_INTERNAL_TXS_BLOCK_PROCESS_LIMIT": str(self.internal_txs_block_process_limit),
+            "ETH_INTERNAL_TXS_NUMBER_TRACE_BLOCKS": str(self.trace_blocks),
+            "ETH_INTERNAL_TRACE_TXS_BATCH_SIZE": str(self.trace_txs_batch_size),
+            "ETH_EVENTS_BLOCK_PROCESS_LIMIT": str(self.events_block_process_limit),
+            "ETH_EVENTS_BLOCK_PROCESS_LIMIT_MAX": str(self.events_block_process_limit_max),
+            "ETH_REORG_BLOCKS": str(self.reorg_blocks),
+            "DB_MAX_CONNS": str(self.db_max_conns),
+        }
+
+
+# Short blocks and a sequencer that can reorg deeply, indexed through Safe events
+FAST_L2 = IndexerProfile(
+    l2=True,
+    events_block_process_limit=500,
+    events_block_process_limit_max=5000,
+    reorg_blocks=200,
+)
+# Testnet RPC nodes share their trace API, smaller batches keep calls under its limits
+ZENCHAIN_TESTNET = IndexerProfile(
+    internal_txs_block_process_limit=2000,
+    trace_blocks=5,
+    trace_txs_batch_size=50,
+    reorg_blocks=20,
+    db_max_conns=10,
+)
+ZENCHAIN_MAINNET = IndexerProfile()
+
+INDEXER_PROFILES = {
+    "fast-l2": FAST_L2,
+    "zenchain-testnet": ZENCHAIN_TESTNET,
+    "zenchain-mainnet": ZENCHAIN_MAINNET,
+}
@@ -0,0 +1,25 @@
+from typing import List
+
+
+def has_instance_store(instance_type: str) -> bool:
+    """Whether an instance type has NVMe instance storage, the i families and d variants such as c7gd."""
+    family = instance_type.split(".", 1)[0]
+    return family.startswith("i") or "d" in family[1:]
+
+
+def mount_instance_store_commands(path: str) -> List[str]:
+    """User data commands that format the instance store disks and mount them at path.
+
+    NVMe devices aren't enumerated in a fixed order on Nitro, the disks are found by their model instead
+    of their name. Several disks are striped into one volume.
+    """
+    return [
+        "dnf install -y mdadm",
+        "devices=$(lsblk -dpno NAME,MODEL | awk '/Instance Storage/ {print $1}')",
+        "if [ $(echo $devices | wc -w) -gt 1 ]; then "
+        "mdadm --create /dev/md0 --level=0 --raid-devices=$(echo $devices | wc -w) $devices; "
+        "device=/dev/md0; else device=$devices; fi",
+        "mkfs.xfs -f $device",
+        f"mkdir -p {path}",
+        f"mount -o noatime $device {path}",
+    ]
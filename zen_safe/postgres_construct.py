@@ -1,15 +1,27 @@
+from typing import Optional
+
 from aws_cdk import (
     aws_ec2 as ec2,
     aws_rds as rds,
+    aws_route53 as route53,
     aws_secretsmanager as secretsmanager,
+    Duration,
     SecretValue,
     Fn,
 )
 from constructs import Construct
 
+from zen_safe.database_monitoring import DatabaseMonitoring, add_slow_query_metric_filters
+from zen_safe.database_storage import DatabaseStorage
+from zen_safe.postgres_parameters import postgres_parameter_group
+
+POSTGRES_ENGINES = ("postgres", "aurora-serverless-v2")
+
+
 class PostgresDatabaseConstruct(Construct):
     @property
     def database_instance(self):
+        """The DatabaseInstance, or the DatabaseCluster for Aurora."""
         return self._database_instance
 
     @property
@@ -20,6 +32,39 @@ class PostgresDatabaseConstruct(Construct):
     def secret(self):
         return self._database_instance.secret
 
+    @property
+    def connections(self):
+        """Security group of the instance, its read replicas and its proxy."""
+        return self._database_instance.connections
+
+    @property
+    def proxy(self) -> Optional[rds.DatabaseProxy]:
+        return self._proxy
+
+    @property
+    def endpoint_address(self) -> str:
+        """Address clients connect to, the proxy when there is one."""
+        if self._proxy is not None:
+            return self._proxy.endpoint
+        if self._engine == "aurora-serverless-v2":
+            return self._database_instance.cluster_endpoint.hostname
+        return self._database_instance.db_instance_endpoint_address
+
+    @property
+    def query_metrics(self):
+        """SlowQueries and LockWaits counts from the Postgres log, empty without monitoring."""
+        return self._query_metrics
+
+    @property
+    def read_replicas(self):
+        """Read replica instances, Aurora readers are part of the cluster instead."""
+        return self._read_replicas
+
+    @property
+    def read_connection_string_secret(self) -> Optional[secretsmanager.ISecret]:
+        """Connection URL of the read replicas or the Aurora reader endpoint, None without readers."""
+        return self._read_connection_string_secret
+
     def __init__(
         self,
         scope: Construct,
@@ -31,18 +76,34 @@ class PostgresDatabaseConstruct(Construct):
         ),
         engine_version: rds.PostgresEngineVersion = rds.PostgresEngineVersion.VER_16_3,
         max_allocated_storage: int = 500,
+        read_replicas: int = 0,
+        proxy: bool = False,
+        parameter_profile: Optional[str] = None,
+        engine: str = "postgres",
+        aurora_engine_version: rds.AuroraPostgresEngineVersion = rds.AuroraPostgresEngineVersion.VER_16_3,
+        min_capacity: float = 0.5,
+        max_capacity: float = 8,
+        storage: Optional[DatabaseStorage] = None,
+        monitoring: Optional[DatabaseMonitoring] = None,
     ) -> None:
         super().__init__(scope, construct_id)
 
-        database_options = {
-            "engine": rds.DatabaseInstanceEngine.postgres(
-                version=engine_version
-            ),
-            "instance_type": instance_type,
-            "vpc": vpc,
-            "vpc_subnets": ec2.SubnetSelection(subnet_type=ec2.SubnetType.PRIVATE_WITH_EGRESS),
-            "max_allocated_storage": max_allocated_storage,
-        }
+        if read_replicas < 0:
+            raise ValueError("read_replicas can't be negative")
+        if engine not in POSTGRES_ENGINES:
+            raise ValueError(f"Unknown engine '{engine}', expected one of {POSTGRES_ENGINES}")
+        if engine == "aurora-serverless-v2" and not 0.5 <= min_capacity <= max_capacity <= 256:
+            raise ValueError("Aurora capacity must satisfy 0.5 <= min_capacity <= max_capacity <= 256")
+        if engine == "aurora-serverless-v2" and storage is not None:
+            raise ValueError("Aurora manages its own storage, storage only applies to the postgres engine")
+        self._engine = engine
+
+        parameter_options = {}
+        if monitoring is not None:
+            parameter_options = {
+                "preload_libraries": monitoring.preload_libraries,
+                "settings": monitoring.parameters(),
+            }
 
         # Explicitly create a Secrets Manager secret for database credentials
         self._credentials_secret = secretsmanager.Secret(
@@ -56,18 +117,178 @@ class PostgresDatabaseConstruct(Construct):
             )
         )
 
-        self._database_instance = rds.DatabaseInstance(
-            self,
-            "DatabaseInstance",
-            **{**database_options, "credentials": rds.Credentials.from_secret(self._credentials_secret)}
-        )
+        if engine == "aurora-serverless-v2":
+            cluster_engine = rds.DatabaseClusterEngine.aurora_postgres(version=aurora_engine_version)
+            # Memory follows the cluster's capacity, only the size independent settings apply
+            parameter_group = None
+            if parameter_profile is not None or monitoring is not None:
+                parameter_group = postgres_parameter_group(
+                    self, "ParameterGroup", cluster_engine, None, parameter_profile, **parameter_options
+                )
+            cluster_instance_options = monitoring.cluster_instance_options() if monitoring is not None else {}
+
+            self._database_instance = rds.DatabaseCluster(
+                self,
+                "DatabaseCluster",
+                engine=cluster_engine,
+                credentials=rds.Credentials.from_secret(self._credentials_secret),
+                writer=rds.ClusterInstance.serverless_v2("Writer", **cluster_instance_options),
+                # The first reader scales with the writer, so a failover lands on a warm instance
+                readers=[
+                    rds.ClusterInstance.serverless_v2(
+                        f"Reader{index + 1}", scale_with_writer=index == 0, **cluster_instance_options
+                    )
+                    for index in range(read_replicas)
+                ],
+                serverless_v2_min_capacity=min_capacity,
+                serverless_v2_max_capacity=max_capacity,
+                parameter_group=parameter_group,
+                port=5432,
+                storage_encrypted=True,
+                vpc=vpc,
+                vpc_subnets=ec2.SubnetSelection(subnet_type=ec2.SubnetType.PRIVATE_WITH_EGRESS),
+                **(monitoring.cluster_options() if monitoring is not None else {}),
+            )
+            proxy_target = rds.ProxyTarget.from_cluster(self._database_instance)
+            port = "5432"
+            log_group_name = f"/aws/rds/cluster/{self._database_instance.cluster_identifier}/postgresql"
+        else:
+            instance_engine = rds.DatabaseInstanceEngine.postgres(version=engine_version)
+            if storage is not None:
+                instance_options = storage.instance_options(instance_type)
+            else:
+                instance_options = {"max_allocated_storage": max_allocated_storage}
+            if monitoring is not None:
+                instance_options = {**instance_options, **monitoring.instance_options()}
+            parameter_group = None
+            if parameter_profile is not None or monitoring is not None:
+                parameter_group = postgres_parameter_group(
+                    self, "ParameterGroup", instance_engine, instance_type, parameter_profile, **parameter_options
+                )
+
+            self._database_instance = rds.DatabaseInstance(
+                self,
+                "DatabaseInstance",
+                engine=instance_engine,
+                instance_type=instance_type,
+                vpc=vpc,
+                vpc_subnets=ec2.SubnetSelection(subnet_type=ec2.SubnetType.PRIVATE_WITH_EGRESS),
+                parameter_group=parameter_group,
+                **instance_options,
+                credentials=rds.Credentials.from_secret(self._credentials_secret),
+            )
+            proxy_target = rds.ProxyTarget.from_instance(self._database_instance)
+            port = self._database_instance.db_instance_endpoint_port
+            log_group_name = f"/aws/rds/instance/{self._database_instance.instance_identifier}/postgresql"
+
+        self._query_metrics = {}
+        if monitoring is not None:
+            self._query_metrics = add_slow_query_metric_filters(
+                self, log_group_name, construct_id, self._database_instance
+            )
+
+        self._proxy = None
+        if proxy:
+            self._proxy = add_database_proxy(
+                self,
+                "DatabaseProxy",
+                vpc=vpc,
+                proxy_target=proxy_target,
+                secret=self._credentials_secret,
+                connections=self._database_instance.connections,
+            )
+            port = "5432"
 
         # Construct the database connection URL
-        connection_string = f"postgresql://{self._credentials_secret.secret_value_from_json('username').unsafe_unwrap()}:{self._credentials_secret.secret_value_from_json('password').unsafe_unwrap()}@{self._database_instance.db_instance_endpoint_address}:{self._database_instance.db_instance_endpoint_port}/{database_name}"
+        connection_string = self._connection_string(self.endpoint_address, port, database_name)
 
         # Store the database URL in a *separate* Secrets Manager secret
         self._connection_string_secret = secretsmanager.Secret(
             self, "DatabaseUrlSecret",
             secret_name=f"{construct_id.lower()}-database-url",
             secret_string_value=SecretValue.unsafe_plain_text(connection_string)
-        )
\ No newline at end of file
+        )
+
+        # Replicas share the primary's security group, so access granted to the primary covers them too
+        self._read_replicas = [
+            rds.DatabaseInstanceReadReplica(
+                self,
+                f"ReadReplica{index + 1}",
+                source_database_instance=self._database_instance,
+                instance_type=instance_type,
+                vpc=vpc,
+                vpc_subnets=ec2.SubnetSelection(subnet_type=ec2.SubnetType.PRIVATE_WITH_EGRESS),
+                security_groups=self._database_instance.connections.security_groups,
+                parameter_group=parameter_group,
+                **instance_options,
+            )
+            for index in range(read_replicas if engine == "postgres" else 0)
+        ]
+
+        self._read_connection_string_secret = None
+        if read_replicas:
+            if engine == "aurora-serverless-v2":
+                # The reader endpoint balances connections across all readers
+                read_address, read_port = self._database_instance.cluster_read_endpoint.hostname, "5432"
+            elif read_replicas == 1:
+                read_address = self._read_replicas[0].db_instance_endpoint_address
+                read_port = self._read_replicas[0].db_instance_endpoint_port
+            else:
+                # Instance replicas have no shared endpoint, a weighted record answers each lookup with one of
+                # them and its short TTL lets every new connection resolve again
+                read_zone = route53.PrivateHostedZone(
+                    self, "ReadReplicaZone", zone_name=f"{construct_id.lower()}.db.internal", vpc=vpc
+                )
+                for index, replica in enumerate(self._read_replicas):
+                    route53.CfnRecordSet(
+                        self,
+                        f"ReadReplicaRecord{index + 1}",
+                        hosted_zone_id=read_zone.hosted_zone_id,
+                        name=f"read.{read_zone.zone_name}",
+                        type="CNAME",
+                        ttl="5",
+                        resource_records=[replica.db_instance_endpoint_address],
+                        set_identifier=f"replica-{index + 1}",
+                        weight=1,
+                    )
+                read_address = f"read.{read_zone.zone_name}"
+                read_port = self._read_replicas[0].db_instance_endpoint_port
+            self._read_connection_string_secret = secretsmanager.Secret(
+                self, "DatabaseReadReplicaUrlSecret",
+                secret_name=f"{construct_id.lower()}-database-read-replica-url",
+                secret_string_value=SecretValue.unsafe_plain_text(
+                    self._connection_string(read_address, read_port, database_name)
+                ),
+            )
+
+    def _connection_string(self, address: str, port: str, database_name: str) -> str:
+        return f"postgresql://{self._credentials_secret.secret_value_from_json('username').unsafe_unwrap()}:{self._credentials_secret.secret_value_from_json('password').unsafe_unwrap()}@{address}:{port}/{database_name}"
+
+
+def add_database_proxy(
+    scope: Construct,
+    construct_id: str,
+    vpc: ec2.IVpc,
+    proxy_target: rds.ProxyTarget,
+    secret: secretsmanager.ISecret,
+    connections: ec2.Connections,
+) -> rds.DatabaseProxy:
+    """Pools client connections in front of a database, so task count no longer bounds max_connections.
+
+    The proxy joins the database's security group, whatever may reach the database may reach the proxy.
+    """
+    connections.allow_internally(ec2.Port.tcp(5432), "RDS Proxy")
+    return rds.DatabaseProxy(
+        scope,
+        construct_id,
+        proxy_target=proxy_target,
+        secrets=[secret],
+        vpc=vpc,
+        vpc_subnets=ec2.SubnetSelection(subnet_type=ec2.SubnetType.PRIVATE_WITH_EGRESS),
+        security_groups=connections.security_groups,
+        # The services connect without TLS, like they do to the instance
+        require_tls=False,
+        idle_client_timeout=Duration.minutes(30),
+        borrow_timeout=Duration.seconds(30),
+        max_connections_percent=90,
+    )
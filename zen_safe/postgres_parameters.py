@@ -0,0 +1,177 @@
+import re
+from dataclasses import dataclass, field, replace
+from typing import Dict, Mapping, Optional, Sequence, Tuple
+
+from aws_cdk import (
+    aws_ec2 as ec2,
+    aws_rds as rds,
+)
+from constructs import Construct
+
+# Memory of the burstable sizes, the other families have a fixed amount of memory per vCPU
+_BURSTABLE_MEMORY_GIB = {
+    "micro": 1,
+    "small": 2,
+    "medium": 4,
+    "large": 8,
+    "xlarge": 16,
+    "2xlarge": 32,
+}
+_MEMORY_GIB_PER_VCPU = {"c": 2, "m": 4, "r": 8, "x": 16}
+# Aurora's storage layer owns WAL, checkpoints and I/O, these can't be set on a cluster
+_AURORA_MANAGED_SETTINGS = frozenset({
+    "effective_io_concurrency",
+    "max_wal_size",
+    "checkpoint_timeout",
+    "wal_compression",
+})
+
+
+def instance_memory_mib(instance_type: ec2.InstanceType) -> int:
+    """Memory of a database instance class, e.g. 2048 for t4g.small."""
+    family, size = instance_type.to_string().split(".", 1)
+    if family.startswith("t"):
+        if size not in _BURSTABLE_MEMORY_GIB:
+            raise ValueError(f"Unknown size for instance type '{instance_type.to_string()}'")
+        return _BURSTABLE_MEMORY_GIB[size] * 1024
+
+    match = re.fullmatch(r"(\d*)xlarge|large", size)
+    if family[0] not in _MEMORY_GIB_PER_VCPU or match is None:
+        raise ValueError(f"Can't size parameters for instance type '{instance_type.to_string()}'")
+    vcpus = 2 if size == "large" else 4 * int(match.group(1) or 1)
+    return vcpus * _MEMORY_GIB_PER_VCPU[family[0]] * 1024
+
+
+@dataclass(frozen=True)
+class PostgresParameterProfile:
+    """Postgres settings for a workload, memory settings are fractions of the instance's memory."""
+
+    shared_buffers_ratio: float = 0.25
+    effective_cache_size_ratio: float = 0.75
+    work_mem_ratio: float = 0.002
+    maintenance_work_mem_ratio: float = 0.05
+    shared_preload_libraries: Tuple[str, ...] = ("pg_stat_statements",)
+    # Settings that don't depend on the instance size, in the units RDS expects
+    settings: Mapping[str, str] = field(default_factory=dict)
+
+    def __post_init__(self):
+        if "pg_stat_statements" not in self.shared_preload_libraries:
+            raise ValueError("Every parameter profile must load pg_stat_statements")
+        if self.shared_buffers_ratio + self.work_mem_ratio > 0.5:
+            raise ValueError("shared_buffers and work_mem can't take more than half of the instance's memory")
+
+    def parameters(self, instance_type: ec2.InstanceType) -> Dict[str, str]:
+        memory_mib = instance_memory_mib(instance_type)
+        return {
+            # shared_buffers and effective_cache_size are in 8kB pages, the others in kB
+            "shared_buffers": str(int(memory_mib * self.shared_buffers_ratio) * 128),
+            "effective_cache_size": str(int(memory_mib * self.effective_cache_size_ratio) * 128),
+            "work_mem": str(max(4096, int(memory_mib * self.work_mem_ratio * 1024))),
+            # Autovacuum workers can't use more than 1GB
+            "maintenance_work_mem": str(min(1048576, max(65536, int(memory_mib * self.maintenance_work_mem_ratio * 1024)))),
+            **self.size_independent_parameters(),
+        }
+
+    def size_independent_parameters(self) -> Dict[str, str]:
+        return {
+            "shared_preload_libraries": ",".join(self.shared_preload_libraries),
+            "pg_stat_statements.track": "top",
+            **self.settings,
+        }
+
+    def aurora_parameters(self) -> Dict[str, str]:
+        """Parameters for Aurora Serverless v2, whose memory settings follow its capacity."""
+        return {
+            name: value
+            for name, value in self.size_independent_parameters().items()
+            if name not in _AURORA_MANAGED_SETTINGS
+        }
+
+
+# Insert heavy indexer tables: vacuum and analyze early and often, spread checkpoints out
+INDEXER_OLTP = PostgresParameterProfile(
+    work_mem_ratio=0.0025,
+    maintenance_work_mem_ratio=0.05,
+    settings={
+        "random_page_cost": "1.1",
+        "effective_io_concurrency": "200",
+        "autovacuum_naptime": "15",
+        "autovacuum_vacuum_scale_factor": "0.02",
+        "autovacuum_vacuum_insert_scale_factor": "0.02",
+        "autovacuum_analyze_scale_factor": "0.01",
+        "autovacuum_vacuum_cost_limit": "2000",
+        "max_wal_size": "4096",
+        "checkpoint_timeout": "900",
+        "wal_compression": "on",
+    },
+)
+# Read mostly APIs: more memory for sorts and better statistics, no JIT for short queries
+API_READ = PostgresParameterProfile(
+    work_mem_ratio=0.005,
+    maintenance_work_mem_ratio=0.03,
+    settings={
+        "random_page_cost": "1.1",
+        "effective_io_concurrency": "200",
+        "default_statistics_target": "200",
+        "autovacuum_vacuum_scale_factor": "0.05",
+        "autovacuum_analyze_scale_factor": "0.02",
+        "jit": "0",
+    },
+)
+# Small, rarely written configuration data
+SMALL_CONFIG = PostgresParameterProfile(
+    work_mem_ratio=0.002,
+    maintenance_work_mem_ratio=0.03,
+    settings={
+        "random_page_cost": "1.1",
+        "jit": "0",
+    },
+)
+
+POSTGRES_PARAMETER_PROFILES: Dict[str, PostgresParameterProfile] = {
+    "indexer-oltp": INDEXER_OLTP,
+    "api-read": API_READ,
+    "small-config": SMALL_CONFIG,
+}
+
+
+def postgres_parameter_group(
+    scope: Construct,
+    construct_id: str,
+    engine: rds.IEngine,
+    instance_type: Optional[ec2.InstanceType],
+    profile_name: Optional[str],
+    preload_libraries: Sequence[str] = (),
+    settings: Mapping[str, str] = {},
+) -> rds.ParameterGroup:
+    """A parameter group for an instance class, or for an Aurora Serverless v2 cluster without one.
+
+    Without a profile only pg_stat_statements, the extra libraries and the extra settings are set.
+    """
+    if profile_name is not None and profile_name not in POSTGRES_PARAMETER_PROFILES:
+        raise ValueError(
+            f"Unknown parameter profile '{profile_name}', expected one of {tuple(POSTGRES_PARAMETER_PROFILES)}"
+        )
+    profile = POSTGRES_PARAMETER_PROFILES.get(profile_name, PostgresParameterProfile())
+    profile = replace(
+        profile,
+        shared_preload_libraries=(*profile.shared_preload_libraries, *preload_libraries),
+        settings={**profile.settings, **settings},
+    )
+
+    if instance_type is None:
+        description = "Aurora Serverless v2"
+        parameters = profile.aurora_parameters()
+    elif profile_name is None:
+        description = instance_type.to_string()
+        parameters = profile.size_independent_parameters()
+    else:
+        description = instance_type.to_string()
+        parameters = profile.parameters(instance_type)
+    return rds.ParameterGroup(
+        scope,
+        construct_id,
+        engine=engine,
+        description=f"{profile_name or 'default'} parameters for {description}",
+        parameters=parameters,
+    )
@@ -0,0 +1,98 @@
+import os
+from typing import Sequence
+
+from aws_cdk import (
+    aws_cloudwatch as cloudwatch,
+    aws_ec2 as ec2,
+    aws_events as events,
+    aws_events_targets as targets,
+    aws_iam as iam,
+    aws_lambda as lambda_,
+    aws_secretsmanager as secretsmanager,
+    Duration,
+)
+from constructs import Construct
+
+METRIC_NAMESPACE = "SafeTransactionService"
+
+
+class QueueDepthMetricsConstruct(Construct):
+    @property
+    def connections(self):
+        return self._function.connections
+
+    @property
+    def function(self):
+        return self._function
+
+    def __init__(
+        self,
+        scope: Construct,
+        construct_id: str,
+        vpc: ec2.IVpc,
+        broker_url_secret: secretsmanager.ISecret,
+        queues: Sequence[str],
+        chain_name: str,
+        schedule: Duration = Duration.minutes(1),
+    ) -> None:
+        super().__init__(scope, construct_id)
+
+        self._chain_name = chain_name
+
+        self._function = lambda_.Function(
+            self,
+            "QueueDepthFunction",
+            runtime=lambda_.Runtime.PYTHON_3_12,
+            handler="index.handler",
+            code=lambda_.Code.from_asset(
+                os.path.join(os.path.dirname(__file__), "functions", "queue_depth")
+            ),
+            timeout=Duration.seconds(30),
+            vpc=vpc,
+            vpc_subnets=ec2.SubnetSelection(subnet_type=ec2.SubnetType.PRIVATE_WITH_EGRESS),
+            environment={
+                "BROKER_URL_SECRET_ARN": broker_url_secret.secret_arn,
+                "QUEUES": ",".join(queues),
+                "METRIC_NAMESPACE": METRIC_NAMESPACE,
+                "CHAIN_NAME": chain_name,
+            },
+        )
+        broker_url_secret.grant_read(self._function)
+        self._function.add_to_role_policy(
+            iam.PolicyStatement(
+                actions=["cloudwatch:PutMetricData"],
+                resources=["*"],
+                conditions={"StringEquals": {"cloudwatch:namespace": METRIC_NAMESPACE}},
+            )
+        )
+
+        events.Rule(
+            self,
+            "QueueDepthSchedule",
+            schedule=events.Schedule.rate(schedule),
+            targets=[targets.LambdaFunction(self._function)],
+        )
+
+    def metric_queue_length(self, queue: str, period: Duration = Duration.minutes(1)) -> cloudwatch.Metric:
+        return cloudwatch.Metric(
+            namespace=METRIC_NAMESPACE,
+            metric_name="QueueLength",
+            dimensions_map={"Chain": self._chain_name, "Queue": queue},
+            statistic=cloudwatch.Stats.MAXIMUM,
+            period=period,
+        )
+
+    def metric_backlog(self, queues: Sequence[str], period: Duration = Duration.minutes(1)) -> cloudwatch.IMetric:
+        if len(queues) == 1:
+            return self.metric_queue_length(queues[0], period)
+
+        using_metrics = {
+            f"q{index}": self.metric_queue_length(queue, period)
+            for index, queue in enumerate(queues)
+        }
+        return cloudwatch.MathExpression(
+            expression=" + ".join(f"FILL({name}, 0)" for name in using_metrics),
+            using_metrics=using_metrics,
+            label="Backlog " + ",".join(queues),
+            period=period,
+        )
@@ -1,13 +1,24 @@
+import json
+import os
+from typing import Optional
+
 from aws_cdk import (
+    aws_cloudwatch as cloudwatch,
     aws_ec2 as ec2,
+    aws_lambda as lambda_,
     Tags,
     aws_secretsmanager as secretsmanager,
     aws_amazonmq as mq,
-    CfnOutput, Fn,
+    custom_resources as cr,
+    CfnOutput, CustomResource, Duration, Fn,
 )
 import aws_cdk as cdk
 from constructs import Construct
-from urllib.parse import urlparse
+
+from zen_safe.rabbitmq_profile import RABBITMQ_PROFILES
+
+MQ_DEPLOYMENT_MODES = ("SINGLE_INSTANCE", "CLUSTER_MULTI_AZ")
+METRIC_NAMESPACE = "AWS/AmazonMQ"
 
 
 class RabbitMQConstruct(Construct):
@@ -27,9 +38,41 @@ class RabbitMQConstruct(Construct):
     def broker(self): # Expose the broker
         return self._broker
 
-    def __init__(self, scope: Construct, construct_id: str, vpc: ec2.IVpc, mq_node_type: str="mq.t3.small") -> None:
+    @property
+    def configuration(self):
+        return self._configuration
+
+    def __init__(
+        self,
+        scope: Construct,
+        construct_id: str,
+        vpc: ec2.IVpc,
+        mq_node_type: str = "mq.t3.small",
+        deployment_mode: str = "SINGLE_INSTANCE",
+        profile: str = "events",
+        connection_scheme: str = "amqp+ssl",
+        broker_name: Optional[str] = None,
+        secret_name_prefix: Optional[str] = None,
+    ) -> None:
         super().__init__(scope, construct_id)
 
+        if deployment_mode not in MQ_DEPLOYMENT_MODES:
+            raise ValueError(
+                f"Unknown deployment_mode '{deployment_mode}', expected one of {MQ_DEPLOYMENT_MODES}"
+            )
+        if deployment_mode == "CLUSTER_MULTI_AZ" and mq_node_type.startswith("mq.t3."):
+            raise ValueError(f"Clustered brokers need an mq.m5 instance type, got '{mq_node_type}'")
+        if profile not in RABBITMQ_PROFILES:
+            raise ValueError(f"Unknown RabbitMQ profile '{profile}', expected one of {tuple(RABBITMQ_PROFILES)}")
+        rabbitmq_profile = RABBITMQ_PROFILES[profile]
+        clustered = deployment_mode == "CLUSTER_MULTI_AZ"
+        if broker_name is None:
+            # Broker names are unique in an account and region, metrics are dimensioned by them
+            broker_name = cdk.Names.unique_resource_name(self, max_length=50, separator="-")
+        if secret_name_prefix is None:
+            # Secret names are unique in an account and region too
+            secret_name_prefix = construct_id.lower()
+
         sg_rabbitmq = ec2.SecurityGroup(
             self,
             "RabbitMQServerSG",
@@ -52,7 +95,7 @@ class RabbitMQConstruct(Construct):
         # Create a Secrets Manager secret for the RabbitMQ user and password
         self._secret = secretsmanager.Secret(
             self, f"RabbitMQSecret",
-            secret_name=f"rabbitmq-credentials",
+            secret_name=f"{secret_name_prefix}-credentials",
             generate_secret_string=secretsmanager.SecretStringGenerator(
                 secret_string_template='{"username": "rabbitmq", "url": ""}',
                 generate_string_key="password",
@@ -60,15 +103,29 @@ class RabbitMQConstruct(Construct):
             )
         )
 
+        self._configuration = mq.CfnConfiguration(
+            self, "RabbitMQConfiguration",
+            name=cdk.Names.unique_resource_name(self, max_length=150, separator="-"),
+            engine_type="RABBITMQ",
+            engine_version="3.13",
+            data=Fn.base64(rabbitmq_profile.configuration()),
+            description=f"rabbitmq.conf of the {profile} broker",
+        )
+
+        # A single instance broker takes exactly one subnet, a cluster spreads its three nodes over all of them
+        subnet_ids = vpc.select_subnets(subnet_type=ec2.SubnetType.PRIVATE_WITH_EGRESS).subnet_ids
+        if not clustered:
+            subnet_ids = subnet_ids[:1]
+
         # Create the RabbitMQ broker
         self._broker = mq.CfnBroker(
             self, "RabbitMQBroker",
-            broker_name="MyRabbitMQBroker",
+            broker_name=broker_name,
             engine_type="RabbitMQ",
             engine_version="3.13.x",
             host_instance_type=mq_node_type,
             publicly_accessible=False,
-            subnet_ids=vpc.select_subnets(subnet_type=ec2.SubnetType.PRIVATE_WITH_EGRESS).subnet_ids,
+            subnet_ids=subnet_ids,
             security_groups=[sg_rabbitmq.security_group_id],
             users=[
                 mq.CfnBroker.UserProperty(
@@ -76,26 +133,101 @@ class RabbitMQConstruct(Construct):
                     password=self._secret.secret_value_from_json("password").to_string(),
                 )
             ],
+            configuration=mq.CfnBroker.ConfigurationIdProperty(
+                id=self._configuration.attr_id,
+                revision=self._configuration.attr_revision,
+            ),
             auto_minor_version_upgrade=True,
-            deployment_mode="SINGLE_INSTANCE"
+            deployment_mode=deployment_mode,
         )
 
         amqp_url = Fn.select(0, self._broker.attr_amqp_endpoints)
         connection_string = create_mq_connection_string(
             username=self._secret.secret_value_from_json("username").to_string(),
             password=self._secret.secret_value_from_json("password").to_string(),
-            host=urlparse(amqp_url).hostname,
-            port=5671
+            # The endpoint is only known at deploy time, "amqps://host:5671" is split by CloudFormation
+            host=Fn.select(0, Fn.split(":", Fn.select(1, Fn.split("://", amqp_url)))),
+            port=5671,
+            scheme=connection_scheme,
         )
         self._connection_string_secret = secretsmanager.Secret(
             self, f"RabbitMQConnectionStringSecret",
-            secret_name=f"rabbitmq-connection-string",
+            secret_name=f"{secret_name_prefix}-connection-string",
             secret_string_value=cdk.SecretValue.unsafe_plain_text(connection_string)
         )
 
+        # The default queue type and queue policies are only set through the management API
+        policies_handler = lambda_.Function(
+            self,
+            "PoliciesHandler",
+            runtime=lambda_.Runtime.PYTHON_3_12,
+            handler="index.on_event",
+            code=lambda_.Code.from_asset(
+                os.path.join(os.path.dirname(__file__), "functions", "rabbitmq_policies")
+            ),
+            timeout=Duration.minutes(1),
+            vpc=vpc,
+            vpc_subnets=ec2.SubnetSelection(subnet_type=ec2.SubnetType.PRIVATE_WITH_EGRESS),
+        )
+        self._connection_string_secret.grant_read(policies_handler)
+        policies_handler.connections.allow_to(self._connections, ec2.Port.tcp(443), "RabbitMQManagement")
+        policy = rabbitmq_profile.policy_definition(mirrored=clustered)
+        CustomResource(
+            self,
+            "Policies",
+            service_token=cr.Provider(self, "PoliciesProvider", on_event_handler=policies_handler).service_token,
+            properties={
+                "BrokerId": self._broker.ref,
+                "BrokerUrlSecretArn": self._connection_string_secret.secret_arn,
+                "DefaultQueueType": rabbitmq_profile.default_queue_type,
+                "Policy": json.dumps(policy, sort_keys=True) if policy is not None else "",
+            },
+        )
+
          # Output the AMQP URL and other useful attributes
         CfnOutput(self, "RabbitMQAmqpUrl", value=amqp_url)
         CfnOutput(self, "RabbitMQArn", value=self.broker.attr_arn)
 
-def create_mq_connection_string(username: str, password: str, host: str, port: int) -> str:
-    return f"amqp+ssl://{username}:{password}@{host}:{port}/"
+    def metric(
+        self,
+        metric_name: str,
+        statistic: str = cloudwatch.Stats.AVERAGE,
+        period: Duration = Duration.minutes(1),
+    ) -> cloudwatch.Metric:
+        """A broker metric of Amazon MQ, e.g. MessageCount, PublishRate, AckRate or RabbitMQMemUsed."""
+        return cloudwatch.Metric(
+            namespace=METRIC_NAMESPACE,
+            metric_name=metric_name,
+            dimensions_map={"Broker": self._broker.broker_name},
+            statistic=statistic,
+            period=period,
+        )
+
+    def metric_queue(
+        self,
+        metric_name: str,
+        queue: str,
+        virtual_host: str = "/",
+        statistic: str = cloudwatch.Stats.MAXIMUM,
+        period: Duration = Duration.minutes(1),
+    ) -> cloudwatch.Metric:
+        """A queue metric of Amazon MQ, e.g. MessageCount, MessageReadyCount or ConsumerCount."""
+        return cloudwatch.Metric(
+            namespace=METRIC_NAMESPACE,
+            metric_name=metric_name,
+            dimensions_map={"Broker": self._broker.broker_name, "VirtualHost": virtual_host, "Queue": queue},
+            statistic=statistic,
+            period=period,
+        )
+
+    def metric_message_count(self, period: Duration = Duration.minutes(1)) -> cloudwatch.Metric:
+        return self.metric("MessageCount", cloudwatch.Stats.MAXIMUM, period)
+
+    def metric_publish_rate(self, period: Duration = Duration.minutes(1)) -> cloudwatch.Metric:
+        return self.metric("PublishRate", period=period)
+
+    def metric_ack_rate(self, period: Duration = Duration.minutes(1)) -> cloudwatch.Metric:
+        return self.metric("AckRate", period=period)
+
+def create_mq_connection_string(username: str, password: str, host: str, port: int, scheme: str = "amqp+ssl") -> str:
+    return f"{scheme}://{username}:{password}@{host}:{port}/"
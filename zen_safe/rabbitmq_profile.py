@@ -0,0 +1,67 @@
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+# Classic queues keep their messages on disk since RabbitMQ 3.12, the lazy queue mode no longer exists
+QUEUE_TYPES = ("quorum", "classic")
+
+
+@dataclass(frozen=True)
+class RabbitMQProfile:
+    """Broker settings for how a RabbitMQ broker is used, see RabbitMQConstruct.
+
+    Amazon MQ manages the memory and disk watermarks itself, long queues are bounded by
+    max_queue_length instead so publishers are rejected before the broker blocks every connection.
+    """
+
+    # Channels of consumers that don't acknowledge a delivery in time are closed, 0 disables it
+    consumer_timeout_minutes: int = 30
+    heartbeat_seconds: int = 60
+    # Type of queues declared without an x-queue-type argument
+    default_queue_type: str = "classic"
+    # Publishes to a queue holding this many ready messages are rejected, None doesn't bound queues
+    max_queue_length: Optional[int] = None
+
+    def __post_init__(self):
+        if self.default_queue_type not in QUEUE_TYPES:
+            raise ValueError(f"Unknown queue type '{self.default_queue_type}', expected one of {QUEUE_TYPES}")
+        if self.consumer_timeout_minutes < 0:
+            raise ValueError("consumer_timeout_minutes must not be negative")
+        # Amazon MQ only accepts heartbeats in this range
+        if not 60 <= self.heartbeat_seconds <= 3600:
+            raise ValueError("heartbeat_seconds must be between 60 and 3600")
+        if self.max_queue_length is not None and self.max_queue_length < 1:
+            raise ValueError("max_queue_length must be positive")
+
+    def configuration(self) -> str:
+        """The rabbitmq.conf of the broker, limited to the keys Amazon MQ lets us change."""
+        lines = [
+            f"consumer_timeout = {self.consumer_timeout_minutes * 60 * 1000}",
+            f"heartbeat = {self.heartbeat_seconds}",
+        ]
+        if self.default_queue_type == "quorum":
+            # Queues declared as classic before the default changed can still be redeclared by their clients
+            lines.append("quorum_queue.property_equivalence.relaxed_checks_on_redeclaration = true")
+        return "\n".join(lines) + "\n"
+
+    def policy_definition(self, mirrored: bool) -> Optional[Dict]:
+        """The queue policy bounding queue lengths, None without max_queue_length."""
+        if self.max_queue_length is None:
+            return None
+        definition = {"max-length": self.max_queue_length, "overflow": "reject-publish"}
+        if mirrored:
+            # Only one policy applies to a queue, this one replaces the mirroring policy Amazon MQ puts on clusters
+            definition.update({"ha-mode": "all", "ha-sync-mode": "automatic"})
+        return definition
+
+
+# Events are fanned out to webhooks and SSE clients, dropping publishes while the events service is down
+# keeps the broker from blocking the transaction service that publishes them
+EVENTS = RabbitMQProfile(max_queue_length=100_000)
+# Tasks with an ETA or countdown stay unacknowledged until they are due, Celery needs a long consumer timeout.
+# Quorum queues need Celery 5.5 or later in docker/transactions, older workers fail on their global QoS.
+CELERY = RabbitMQProfile(consumer_timeout_minutes=24 * 60, max_queue_length=1_000_000)
+
+RABBITMQ_PROFILES = {
+    "events": EVENTS,
+    "celery": CELERY,
+}
@@ -1,4 +1,7 @@
+from typing import Optional
+
 from aws_cdk import (
+    aws_applicationautoscaling as appscaling,
     aws_ec2 as ec2,
     aws_elasticache as elasticache,
     aws_secretsmanager as secretsmanager,
@@ -8,7 +11,27 @@ from aws_cdk import (
 import aws_cdk as cdk
 from constructs import Construct
 
+from zen_safe.redis_roles import REDIS_ROLES
+
+REDIS_BACKENDS = ("replication-group", "serverless", "data-tiering")
+
+
 class RedisConstruct(Construct):
+    """A Redis replication group for a role, optionally sharded with cluster mode.
+
+    The role (cache, broker or session) picks the eviction policy, the snapshots kept and the default
+    node type, see zen_safe/redis_roles.py.
+
+    The backend is a replication group of regular nodes, ElastiCache Serverless or r6gd nodes that tier
+    cold data to their local SSDs. Serverless scales within its ECPU and storage limits, is always
+    encrypted in transit, has no auth token and no parameters, so the role only sets its snapshots.
+
+    Without cluster mode reads can go to the replicas through the reader endpoint. With cluster mode the
+    endpoint is the configuration endpoint, clients must be cluster aware and can read from replicas with
+    READONLY. ElastiCache only auto scales cluster mode groups: replicas on their engine CPU and shards on
+    memory.
+    """
+
     @property
     def connections(self):
         return self._connections
@@ -17,13 +40,84 @@ class RedisConstruct(Construct):
     def cluster(self):
         return self._cluster
 
+    @property
+    def backend(self) -> str:
+        return self._backend
+
     @property
     def connection_string_secret(self):
         return self._connection_string_secret
 
-    def __init__(self, scope: Construct, construct_id: str, vpc: ec2.IVpc, cache_node_type: str="cache.t3.small") -> None:
+    @property
+    def cluster_mode(self) -> bool:
+        return self._cluster_mode
+
+    @property
+    def endpoint_address(self) -> str:
+        return self._endpoint_address
+
+    @property
+    def endpoint_port(self) -> str:
+        return self._endpoint_port
+
+    @property
+    def reader_endpoint_address(self) -> str:
+        return self._reader_endpoint_address
+
+    def __init__(
+        self,
+        scope: Construct,
+        construct_id: str,
+        vpc: ec2.IVpc,
+        cache_node_type: Optional[str] = None,
+        role: str = "cache",
+        backend: str = "replication-group",
+        max_data_storage_gb: int = 10,
+        max_ecpu_per_second: int = 5000,
+        cluster_mode: bool = False,
+        shards: int = 1,
+        replicas_per_shard: int = 1,
+        max_shards: Optional[int] = None,
+        max_replicas_per_shard: Optional[int] = None,
+        target_replica_cpu_percent: int = 60,
+        target_memory_percent: int = 70,
+    ) -> None:
         super().__init__(scope, construct_id)
 
+        if role not in REDIS_ROLES:
+            raise ValueError(f"Unknown Redis role '{role}', expected one of {tuple(REDIS_ROLES)}")
+        redis_role = REDIS_ROLES[role]
+        if backend not in REDIS_BACKENDS:
+            raise ValueError(f"Unknown Redis backend '{backend}', expected one of {REDIS_BACKENDS}")
+        if cache_node_type is None:
+            cache_node_type = "cache.r6gd.xlarge" if backend == "data-tiering" else redis_role.cache_node_type
+        if backend == "data-tiering" and not cache_node_type.startswith("cache.r6gd."):
+            raise ValueError(f"Data tiering needs r6gd nodes, got {cache_node_type}")
+        if backend == "serverless":
+            if cluster_mode or shards > 1 or max_shards is not None or max_replicas_per_shard is not None:
+                raise ValueError("ElastiCache Serverless scales by itself, it takes no shards, replicas or cluster_mode")
+            if not 1 <= max_data_storage_gb <= 5000:
+                raise ValueError("max_data_storage_gb must be between 1 and 5000")
+            if not 1000 <= max_ecpu_per_second <= 15000000:
+                raise ValueError("max_ecpu_per_second must be between 1000 and 15000000")
+        if redis_role.requires_replica and replicas_per_shard < 1:
+            raise ValueError(f"A Redis {role} needs at least one replica")
+        if not 0 <= replicas_per_shard <= 5:
+            raise ValueError("replicas_per_shard must be between 0 and 5")
+        if shards < 1 or (shards > 1 and not cluster_mode):
+            raise ValueError("More than one shard needs cluster_mode")
+        autoscaling = max_shards is not None or max_replicas_per_shard is not None
+        if autoscaling and not cluster_mode:
+            raise ValueError("ElastiCache only auto scales replication groups with cluster_mode")
+        if autoscaling and cache_node_type.startswith("cache.t"):
+            raise ValueError(f"ElastiCache auto scaling doesn't support burstable node types like {cache_node_type}")
+        if max_shards is not None and max_shards < shards:
+            raise ValueError("max_shards can't be smaller than shards")
+        if max_replicas_per_shard is not None and not replicas_per_shard <= max_replicas_per_shard <= 5:
+            raise ValueError("max_replicas_per_shard must be between replicas_per_shard and 5")
+        self._cluster_mode = cluster_mode
+        self._backend = backend
+
         sg_elasticache = ec2.SecurityGroup(
             self,
             "RedisServerSG",
@@ -43,6 +137,38 @@ class RedisConstruct(Construct):
             security_groups=[sg_elasticache], default_port=ec2.Port.tcp(6379)
         )
 
+        if backend == "serverless":
+            self._cluster = elasticache.CfnServerlessCache(
+                self,
+                "RedisServerlessCache",
+                engine="redis",
+                major_engine_version="7",
+                serverless_cache_name=cdk.Names.unique_resource_name(self, max_length=40, separator="-").lower(),
+                cache_usage_limits=elasticache.CfnServerlessCache.CacheUsageLimitsProperty(
+                    data_storage=elasticache.CfnServerlessCache.DataStorageProperty(
+                        maximum=max_data_storage_gb, unit="GB"
+                    ),
+                    ecpu_per_second=elasticache.CfnServerlessCache.ECPUPerSecondProperty(
+                        maximum=max_ecpu_per_second
+                    ),
+                ),
+                snapshot_retention_limit=redis_role.snapshot_retention_days,
+                security_group_ids=[sg_elasticache.security_group_id],
+                subnet_ids=vpc.select_subnets(subnet_type=ec2.SubnetType.PRIVATE_WITH_EGRESS).subnet_ids,
+            )
+            self._endpoint_address = self._cluster.attr_endpoint_address
+            self._endpoint_port = self._cluster.attr_endpoint_port
+            # Served on port 6380
+            self._reader_endpoint_address = self._cluster.attr_reader_endpoint_address
+            # Serverless only has database 0 and requires TLS
+            self._connection_string_secret = secretsmanager.Secret(
+                self, "RedisConnectionStringSecret",
+                secret_string_value=cdk.SecretValue.unsafe_plain_text(
+                    f"rediss://{self._endpoint_address}:{self._endpoint_port}/0?ssl_cert_reqs=required"
+                ),
+            )
+            return
+
         elasticache_subnet_group = elasticache.CfnSubnetGroup(
             self,
             "RedisSubnetGroup",
@@ -58,15 +184,14 @@ class RedisConstruct(Construct):
             description="parameter group for redis7.x",
             properties={
                 "databases": "256",
-                # "tcp-keepalive": "0",  # tcp-keepalive: 300 (default)
-                # "maxmemory-policy": "volatile-ttl",  # maxmemory-policy: volatile-lru (default)
+                **({"cluster-enabled": "yes"} if cluster_mode else {}),
+                **redis_role.parameters(),
             },
         )
 
         # Create a Secrets Manager secret for the Redis auth token
         self._secret = secretsmanager.Secret(
             self, f"RedisAuthTokenSecret",
-            secret_name=f"redis-auth-token",
             generate_secret_string=secretsmanager.SecretStringGenerator(
                 secret_string_template='{"auth_token": ""}',
                 generate_string_key="auth_token",
@@ -83,15 +208,16 @@ class RedisConstruct(Construct):
             cache_node_type=cache_node_type,
             engine="redis",
             engine_version="7.x",
-            snapshot_retention_limit=3,
+            snapshot_retention_limit=redis_role.snapshot_retention_days,
             snapshot_window="19:00-21:00",
             preferred_maintenance_window="mon:21:00-mon:22:30",
-            automatic_failover_enabled=True,
+            # Failing over needs a replica to promote
+            automatic_failover_enabled=replicas_per_shard > 0,
             auto_minor_version_upgrade=True,
-            multi_az_enabled=True,
+            multi_az_enabled=replicas_per_shard > 0,
             replication_group_description="redis with replicas",
-            num_node_groups=1,
-            replicas_per_node_group=1,
+            num_node_groups=shards,
+            replicas_per_node_group=replicas_per_shard,
             cache_parameter_group_name=redis_param_group.ref,
             cache_subnet_group_name=elasticache_subnet_group.ref,
             security_group_ids=[sg_elasticache.security_group_id],
@@ -100,12 +226,56 @@ class RedisConstruct(Construct):
                 CfnTag(key="desc", value="primary-replica redis"),
             ],
             auth_token=auth_token,
+            data_tiering_enabled=True if backend == "data-tiering" else None,
         )
         self._cluster.add_dependency(elasticache_subnet_group)
 
-        connection_string = f"redis://:{self._cluster.auth_token}@{self._cluster.attr_primary_end_point_address}:{self._cluster.attr_primary_end_point_port}/"
+        if cluster_mode:
+            self._endpoint_address = self._cluster.attr_configuration_end_point_address
+            self._endpoint_port = self._cluster.attr_configuration_end_point_port
+            self._reader_endpoint_address = self._endpoint_address
+        else:
+            self._endpoint_address = self._cluster.attr_primary_end_point_address
+            self._endpoint_port = self._cluster.attr_primary_end_point_port
+            self._reader_endpoint_address = self._cluster.attr_reader_end_point_address
+
+        connection_string = f"redis://:{self._cluster.auth_token}@{self._endpoint_address}:{self._endpoint_port}/"
         self._connection_string_secret = secretsmanager.Secret(
             self, f"RedisConnectionStringSecret",
-            secret_name=f"redis-connection-string",
             secret_string_value=cdk.SecretValue.unsafe_plain_text(connection_string)
-        )
\ No newline at end of file
+        )
+
+        ## Auto scaling, replicas on their engine CPU and shards on memory
+        resource_id = f"replication-group/{self._cluster.ref}"
+        if max_replicas_per_shard is not None:
+            replicas_target = appscaling.ScalableTarget(
+                self,
+                "ReplicasScalableTarget",
+                service_namespace=appscaling.ServiceNamespace.ELASTICACHE,
+                scalable_dimension="elasticache:replication-group:Replicas",
+                resource_id=resource_id,
+                min_capacity=replicas_per_shard,
+                max_capacity=max_replicas_per_shard,
+            )
+            replicas_target.scale_to_track_metric(
+                "ReplicaCpuTracking",
+                target_value=target_replica_cpu_percent,
+                predefined_metric=appscaling.PredefinedMetric.ELASTICACHE_REPLICA_ENGINE_CPU_UTILIZATION,
+            )
+        if max_shards is not None:
+            shards_target = appscaling.ScalableTarget(
+                self,
+                "ShardsScalableTarget",
+                service_namespace=appscaling.ServiceNamespace.ELASTICACHE,
+                scalable_dimension="elasticache:replication-group:NodeGroups",
+                resource_id=resource_id,
+                min_capacity=shards,
+                max_capacity=max_shards,
+            )
+            shards_target.scale_to_track_metric(
+                "MemoryTracking",
+                target_value=target_memory_percent,
+                predefined_metric=appscaling.PredefinedMetric.ELASTICACHE_DATABASE_MEMORY_USAGE_COUNTED_FOR_EVICT_PERCENTAGE,
+                # Resharding moves slots between nodes, give it time before scaling in
+                scale_in_cooldown=cdk.Duration.minutes(30),
+            )
@@ -0,0 +1,54 @@
+from dataclasses import dataclass
+from typing import Dict
+
+MAXMEMORY_POLICIES = ("noeviction", "allkeys-lru", "volatile-lru", "allkeys-lfu", "volatile-lfu", "volatile-ttl")
+
+
+@dataclass(frozen=True)
+class RedisRole:
+    """How a Redis replication group is used: what it evicts when full and what it keeps snapshots of."""
+
+    maxmemory_policy: str
+    # Days of daily snapshots, 0 takes none
+    snapshot_retention_days: int
+    # Node type when the stack doesn't pass one
+    cache_node_type: str
+    # A replica to fail over to is required, losing the primary would lose data that can't be rebuilt
+    requires_replica: bool = False
+
+    def __post_init__(self):
+        if self.maxmemory_policy not in MAXMEMORY_POLICIES:
+            raise ValueError(
+                f"Unknown maxmemory-policy '{self.maxmemory_policy}', expected one of {MAXMEMORY_POLICIES}"
+            )
+        if not 0 <= self.snapshot_retention_days <= 35:
+            raise ValueError("snapshot_retention_days must be between 0 and 35")
+
+    def parameters(self) -> Dict[str, str]:
+        return {
+            "maxmemory-policy": self.maxmemory_policy,
+            # Drops connections of clients that went away without closing them
+            "tcp-keepalive": "300",
+        }
+
+
+# Everything can be rebuilt from the databases and nodes, the least recently used keys make room. A
+# burstable node out of CPU credits only makes the cache slower.
+CACHE = RedisRole(maxmemory_policy="allkeys-lru", snapshot_retention_days=0, cache_node_type="cache.t3.small")
+# Queued tasks have no TTL and must never be evicted, writes fail instead once memory is full. Every worker
+# polls the broker all the time, a burstable node would run out of CPU credits and throttle every task.
+BROKER = RedisRole(
+    maxmemory_policy="noeviction",
+    snapshot_retention_days=1,
+    cache_node_type="cache.m7g.large",
+    requires_replica=True,
+)
+# Only keys with a TTL are evicted, the rest, e.g. queued tasks sharing the group, are kept. It stays on the
+# small burstable node the shared Redis always ran on, sustained queue load belongs on a separate broker.
+SESSION = RedisRole(maxmemory_policy="volatile-lru", snapshot_retention_days=3, cache_node_type="cache.t3.small")
+
+REDIS_ROLES = {
+    "cache": CACHE,
+    "broker": BROKER,
+    "session": SESSION,
+}
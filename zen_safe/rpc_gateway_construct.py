@@ -0,0 +1,139 @@
+from dataclasses import dataclass
+from typing import Optional, Sequence, Union
+
+from aws_cdk import (
+    aws_ec2 as ec2,
+    aws_ecs as ecs,
+    aws_logs as logs,
+    aws_secretsmanager as secretsmanager,
+    aws_servicediscovery as servicediscovery,
+    Duration,
+)
+from constructs import Construct
+
+from zen_safe.capacity_provider_strategy import ON_DEMAND
+from zen_safe.container_platform import container_image, runtime_platform
+
+RPC_GATEWAY_PORT = 8545
+
+
+@dataclass(frozen=True)
+class RpcUpstream:
+    """A JSON-RPC node behind the gateway, a plain URL or a secret holding it."""
+
+    url: Union[str, ecs.Secret]
+    requests_per_second: int = 50
+
+    def __post_init__(self):
+        if self.requests_per_second < 1:
+            raise ValueError("requests_per_second must be positive")
+
+
+class RpcGatewayConstruct(Construct):
+    """JSON-RPC gateway that caches finalized responses and hedges requests across its upstreams.
+
+    Services reach it by its Cloud Map name inside the VPC, see docker/rpc-gateway/gateway.py.
+    """
+
+    @property
+    def url(self) -> str:
+        return self._url
+
+    @property
+    def connections(self):
+        return self._service.connections
+
+    @property
+    def service(self):
+        return self._service
+
+    def __init__(
+        self,
+        scope: Construct,
+        construct_id: str,
+        vpc: ec2.IVpc,
+        cluster: ecs.ICluster,
+        log_group: logs.ILogGroup,
+        upstreams: Sequence[RpcUpstream],
+        namespace_name: str,
+        cache_url_secret: Optional[secretsmanager.ISecret] = None,
+        cache_cluster_mode: bool = False,
+        finality_depth: int = 64,
+        hedge_delay: Duration = Duration.millis(500),
+        desired_count: int = 2,
+        cpu: int = 512,
+        memory_limit_mib: int = 1024,
+        cpu_architecture: str = "X86_64",
+    ) -> None:
+        super().__init__(scope, construct_id)
+
+        if not upstreams:
+            raise ValueError("The RPC gateway needs at least one upstream")
+        if finality_depth < 1:
+            raise ValueError("finality_depth must be positive")
+
+        environment = {
+            "FINALITY_DEPTH": str(finality_depth),
+            "HEDGE_DELAY_MS": str(int(hedge_delay.to_milliseconds())),
+            "PORT": str(RPC_GATEWAY_PORT),
+        }
+        secrets = {}
+        for index, upstream in enumerate(upstreams):
+            if isinstance(upstream.url, ecs.Secret):
+                secrets[f"UPSTREAM_{index}_URL"] = upstream.url
+            else:
+                environment[f"UPSTREAM_{index}_URL"] = upstream.url
+            environment[f"UPSTREAM_{index}_RATE_LIMIT"] = str(upstream.requests_per_second)
+        if cache_url_secret is not None:
+            secrets["REDIS_URL"] = ecs.Secret.from_secrets_manager(cache_url_secret)
+            if cache_cluster_mode:
+                environment["REDIS_CLUSTER"] = "true"
+
+        task_definition = ecs.FargateTaskDefinition(
+            self,
+            "TaskDefinition",
+            cpu=cpu,
+            memory_limit_mib=memory_limit_mib,
+            family="SafeServices",
+            runtime_platform=runtime_platform(cpu_architecture),
+        )
+        task_definition.add_container(
+            "Gateway",
+            container_name="rpc-gateway",
+            image=container_image("docker/rpc-gateway", cpu_architecture),
+            environment=environment,
+            secrets=secrets,
+            port_mappings=[ecs.PortMapping(container_port=RPC_GATEWAY_PORT)],
+            health_check=ecs.HealthCheck(
+                command=[
+                    "CMD",
+                    "python",
+                    "-c",
+                    f"import urllib.request; urllib.request.urlopen('http://localhost:{RPC_GATEWAY_PORT}/health')",
+                ],
+            ),
+            logging=ecs.AwsLogDriver(
+                log_group=log_group,
+                stream_prefix="RpcGateway",
+                mode=ecs.AwsLogDriverMode.NON_BLOCKING,
+            ),
+        )
+
+        namespace = servicediscovery.PrivateDnsNamespace(self, "Namespace", name=namespace_name, vpc=vpc)
+        self._service = ecs.FargateService(
+            self,
+            "Service",
+            cluster=cluster,
+            task_definition=task_definition,
+            desired_count=desired_count,
+            # Every indexer call goes through the gateway, it must not be interrupted
+            capacity_provider_strategies=ON_DEMAND.capacity_provider_strategies(),
+            circuit_breaker=ecs.DeploymentCircuitBreaker(rollback=True),
+            cloud_map_options=ecs.CloudMapOptions(
+                cloud_map_namespace=namespace,
+                name="rpc-gateway",
+                dns_ttl=Duration.seconds(10),
+            ),
+        )
+
+        self._url = f"http://rpc-gateway.{namespace_name}:{RPC_GATEWAY_PORT}"
@@ -0,0 +1,98 @@
+import os
+
+from aws_cdk import (
+    aws_ec2 as ec2,
+    aws_ecs as ecs,
+    aws_iam as iam,
+    aws_lambda as lambda_,
+    custom_resources as cr,
+    CustomResource,
+    Duration,
+)
+from constructs import Construct
+
+
+class RunTaskOnDeployConstruct(Construct):
+    """Runs a task definition to completion whenever it changes, before dependent resources update.
+
+    A new image or environment creates a new task definition revision, so the task runs exactly once
+    per release. A failing task fails the deployment.
+    """
+
+    @property
+    def connections(self):
+        return self._connections
+
+    @property
+    def resource(self):
+        return self._resource
+
+    def __init__(
+        self,
+        scope: Construct,
+        construct_id: str,
+        vpc: ec2.IVpc,
+        cluster: ecs.ICluster,
+        task_definition: ecs.FargateTaskDefinition,
+        timeout: Duration = Duration.minutes(30),
+    ) -> None:
+        super().__init__(scope, construct_id)
+
+        security_group = ec2.SecurityGroup(
+            self,
+            "TaskSG",
+            vpc=vpc,
+            allow_all_outbound=True,
+            description=f"Security group for the {construct_id} task",
+        )
+        self._connections = ec2.Connections(security_groups=[security_group])
+
+        code = lambda_.Code.from_asset(
+            os.path.join(os.path.dirname(__file__), "functions", "run_task")
+        )
+        on_event_handler = lambda_.Function(
+            self,
+            "OnEventHandler",
+            runtime=lambda_.Runtime.PYTHON_3_12,
+            handler="index.on_event",
+            code=code,
+            timeout=Duration.minutes(1),
+        )
+        is_complete_handler = lambda_.Function(
+            self,
+            "IsCompleteHandler",
+            runtime=lambda_.Runtime.PYTHON_3_12,
+            handler="index.is_complete",
+            code=code,
+            timeout=Duration.minutes(1),
+        )
+
+        task_definition.grant_run(on_event_handler)
+        is_complete_handler.add_to_role_policy(
+            iam.PolicyStatement(
+                actions=["ecs:DescribeTasks"],
+                resources=["*"],
+                conditions={"ArnEquals": {"ecs:cluster": cluster.cluster_arn}},
+            )
+        )
+
+        provider = cr.Provider(
+            self,
+            "Provider",
+            on_event_handler=on_event_handler,
+            is_complete_handler=is_complete_handler,
+            query_interval=Duration.seconds(15),
+            total_timeout=timeout,
+        )
+
+        self._resource = CustomResource(
+            self,
+            "Resource",
+            service_token=provider.service_token,
+            properties={
+                "Cluster": cluster.cluster_arn,
+                "TaskDefinition": task_definition.task_definition_arn,
+                "Subnets": vpc.select_subnets(subnet_type=ec2.SubnetType.PRIVATE_WITH_EGRESS).subnet_ids,
+                "SecurityGroups": [security_group.security_group_id],
+            },
+        )
@@ -1,4 +1,4 @@
-from typing import Optional
+from typing import AbstractSet, Optional
 from aws_cdk import (
     aws_ec2 as ec2,
     aws_ecs as ecs,
@@ -7,8 +7,17 @@ from aws_cdk import (
 )
 from constructs import Construct
 
+from zen_safe.capacity_provider_strategy import FargateCapacitySplit, ON_DEMAND
+from zen_safe.container_platform import (
+    container_image,
+    resolve_cpu_architecture,
+    runtime_platform,
+)
+from zen_safe.database_monitoring import DatabaseMonitoring
+from zen_safe.database_storage import DatabaseStorage
 from zen_safe.postgres_construct import PostgresDatabaseConstruct
 from zen_safe.safe_shared_stack import SafeSharedStack
+from zen_safe.service_autoscaling import add_web_service_autoscaling
 from zen_safe.redis_construct import RedisConstruct
 
 class SafeClientGatewayStack(NestedStack):
@@ -26,10 +35,23 @@ class SafeClientGatewayStack(NestedStack):
         ssl_certificate_arn: Optional[str] = None,
         config_service_uri: Optional[str] = None,
         client_gateway_url: Optional[str] = None,
+        database_read_replicas: int = 0,
+        database_proxy: bool = False,
+        database_engine: str = "postgres",
+        database_storage: Optional[DatabaseStorage] = None,
+        database_monitoring: Optional[DatabaseMonitoring] = DatabaseMonitoring(),
+        database_parameter_profile: Optional[str] = "api-read",
+        web_min_capacity: int = 2,
+        web_max_capacity: int = 4,
+        web_capacity: FargateCapacitySplit = ON_DEMAND,
+        cpu_architecture: str = "X86_64",
+        x86_only_images: AbstractSet[str] = frozenset(),
         **kwargs,
     ) -> None:
         super().__init__(scope, construct_id, **kwargs)
 
+        cpu_architecture = resolve_cpu_architecture(cpu_architecture, "docker/client-gateway", x86_only_images)
+
         if client_gateway_url is None:
             client_gateway_url = shared_stack.client_gateway_alb.load_balancer_dns_name
 
@@ -43,7 +65,17 @@ class SafeClientGatewayStack(NestedStack):
             cache_node_type=cache_node_type
         )
 
-        self._cgw_database = PostgresDatabaseConstruct(self, "ClientGatewayDatabase", vpc=vpc)
+        self._cgw_database = PostgresDatabaseConstruct(
+            self,
+            "ClientGatewayDatabase",
+            vpc=vpc,
+            read_replicas=database_read_replicas,
+            proxy=database_proxy,
+            parameter_profile=database_parameter_profile,
+            engine=database_engine,
+            storage=database_storage,
+            monitoring=database_monitoring,
+        )
 
         ecs_cluster = ecs.Cluster(
             self,
@@ -53,15 +85,15 @@ class SafeClientGatewayStack(NestedStack):
         )
 
         container_args = {
-            "image": ecs.ContainerImage.from_asset("docker/client-gateway"),
+            "image": container_image("docker/client-gateway", cpu_architecture),
             "environment": {
                 "JWT_ISSUER": client_gateway_url,
                 "SAFE_CONFIG_BASE_URI": config_service_uri,
                 "SAFE_WEB_APP_BASE_URI": "https://safe.zenchain.io",
                 "LOG_LEVEL": "info",
                 "POSTGRES_DB": "postgres",
-                "REDIS_HOST": self.redis_cluster.cluster.attr_primary_end_point_address,
-                "REDIS_PORT": self.redis_cluster.cluster.attr_primary_end_point_port,
+                "REDIS_HOST": self.redis_cluster.endpoint_address,
+                "REDIS_PORT": self.redis_cluster.endpoint_port,
                 "HTTP_CLIENT_REQUEST_TIMEOUT_MILLISECONDS": "60000",
             },
             "secrets": {
@@ -91,6 +123,16 @@ class SafeClientGatewayStack(NestedStack):
                 ),
             },
         }
+        if self._cgw_database.read_connection_string_secret is not None:
+            container_args["secrets"]["DATABASE_READ_REPLICA_URL"] = ecs.Secret.from_secrets_manager(
+                self._cgw_database.read_connection_string_secret
+            )
+        if self._cgw_database.proxy is not None:
+            # The credentials secret holds the instance's host, the gateway connects through the proxy instead
+            del container_args["secrets"]["POSTGRES_HOST"]
+            del container_args["secrets"]["POSTGRES_PORT"]
+            container_args["environment"]["POSTGRES_HOST"] = self._cgw_database.endpoint_address
+            container_args["environment"]["POSTGRES_PORT"] = "5432"
 
         ## Web
         web_task_definition = ecs.FargateTaskDefinition(
@@ -99,6 +141,7 @@ class SafeClientGatewayStack(NestedStack):
             cpu=512,
             memory_limit_mib=1024,
             family="SafeServices",
+            runtime_platform=runtime_platform(cpu_architecture),
         )
 
         web_task_definition.add_container(
@@ -121,19 +164,22 @@ class SafeClientGatewayStack(NestedStack):
             task_definition=web_task_definition,
             circuit_breaker=ecs.DeploymentCircuitBreaker(rollback=True),
             enable_execute_command=True,
-            desired_count=1,
+            desired_count=web_min_capacity,
+            capacity_provider_strategies=web_capacity.capacity_provider_strategies(),
         )
 
         ## Setup LB and redirect traffic to web and static containers
 
         listener = shared_stack.client_gateway_alb.add_listener("Listener", port=80)
 
-        listener.add_targets(
-            "WebTarget",
-            port=80,
-            targets=[service.load_balancer_target(container_name="web")],
-            health_check=elbv2.HealthCheck(path="/health"),
-        )
+        web_target_groups = [
+            listener.add_targets(
+                "WebTarget",
+                port=80,
+                targets=[service.load_balancer_target(container_name="web")],
+                health_check=elbv2.HealthCheck(path="/health"),
+            )
+        ]
 
         if ssl_certificate_arn is not None:
             ssl_listener = shared_stack.client_gateway_alb.add_listener(
@@ -147,15 +193,24 @@ class SafeClientGatewayStack(NestedStack):
             )
 
 
-            ssl_listener.add_targets(
-                "WebTarget",
-                protocol=elbv2.ApplicationProtocol.HTTP,
-                targets=[service.load_balancer_target(container_name="web")],
-                health_check=elbv2.HealthCheck(path="/health"),
+            web_target_groups.append(
+                ssl_listener.add_targets(
+                    "WebTarget",
+                    protocol=elbv2.ApplicationProtocol.HTTP,
+                    targets=[service.load_balancer_target(container_name="web")],
+                    health_check=elbv2.HealthCheck(path="/health"),
+                )
             )
 
+        add_web_service_autoscaling(
+            service,
+            target_groups=web_target_groups,
+            min_capacity=web_min_capacity,
+            max_capacity=web_max_capacity,
+        )
+
         for svc in [service]:
-            service.connections.allow_to(self._cgw_database.database_instance, ec2.Port.tcp(5432), "RDS")
+            service.connections.allow_to(self._cgw_database.connections, ec2.Port.tcp(5432), "RDS")
             svc.connections.allow_to(
                 self.redis_cluster.connections, ec2.Port.tcp(6379), "Redis"
             )
\ No newline at end of file
@@ -1,4 +1,4 @@
-from typing import Optional
+from typing import AbstractSet, Optional
 from aws_cdk import (
     aws_ec2 as ec2,
     aws_ecs as ecs,
@@ -8,7 +8,20 @@ from aws_cdk import (
 )
 from constructs import Construct
 
+from zen_safe.capacity_provider_strategy import FargateCapacitySplit, ON_DEMAND
+from zen_safe.container_platform import (
+    container_image,
+    resolve_cpu_architecture,
+    runtime_platform,
+)
+from zen_safe.database_monitoring import DatabaseMonitoring, add_slow_query_metric_filters
+from zen_safe.database_storage import DatabaseStorage
+from zen_safe.gunicorn_profile import GTHREAD, GunicornProfile
+from zen_safe.postgres_construct import add_database_proxy
+from zen_safe.postgres_parameters import postgres_parameter_group
 from zen_safe.safe_shared_stack import SafeSharedStack
+from zen_safe.service_autoscaling import add_web_service_autoscaling
+from zen_safe.static_assets_construct import StaticAssetsConstruct
 
 
 class SafeConfigurationStack(NestedStack):
@@ -16,6 +29,10 @@ class SafeConfigurationStack(NestedStack):
     def alb(self):
         return self._alb
 
+    @property
+    def static_assets(self):
+        return self._static_assets
+
     def __init__(
         self,
         scope: Construct,
@@ -26,10 +43,24 @@ class SafeConfigurationStack(NestedStack):
         client_gateway_url: Optional[str] = None,
         config_service_uri: Optional[str] = None,
         mainnet_transaction_gateway_url: Optional[str] = None,
+        web_cpu: int = 512,
+        web_memory_limit_mib: int = 1024,
+        gunicorn_profile: GunicornProfile = GTHREAD,
+        web_min_capacity: int = 2,
+        web_max_capacity: int = 4,
+        web_capacity: FargateCapacitySplit = ON_DEMAND,
+        cpu_architecture: str = "X86_64",
+        x86_only_images: AbstractSet[str] = frozenset(),
+        database_proxy: bool = False,
+        database_parameter_profile: Optional[str] = "small-config",
+        database_storage: Optional[DatabaseStorage] = None,
+        database_monitoring: Optional[DatabaseMonitoring] = DatabaseMonitoring(),
         **kwargs,
     ) -> None:
         super().__init__(scope, construct_id, **kwargs)
 
+        cpu_architecture = resolve_cpu_architecture(cpu_architecture, "docker/config", x86_only_images)
+
         if client_gateway_url is None:
             client_gateway_url = shared_stack.client_gateway_alb.load_balancer_dns_name
 
@@ -39,20 +70,65 @@ class SafeConfigurationStack(NestedStack):
         if mainnet_transaction_gateway_url is None:
             mainnet_transaction_gateway_url = f"http://{shared_stack.transaction_mainnet_alb.load_balancer_dns_name}"
 
+        database_engine = rds.DatabaseInstanceEngine.postgres(
+            version=rds.PostgresEngineVersion.VER_16_3
+        )
+        database_instance_type = ec2.InstanceType.of(
+            ec2.InstanceClass.BURSTABLE4_GRAVITON, ec2.InstanceSize.SMALL
+        )
+
+        # Same pieces as PostgresDatabaseConstruct, kept inline so the existing instance isn't replaced
+        if database_storage is not None:
+            instance_options = database_storage.instance_options(database_instance_type)
+        else:
+            instance_options = {"max_allocated_storage": 500}
+        parameter_options = {}
+        if database_monitoring is not None:
+            instance_options = {**instance_options, **database_monitoring.instance_options()}
+            parameter_options = {
+                "preload_libraries": database_monitoring.preload_libraries,
+                "settings": database_monitoring.parameters(),
+            }
+        parameter_group = None
+        if database_parameter_profile is not None or database_monitoring is not None:
+            parameter_group = postgres_parameter_group(
+                self,
+                "CfgDatabaseParameterGroup",
+                database_engine,
+                database_instance_type,
+                database_parameter_profile,
+                **parameter_options,
+            )
+
         database = rds.DatabaseInstance(
             self,
             "CfgDatabase",
-            engine=rds.DatabaseInstanceEngine.postgres(
-                version=rds.PostgresEngineVersion.VER_16_3
-            ),
-            instance_type=ec2.InstanceType.of(
-                ec2.InstanceClass.BURSTABLE4_GRAVITON, ec2.InstanceSize.SMALL
-            ),
+            engine=database_engine,
+            instance_type=database_instance_type,
+            parameter_group=parameter_group,
             vpc=vpc,
             vpc_subnets=ec2.SubnetSelection(subnet_type=ec2.SubnetType.PRIVATE_WITH_EGRESS),
-            max_allocated_storage=500,
+            **instance_options,
             credentials=rds.Credentials.from_generated_secret("postgres"),
         )
+        if database_monitoring is not None:
+            add_slow_query_metric_filters(
+                self,
+                f"/aws/rds/instance/{database.instance_identifier}/postgresql",
+                "CfgDatabase",
+                database,
+            )
+
+        database_proxy_endpoint = None
+        if database_proxy:
+            database_proxy_endpoint = add_database_proxy(
+                self,
+                "CfgDatabaseProxy",
+                vpc=vpc,
+                proxy_target=rds.ProxyTarget.from_instance(database),
+                secret=database.secret,
+                connections=database.connections,
+            ).endpoint
 
         ecs_cluster = ecs.Cluster(
             self,
@@ -62,15 +138,13 @@ class SafeConfigurationStack(NestedStack):
         )
 
         container_args = {
-            "image": ecs.ContainerImage.from_asset("docker/config"),
+            "image": container_image("docker/config", cpu_architecture),
             "environment": {
                 "PYTHONDONTWRITEBYTECODE": "true",
                 "DEBUG": "true",
                 "ROOT_LOG_LEVEL": "DEBUG",
                 "DJANGO_ALLOWED_HOSTS": "*",
                 "GUNICORN_BIND_PORT": "8001",
-                "DOCKER_NGINX_VOLUME_ROOT": "/nginx",
-                "GUNICORN_BIND_SOCKET": "unix:/gunicorn.socket",
                 "NGINX_ENVSUBST_OUTPUT_DIR": "/etc/nginx/",
                 "POSTGRES_NAME": "postgres",
                 "GUNICORN_WEB_RELOAD": "false",
@@ -112,22 +186,24 @@ class SafeConfigurationStack(NestedStack):
                 ),
             },
         }
+        if database_proxy_endpoint is not None:
+            # The generated secret holds the instance's host, the service connects through the proxy instead
+            del container_args["secrets"]["POSTGRES_HOST"]
+            del container_args["secrets"]["POSTGRES_PORT"]
+            container_args["environment"]["POSTGRES_HOST"] = database_proxy_endpoint
+            container_args["environment"]["POSTGRES_PORT"] = "5432"
 
         ## Web
         web_task_definition = ecs.FargateTaskDefinition(
             self,
             "SafeConfigurationServiceWeb",
-            cpu=512,
-            memory_limit_mib=1024,
+            cpu=web_cpu,
+            memory_limit_mib=web_memory_limit_mib,
             family="SafeServices",
-            volumes=[
-                ecs.Volume(
-                    name="nginx_volume",
-                )
-            ],
+            runtime_platform=runtime_platform(cpu_architecture),
         )
 
-        web_container = web_task_definition.add_container(
+        web_task_definition.add_container(
             "Web",
             container_name="web",
             logging=ecs.AwsLogDriver(
@@ -136,30 +212,13 @@ class SafeConfigurationStack(NestedStack):
                 mode=ecs.AwsLogDriverMode.NON_BLOCKING,
             ),
             port_mappings=[ecs.PortMapping(container_port=8001)],
-            **container_args,
-        )
-
-        web_container.add_mount_points(
-            ecs.MountPoint(
-                source_volume="nginx_volume",
-                container_path="/app/staticfiles",
-                read_only=False,
-            )
-        )
-
-        nginx_container = web_task_definition.add_container(
-            "StaticFiles",
-            container_name="static",
-            image=ecs.ContainerImage.from_registry("nginx:latest"),
-            port_mappings=[ecs.PortMapping(container_port=80)],
-        )
-
-        nginx_container.add_mount_points(
-            ecs.MountPoint(
-                source_volume="nginx_volume",
-                container_path="/usr/share/nginx/html/static",
-                read_only=True,
-            )
+            **{
+                **container_args,
+                "environment": {
+                    **container_args["environment"],
+                    **gunicorn_profile.environment(web_cpu, web_memory_limit_mib),
+                },
+            },
         )
 
         web_service = ecs.FargateService(
@@ -167,28 +226,23 @@ class SafeConfigurationStack(NestedStack):
             "WebService",
             cluster=ecs_cluster,
             task_definition=web_task_definition,
-            desired_count=1,
+            desired_count=web_min_capacity,
+            capacity_provider_strategies=web_capacity.capacity_provider_strategies(),
             circuit_breaker=ecs.DeploymentCircuitBreaker(rollback=True),
             enable_execute_command=True,
         )
 
-        ## Setup LB and redirect traffic to web and static containers
+        ## Setup LB and redirect traffic to the web container, static files are redirected to CloudFront and S3
 
         listener = shared_stack.config_alb.add_listener("Listener", port=80)
 
-        listener.add_targets(
-            "Static",
-            port=80,
-            targets=[web_service.load_balancer_target(container_name="static")],
-            priority=1,
-            conditions=[elbv2.ListenerCondition.path_patterns(["/static/*"])],
-            health_check=elbv2.HealthCheck(path="/static/drf-yasg/style.css"),
-        )
-        listener.add_targets(
-            "WebTarget",
-            port=80,
-            targets=[web_service.load_balancer_target(container_name="web")],
-        )
+        web_target_groups = [
+            listener.add_targets(
+                "WebTarget",
+                port=80,
+                targets=[web_service.load_balancer_target(container_name="web")],
+            )
+        ]
 
         if ssl_certificate_arn is not None:
             ssl_listener = shared_stack.config_alb.add_listener(
@@ -200,20 +254,38 @@ class SafeConfigurationStack(NestedStack):
                 certificates=[elbv2.ListenerCertificate(ssl_certificate_arn)],
             )
 
-            ssl_listener.add_targets(
-                "Static",
-                port=80,
-                targets=[web_service.load_balancer_target(container_name="static")],
-                priority=1,
-                conditions=[elbv2.ListenerCondition.path_patterns(["/static/*"])],
-                health_check=elbv2.HealthCheck(path="/static/drf-yasg/style.css"),
+            web_target_groups.append(
+                ssl_listener.add_targets(
+                    "WebTarget",
+                    protocol=elbv2.ApplicationProtocol.HTTP,
+                    targets=[web_service.load_balancer_target(container_name="web")],
+                )
             )
 
-            ssl_listener.add_targets(
-                "WebTarget",
-                protocol=elbv2.ApplicationProtocol.HTTP,
-                targets=[web_service.load_balancer_target(container_name="web")],
-            )
+        self._static_assets = StaticAssetsConstruct(
+            self,
+            "StaticAssets",
+            docker_directory="docker/config",
+            collectstatic_command="cd /app && python src/manage.py collectstatic --noinput",
+            static_root="/app/staticfiles",
+            alb=shared_stack.config_alb,
+            # collectstatic only needs the settings to load, nothing is connected to
+            environment={
+                "SECRET_KEY": "collectstatic",
+                "POSTGRES_NAME": "postgres",
+                "DEFAULT_FILE_STORAGE": "django.core.files.storage.FileSystemStorage",
+            },
+        )
+        self._static_assets.redirect_static_paths(listener)
+        if ssl_certificate_arn is not None:
+            self._static_assets.redirect_static_paths(ssl_listener)
+
+        add_web_service_autoscaling(
+            web_service,
+            target_groups=web_target_groups,
+            min_capacity=web_min_capacity,
+            max_capacity=web_max_capacity,
+        )
 
         ## Permissions
         for service in [web_service]:
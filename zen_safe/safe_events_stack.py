@@ -1,17 +1,33 @@
-from typing import Optional
+from typing import AbstractSet, Optional
 from aws_cdk import (
     aws_ec2 as ec2,
     aws_ecs as ecs,
     aws_elasticloadbalancingv2 as elbv2,
+    Duration,
     NestedStack,
 )
 from constructs import Construct
 
+from zen_safe.capacity_provider_strategy import FargateCapacitySplit, ON_DEMAND
+from zen_safe.container_platform import (
+    container_image,
+    resolve_cpu_architecture,
+    runtime_platform,
+)
+from zen_safe.database_monitoring import DatabaseMonitoring
+from zen_safe.database_storage import DatabaseStorage
 from zen_safe.postgres_construct import PostgresDatabaseConstruct
 from zen_safe.safe_shared_stack import SafeSharedStack
 from zen_safe.rabbitmq_construct import RabbitMQConstruct
 
 class SafeEventsStack(NestedStack):
+    """The safe-events-service behind the events ALB, with its RabbitMQ broker and database.
+
+    The service runs a single task. safe-events-service pushes server-sent events from an in-process
+    observable and every task consumes the same durable queue, so each event would only reach the SSE
+    clients of the task that dequeued it.
+    """
+
     @property
     def events_mq(self):
         return self._events_mq
@@ -23,11 +39,29 @@ class SafeEventsStack(NestedStack):
         vpc: ec2.IVpc,
         shared_stack: SafeSharedStack,
         mq_node_type: str = "mq.t3.small",
+        mq_deployment_mode: str = "SINGLE_INSTANCE",
         ssl_certificate_arn: Optional[str] = None,
+        database_read_replicas: int = 0,
+        database_proxy: bool = False,
+        database_engine: str = "postgres",
+        database_storage: Optional[DatabaseStorage] = None,
+        database_monitoring: Optional[DatabaseMonitoring] = DatabaseMonitoring(),
+        database_parameter_profile: Optional[str] = "api-read",
+        web_capacity: FargateCapacitySplit = ON_DEMAND,
+        sse_idle_timeout: Duration = Duration.minutes(15),
+        sse_deregistration_delay: Duration = Duration.minutes(2),
+        cpu_architecture: str = "X86_64",
+        x86_only_images: AbstractSet[str] = frozenset(),
         **kwargs,
     ) -> None:
         super().__init__(scope, construct_id, **kwargs)
 
+        # The ALB allows idle timeouts of up to 4000 seconds
+        if not 1 <= sse_idle_timeout.to_seconds() <= 4000:
+            raise ValueError("sse_idle_timeout must be between 1 and 4000 seconds")
+
+        cpu_architecture = resolve_cpu_architecture(cpu_architecture, "docker/events", x86_only_images)
+
         ecs_cluster = ecs.Cluster(
             self,
             "SafeCluster",
@@ -36,13 +70,33 @@ class SafeEventsStack(NestedStack):
         )
 
         # Events queue
-        self._events_mq = RabbitMQConstruct(self, "EventsRabbitMQ", vpc=vpc, mq_node_type=mq_node_type)
+        self._events_mq = RabbitMQConstruct(
+            self,
+            "EventsRabbitMQ",
+            vpc=vpc,
+            mq_node_type=mq_node_type,
+            deployment_mode=mq_deployment_mode,
+            profile="events",
+            # Renaming a broker replaces it, renaming its credentials secret generates a new password
+            broker_name="MyRabbitMQBroker",
+            secret_name_prefix="rabbitmq",
+        )
 
         # Events db
-        self._events_db = PostgresDatabaseConstruct(self, "EventsDatabase", vpc=vpc)
+        self._events_db = PostgresDatabaseConstruct(
+            self,
+            "EventsDatabase",
+            vpc=vpc,
+            read_replicas=database_read_replicas,
+            proxy=database_proxy,
+            parameter_profile=database_parameter_profile,
+            engine=database_engine,
+            storage=database_storage,
+            monitoring=database_monitoring,
+        )
 
         container_args = {
-            "image": ecs.ContainerImage.from_asset("docker/events"),
+            "image": container_image("docker/events", cpu_architecture),
             "environment": {
                 "AMQP_EXCHANGE": "safe-transaction-service-events",
                 "AMQP_QUEUE": "safe-events-service",
@@ -65,6 +119,10 @@ class SafeEventsStack(NestedStack):
                 ),
             },
         }
+        if self._events_db.read_connection_string_secret is not None:
+            container_args["secrets"]["DATABASE_READ_REPLICA_URL"] = ecs.Secret.from_secrets_manager(
+                self._events_db.read_connection_string_secret
+            )
 
         ## Web
         web_task_definition = ecs.FargateTaskDefinition(
@@ -73,6 +131,7 @@ class SafeEventsStack(NestedStack):
             cpu=512,
             memory_limit_mib=1024,
             family="SafeServices",
+            runtime_platform=runtime_platform(cpu_architecture),
         )
 
         web_task_definition.add_container(
@@ -95,11 +154,26 @@ class SafeEventsStack(NestedStack):
             task_definition=web_task_definition,
             circuit_breaker=ecs.DeploymentCircuitBreaker(rollback=True),
             enable_execute_command=True,
+            # Tasks compete for the events queue, see the class docstring
             desired_count=1,
+            capacity_provider_strategies=web_capacity.capacity_provider_strategies(),
+            # New tasks take connections before old ones drain, SSE clients reconnect to a running task. Both
+            # tasks consume the events queue until the old one stops.
+            min_healthy_percent=100,
+            max_healthy_percent=200,
         )
 
         ## Setup LB and redirect traffic to web and static containers
 
+        # SSE streams stay open between events, the ALB closes them once nothing was sent for this long
+        shared_stack.events_alb.set_attribute(
+            "idle_timeout.timeout_seconds", str(int(sse_idle_timeout.to_seconds()))
+        )
+        target_args = {
+            # Streams are only closed after the delay, clients of a draining task reconnect over that time
+            "deregistration_delay": sse_deregistration_delay,
+        }
+
         listener = shared_stack.events_alb.add_listener("Listener", port=80)
 
         listener.add_targets(
@@ -107,6 +181,7 @@ class SafeEventsStack(NestedStack):
             port=80,
             targets=[service.load_balancer_target(container_name="web")],
             health_check=elbv2.HealthCheck(path="/health"),
+            **target_args,
         )
 
         if ssl_certificate_arn is not None:
@@ -124,10 +199,11 @@ class SafeEventsStack(NestedStack):
                 protocol=elbv2.ApplicationProtocol.HTTP,
                 targets=[service.load_balancer_target(container_name="web")],
                 health_check=elbv2.HealthCheck(path="/health"),
+                **target_args,
             )
 
         for svc in [service]:
-            service.connections.allow_to(self._events_db.database_instance, ec2.Port.tcp(5432), "RDS")
+            service.connections.allow_to(self._events_db.connections, ec2.Port.tcp(5432), "RDS")
             svc.connections.allow_to(
-                self._events_mq.connections, ec2.Port.tcp(5672), "RabbitMQEvents"
+                self._events_mq.connections, ec2.Port.tcp(5671), "RabbitMQEvents"
             )
\ No newline at end of file
@@ -1,10 +1,13 @@
-from typing import Optional, Union
+from typing import AbstractSet, Optional, Union
 from aws_cdk import (
     aws_ec2 as ec2,
     Stack
 )
 from constructs import Construct
 
+from zen_safe.catch_up import CatchUpProfile
+from zen_safe.erigon_stack import ErigonEthereumStack
+from zen_safe.indexer_profile import INDEXER_PROFILES
 from zen_safe.safe_client_gateway_stack import \
     SafeClientGatewayStack
 from zen_safe.safe_configuration_stack import \
@@ -27,10 +30,32 @@ class ZenSafeStack(Stack):
         client_gateway_url: Optional[str] = None,
         mainnet_transaction_gateway_url: Optional[str] = None,
         ssl_certificate_arn: Optional[str] = None,
+        celery_broker: str = "redis",
+        separate_redis_broker: bool = False,
+        cache_backend: str = "replication-group",
+        cpu_architecture: str = "X86_64",
+        x86_only_images: AbstractSet[str] = frozenset(),
+        catch_up: bool = False,
+        indexer_profile: str = "zenchain-mainnet",
+        erigon_node: bool = False,
+        erigon_chain: Optional[str] = None,
+        rpc_gateway: bool = False,
+        rpc_gateway_cache_cluster_mode: bool = False,
+        rpc_gateway_cache_max_replicas: Optional[int] = None,
+        clustered_events_mq: bool = False,
         **kwargs,
     ) -> None:
         super().__init__(scope, construct_id, **kwargs)
 
+        # "mainnet" only names the transaction service's chain here, Erigon can't sync ZenChain itself
+        if erigon_node and not erigon_chain:
+            raise ValueError("erigon_node needs the Erigon --chain to sync as erigon_chain, e.g. 'mainnet'")
+
+        if indexer_profile not in INDEXER_PROFILES:
+            raise ValueError(
+                f"Unknown indexer profile '{indexer_profile}', expected one of {tuple(INDEXER_PROFILES)}"
+            )
+
         vpc = ec2.Vpc(self, "SafeVPC", max_azs=2)
 
         shared_stack = SafeSharedStack(self, "SafeShared", vpc=vpc)
@@ -41,8 +66,18 @@ class ZenSafeStack(Stack):
             vpc=vpc,
             shared_stack=shared_stack,
             ssl_certificate_arn=ssl_certificate_arn,
+            cpu_architecture=cpu_architecture,
+            x86_only_images=x86_only_images,
+            # Three nodes in different AZs, the smallest type Amazon MQ clusters run on
+            mq_node_type="mq.m5.large" if clustered_events_mq else "mq.t3.small",
+            mq_deployment_mode="CLUSTER_MULTI_AZ" if clustered_events_mq else "SINGLE_INSTANCE",
         )
 
+        # Traces come from a node inside the VPC instead of a remote RPC provider
+        ethereum_node = None
+        if erigon_node:
+            ethereum_node = ErigonEthereumStack(self, "ErigonMainnet", vpc=vpc, chain_name=erigon_chain)
+
         transaction_mainnet_stack = SafeTransactionStack(
             self,
             "SafeTxMainnet",
@@ -52,7 +87,18 @@ class ZenSafeStack(Stack):
             events_mq=events_stack.events_mq,
             alb=shared_stack.transaction_mainnet_alb,
             number_of_workers=4,
+            indexer_profile=INDEXER_PROFILES[indexer_profile],
             ssl_certificate_arn=ssl_certificate_arn,
+            celery_broker=celery_broker,
+            separate_redis_broker=separate_redis_broker,
+            cache_backend=cache_backend,
+            cpu_architecture=cpu_architecture,
+            x86_only_images=x86_only_images,
+            catch_up=CatchUpProfile() if catch_up else None,
+            ethereum_node=ethereum_node,
+            rpc_gateway=rpc_gateway,
+            rpc_gateway_cache_cluster_mode=rpc_gateway_cache_cluster_mode,
+            rpc_gateway_cache_max_replicas=rpc_gateway_cache_max_replicas,
         )
 
         client_gateway_stack = SafeClientGatewayStack(
@@ -61,6 +107,8 @@ class ZenSafeStack(Stack):
             vpc=vpc,
             shared_stack=shared_stack,
             ssl_certificate_arn=ssl_certificate_arn,
+            cpu_architecture=cpu_architecture,
+            x86_only_images=x86_only_images,
             client_gateway_url=client_gateway_url,
             config_service_uri=config_service_uri,
         )
@@ -71,6 +119,8 @@ class ZenSafeStack(Stack):
             vpc=vpc,
             shared_stack=shared_stack,
             ssl_certificate_arn=ssl_certificate_arn,
+            cpu_architecture=cpu_architecture,
+            x86_only_images=x86_only_images,
             client_gateway_url=client_gateway_url,
             config_service_uri=config_service_uri,
             mainnet_transaction_gateway_url=mainnet_transaction_gateway_url,
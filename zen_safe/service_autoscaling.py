@@ -0,0 +1,53 @@
+from typing import Sequence
+
+from aws_cdk import (
+    aws_ecs as ecs,
+    aws_elasticloadbalancingv2 as elbv2,
+    Duration,
+)
+
+
+def add_web_service_autoscaling(
+    service: ecs.BaseService,
+    target_groups: Sequence[elbv2.ApplicationTargetGroup],
+    min_capacity: int,
+    max_capacity: int,
+    requests_per_target: int = 1000,
+    cpu_utilization_percent: int = 60,
+    memory_utilization_percent: int = 75,
+    scale_out_cooldown: Duration = Duration.minutes(1),
+    scale_in_cooldown: Duration = Duration.minutes(5),
+) -> ecs.ScalableTaskCount:
+    """Target-track ALB requests per target, CPU and memory, ECS keeps the highest of the three."""
+    if not 1 <= min_capacity <= max_capacity:
+        raise ValueError(
+            f"Web service needs 1 <= min_capacity <= max_capacity, got {min_capacity} and {max_capacity}"
+        )
+
+    scalable_target = service.auto_scale_task_count(
+        min_capacity=min_capacity, max_capacity=max_capacity
+    )
+
+    for index, target_group in enumerate(target_groups):
+        scalable_target.scale_on_request_count(
+            f"RequestCountScaling{index}",
+            requests_per_target=requests_per_target,
+            target_group=target_group,
+            scale_out_cooldown=scale_out_cooldown,
+            scale_in_cooldown=scale_in_cooldown,
+        )
+
+    scalable_target.scale_on_cpu_utilization(
+        "CpuScaling",
+        target_utilization_percent=cpu_utilization_percent,
+        scale_out_cooldown=scale_out_cooldown,
+        scale_in_cooldown=scale_in_cooldown,
+    )
+    scalable_target.scale_on_memory_utilization(
+        "MemoryScaling",
+        target_utilization_percent=memory_utilization_percent,
+        scale_out_cooldown=scale_out_cooldown,
+        scale_in_cooldown=scale_in_cooldown,
+    )
+
+    return scalable_target
@@ -0,0 +1,131 @@
+from typing import Mapping
+
+from aws_cdk import (
+    aws_cloudfront as cloudfront,
+    aws_cloudfront_origins as origins,
+    aws_elasticloadbalancingv2 as elbv2,
+    aws_s3 as s3,
+    aws_s3_deployment as s3_deployment,
+    BundlingOptions,
+    CfnOutput,
+    DockerImage,
+    RemovalPolicy,
+)
+from constructs import Construct
+
+from zen_safe.container_platform import base_images, image_references
+
+STATIC_PATH_PATTERN = "/static/*"
+
+
+class StaticAssetsConstruct(Construct):
+    """Serves a Django service's collected static files from S3 through CloudFront.
+
+    Static files are collected once per build by running the upstream service image at synth time,
+    everything else is forwarded to the service's load balancer. Pages served through the load balancer's
+    own hostnames keep their /static/ URLs, redirect_static_paths sends those to the distribution.
+    """
+
+    @property
+    def bucket(self):
+        return self._bucket
+
+    @property
+    def distribution(self):
+        return self._distribution
+
+    def __init__(
+        self,
+        scope: Construct,
+        construct_id: str,
+        docker_directory: str,
+        collectstatic_command: str,
+        static_root: str,
+        alb: elbv2.IApplicationLoadBalancer,
+        environment: Mapping[str, str],
+    ) -> None:
+        super().__init__(scope, construct_id)
+
+        # The static files must match the image the service runs, a moving tag could differ between the two
+        bundling_image = image_references(docker_directory)[0]
+        if bundling_image[len(base_images(docker_directory)[0]):] in ("", ":latest"):
+            raise ValueError(f"The FROM image of {docker_directory} must be pinned to a version, got '{bundling_image}'")
+
+        self._bucket = s3.Bucket(
+            self,
+            "StaticFilesBucket",
+            block_public_access=s3.BlockPublicAccess.BLOCK_ALL,
+            enforce_ssl=True,
+            auto_delete_objects=True,
+            removal_policy=RemovalPolicy.DESTROY,
+        )
+
+        static_files = s3_deployment.Source.asset(
+            docker_directory,
+            bundling=BundlingOptions(
+                # The service Dockerfiles only add scripts, the upstream image has the same static files
+                image=DockerImage.from_registry(bundling_image),
+                entrypoint=["/bin/bash", "-c"],
+                command=[f"{collectstatic_command} && cp -r {static_root}/. /asset-output/"],
+                environment=dict(environment),
+                user="root",
+            ),
+        )
+
+        self._redirects = []
+        self._distribution = cloudfront.Distribution(
+            self,
+            "Distribution",
+            default_behavior=cloudfront.BehaviorOptions(
+                origin=origins.LoadBalancerV2Origin(
+                    alb, protocol_policy=cloudfront.OriginProtocolPolicy.HTTP_ONLY
+                ),
+                viewer_protocol_policy=cloudfront.ViewerProtocolPolicy.REDIRECT_TO_HTTPS,
+                allowed_methods=cloudfront.AllowedMethods.ALLOW_ALL,
+                cache_policy=cloudfront.CachePolicy.CACHING_DISABLED,
+                origin_request_policy=cloudfront.OriginRequestPolicy.ALL_VIEWER,
+            ),
+            additional_behaviors={
+                STATIC_PATH_PATTERN: cloudfront.BehaviorOptions(
+                    origin=origins.S3BucketOrigin.with_origin_access_control(self._bucket),
+                    viewer_protocol_policy=cloudfront.ViewerProtocolPolicy.REDIRECT_TO_HTTPS,
+                    cache_policy=cloudfront.CachePolicy.CACHING_OPTIMIZED,
+                    compress=True,
+                ),
+            },
+        )
+
+        s3_deployment.BucketDeployment(
+            self,
+            "StaticFilesDeployment",
+            sources=[static_files],
+            destination_bucket=self._bucket,
+            destination_key_prefix="static/",
+            cache_control=[
+                s3_deployment.CacheControl.from_string("public, max-age=31536000, immutable")
+            ],
+            # Keep the previous release's files for tasks still running it during a rolling deploy
+            prune=False,
+            distribution=self._distribution,
+            distribution_paths=[STATIC_PATH_PATTERN],
+        )
+
+        CfnOutput(self, "StaticDistributionDomainName", value=self._distribution.distribution_domain_name)
+
+    def redirect_static_paths(self, listener: elbv2.IApplicationListener, priority: int = 1) -> None:
+        """Redirect /static/* requests reaching the listener to the same path on the distribution."""
+        # The rule belongs to this stack, the listener's stack can't depend on the distribution
+        elbv2.ApplicationListenerRule(
+            self,
+            f"StaticRedirect{len(self._redirects)}",
+            listener=listener,
+            priority=priority,
+            conditions=[elbv2.ListenerCondition.path_patterns([STATIC_PATH_PATTERN])],
+            action=elbv2.ListenerAction.redirect(
+                host=self._distribution.distribution_domain_name,
+                protocol="HTTPS",
+                port="443",
+                permanent=False,
+            ),
+        )
+        self._redirects.append(listener)
@@ -0,0 +1,116 @@
+from dataclasses import dataclass
+from typing import Dict, Mapping, Optional, Sequence, Tuple
+
+from zen_safe.capacity_provider_strategy import FargateCapacitySplit, MOSTLY_SPOT
+
+CELERY_POOLS = ("prefork", "gevent", "threads", "solo")
+WORKER_LAUNCH_TYPES = ("FARGATE", "EC2")
+
+
+@dataclass(frozen=True)
+class WorkerQueueGroup:
+    """A set of Celery queues consumed by its own ECS service."""
+
+    queues: Sequence[str]
+    cpu: int = 512
+    memory_limit_mib: int = 1024
+    desired_count: int = 1
+    concurrency: int = 2
+    pool: str = "prefork"
+    # Queue depth autoscaling bounds, both default to desired_count which disables autoscaling
+    min_count: Optional[int] = None
+    max_count: Optional[int] = None
+    # Pending messages a single task is expected to work through before scaling out
+    backlog_per_task: int = 100
+    capacity: FargateCapacitySplit = MOSTLY_SPOT
+    # EC2 tasks bin-pack onto the stack's EC2 worker instances, capacity only applies to Fargate
+    launch_type: str = "FARGATE"
+
+    @property
+    def capacity_bounds(self) -> Tuple[int, int]:
+        min_count = self.desired_count if self.min_count is None else self.min_count
+        max_count = self.desired_count if self.max_count is None else self.max_count
+        return min_count, max_count
+
+    @property
+    def autoscaling_enabled(self) -> bool:
+        min_count, max_count = self.capacity_bounds
+        return max_count > min_count
+
+    @property
+    def worker_queues(self) -> str:
+        return ",".join(self.queues)
+
+    def environment(self) -> Dict[str, str]:
+        return {
+            "WORKER_QUEUES": self.worker_queues,
+            "CELERY_WORKER_POOL": self.pool,
+            "CELERY_WORKER_CONCURRENCY": str(self.concurrency),
+        }
+
+
+def default_worker_queue_groups(
+    number_of_workers: int = 2, indexing_launch_type: str = "FARGATE"
+) -> Dict[str, WorkerQueueGroup]:
+    # Indexing and processing are CPU bound, the rest mostly wait on RPC nodes and HTTP calls
+    return {
+        "indexing": WorkerQueueGroup(
+            queues=("indexing", "processing"),
+            desired_count=number_of_workers,
+            min_count=1,
+            max_count=number_of_workers * 2,
+            backlog_per_task=500,
+            concurrency=2,
+            pool="prefork",
+            launch_type=indexing_launch_type,
+        ),
+        "default": WorkerQueueGroup(
+            queues=("default", "contracts", "tokens"),
+            max_count=4,
+            concurrency=50,
+            pool="gevent",
+        ),
+        "notifications": WorkerQueueGroup(
+            queues=("notifications", "webhooks"),
+            cpu=256,
+            memory_limit_mib=512,
+            max_count=4,
+            concurrency=100,
+            pool="gevent",
+        ),
+    }
+
+
+def validate_worker_queue_groups(worker_queue_groups: Mapping[str, WorkerQueueGroup]) -> None:
+    if not worker_queue_groups:
+        raise ValueError("At least one worker queue group is required")
+
+    consumed_by = {}
+    for name, group in worker_queue_groups.items():
+        if not group.queues:
+            raise ValueError(f"Worker queue group '{name}' does not consume any queue")
+        if group.pool not in CELERY_POOLS:
+            raise ValueError(
+                f"Worker queue group '{name}' uses unknown pool '{group.pool}', expected one of {CELERY_POOLS}"
+            )
+        if group.launch_type not in WORKER_LAUNCH_TYPES:
+            raise ValueError(
+                f"Worker queue group '{name}' uses unknown launch type '{group.launch_type}', "
+                f"expected one of {WORKER_LAUNCH_TYPES}"
+            )
+        if group.concurrency < 1:
+            raise ValueError(f"Worker queue group '{name}' needs a concurrency of at least 1")
+        min_count, max_count = group.capacity_bounds
+        if not 0 <= min_count <= group.desired_count <= max_count:
+            raise ValueError(
+                f"Worker queue group '{name}' needs 0 <= min_count <= desired_count <= max_count, "
+                f"got {min_count}, {group.desired_count} and {max_count}"
+            )
+        if group.backlog_per_task < 1:
+            raise ValueError(f"Worker queue group '{name}' needs a backlog_per_task of at least 1")
+        for queue in group.queues:
+            if queue in consumed_by:
+                raise ValueError(
+                    f"Queue '{queue}' is consumed by both '{consumed_by[queue]}' and '{name}' worker queue groups"
+                )
+            consumed_by[queue] = name